@@ -0,0 +1,140 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+
+from database.db_manager import DatabaseManager
+from models.document import Livre
+
+
+def emprunt_ancien(conn, utilisateur_id, doc_id):
+    """Chemin d'origine : SELECT, INSERT puis UPDATE en transaction différée"""
+    cursor = conn.cursor()
+    cursor.execute('SELECT quantite_disponible FROM documents WHERE id = ?', (doc_id,))
+    if cursor.fetchone()[0] <= 0:
+        conn.rollback()
+        return False
+    cursor.execute(
+        'INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt) VALUES (?, ?, ?)',
+        (utilisateur_id, doc_id, 20089)
+    )
+    cursor.execute(
+        'UPDATE documents SET quantite_disponible = quantite_disponible - 1 WHERE id = ?',
+        (doc_id,)
+    )
+    conn.commit()
+    return True
+
+
+def travailleur(db_file, mode, doc_id, demandes, barriere, resultats):
+    """Emprunte (ou valide des demandes) jusqu'à épuisement des exemplaires"""
+    db = DatabaseManager(db_file)
+    conn = sqlite3.connect(db_file, timeout=30)
+    succes = echecs = erreurs = 0
+    barriere.wait()
+    debut = time.perf_counter()
+    if mode == 'demandes':
+        for demande_id in demandes:
+            ok, _ = db.traiter_demande_emprunt(demande_id, 'validee')
+            succes += ok
+            echecs += not ok
+    else:
+        while True:
+            try:
+                if mode == 'ancien':
+                    ok = emprunt_ancien(conn, 1, doc_id)
+                else:
+                    ok = db.creer_emprunt(1, doc_id)
+            except sqlite3.OperationalError:
+                # Verrou perdu (transaction différée promue trop tard) : on réessaie
+                conn.rollback()
+                erreurs += 1
+                continue
+            if not ok:
+                break
+            succes += 1
+    resultats.put((succes, echecs, erreurs, time.perf_counter() - debut))
+    conn.close()
+    db.fermer()
+
+
+def scenario(mode, nb_processus, exemplaires, nb_demandes):
+    with tempfile.TemporaryDirectory() as dossier:
+        db_file = os.path.join(dossier, 'concurrence.db')
+        db = DatabaseManager(db_file)
+        db.ajouter_document(Livre(titre="Dernier exemplaire", auteur="Bench", nb_pages=1, genre="test"))
+        doc_id = db.execute_query('SELECT id FROM documents')[0][0]
+        conn = sqlite3.connect(db_file)
+        conn.execute('UPDATE documents SET quantite = ?, quantite_disponible = ? WHERE id = ?',
+                     (exemplaires, exemplaires, doc_id))
+        demandes = []
+        if mode == 'demandes':
+            conn.executemany(
+                "INSERT INTO demandes_emprunt (utilisateur_id, document_id, date_demande) VALUES (1, ?, '2025-01-01')",
+                [(doc_id,)] * nb_demandes
+            )
+            demandes = [row[0] for row in conn.execute('SELECT id FROM demandes_emprunt ORDER BY id')]
+        conn.commit()
+        db.fermer()
+
+        barriere = multiprocessing.Barrier(nb_processus)
+        resultats = multiprocessing.Queue()
+        # Chaque processus reçoit toutes les demandes : ils se les disputent
+        processus = [
+            multiprocessing.Process(target=travailleur,
+                                    args=(db_file, mode, doc_id, demandes, barriere, resultats))
+            for _ in range(nb_processus)
+        ]
+        for p in processus:
+            p.start()
+        bilans = [resultats.get() for _ in processus]
+        for p in processus:
+            p.join()
+
+        succes = sum(b[0] for b in bilans)
+        erreurs = sum(b[2] for b in bilans)
+        duree = max(b[3] for b in bilans)
+        restant, = conn.execute('SELECT quantite_disponible FROM documents WHERE id = ?', (doc_id,)).fetchone()
+        nb_emprunts, = conn.execute('SELECT COUNT(*) FROM emprunts').fetchone()
+        conn.close()
+
+    survente = nb_emprunts - exemplaires
+    print(f"{mode:<10} {nb_processus:>4} {exemplaires:>11} {succes:>8} {nb_emprunts:>9} "
+          f"{restant:>8} {survente:>9} {erreurs:>8} {succes / duree:>10.0f}")
+    return survente <= 0 and restant >= 0 and nb_emprunts == succes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emprunts concurrents sur les derniers exemplaires d'un document")
+    parser.add_argument('--processus', type=int, default=8)
+    parser.add_argument('--exemplaires', type=int, default=500,
+                        help="Exemplaires disponibles au départ")
+    parser.add_argument('--demandes', type=int, default=1000,
+                        help="Demandes en attente pour le scénario de validation")
+    parser.add_argument('--ancien', action='store_true',
+                        help="Rejouer aussi le chemin SELECT puis UPDATE d'origine")
+    args = parser.parse_args()
+
+    print(f"{'Mode':<10} {'Proc':>4} {'Exemplaires':>11} {'Succès':>8} {'Emprunts':>9} "
+          f"{'Restant':>8} {'Survente':>9} {'Erreurs':>8} {'Emprunts/s':>10}")
+    modes = ['emprunt', 'demandes'] + (['ancien'] if args.ancien else [])
+    ok = True
+    for mode in modes:
+        correct = scenario(mode, args.processus, args.exemplaires, args.demandes)
+        if mode != 'ancien':
+            ok = ok and correct
+    # Le dernier exemplaire disputé par tous les processus à la fois
+    ok = scenario('emprunt', args.processus, 1, 0) and ok
+    if not ok:
+        print("ÉCHEC : exemplaires survendus")
+        sys.exit(1)
+    print("Aucune survente")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import tempfile
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent pas être chargés avant l'écran de connexion
+INTERDITS = (
+    'PIL', 'jwt',
+    'views.dashboard_view', 'views.emprunt_view', 'views.user_view', 'views.retour_view',
+    'views.statistiques_view', 'views.search_view', 'views.document_view',
+    'views.document_management_view', 'views.edit_document_dialog',
+)
+
+_LIGNE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+# Démarrage complet jusqu'à la fenêtre de connexion dessinée (nécessite un affichage)
+SCRIPT_FENETRE = '''
+import json, os, time
+from utils.config_manager import ConfigManager
+# Journaux écrits dans le dossier temporaire, pas dans logs/ du projet
+ConfigManager().set('log_dossier', os.path.abspath('logs'))
+debut = time.perf_counter()
+from controllers.main_controller import MainController
+from views.main_window import MainWindow
+controller = MainController()
+window = MainWindow(controller)
+controller.set_main_window(window)
+window.update()
+print(json.dumps({'ms': (time.perf_counter() - debut) * 1000}))
+window.destroy()
+controller.fermer()
+'''
+
+
+def mesurer_imports():
+    """(durée cumulée de l'import de main en ms, modules importés) d'après -X importtime"""
+    resultat = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=RACINE, capture_output=True, text=True
+    )
+    if resultat.returncode != 0:
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1])
+    modules, total = set(), None
+    for ligne in resultat.stderr.splitlines():
+        m = _LIGNE.match(ligne)
+        if not m:
+            continue
+        modules.add(m.group(4))
+        if m.group(4) == 'main' and not m.group(3):
+            total = int(m.group(2)) / 1000
+    return total, modules
+
+
+def mesurer_fenetre():
+    """Durée jusqu'à la fenêtre de connexion dessinée (ms), None sans affichage"""
+    with tempfile.TemporaryDirectory() as dossier:
+        # Configuration, base et journaux créés dans un dossier temporaire
+        env = dict(os.environ, PYTHONPATH=RACINE)
+        resultat = subprocess.run([sys.executable, '-c', SCRIPT_FENETRE], cwd=dossier,
+                                  env=env, capture_output=True, text=True)
+    if resultat.returncode != 0:
+        if 'TclError' in resultat.stderr:
+            return None
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1])
+    return json.loads(resultat.stdout.strip().splitlines()[-1])['ms']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Démarrage à froid : imports et fenêtre de connexion")
+    parser.add_argument('--repetitions', type=int, default=7)
+    parser.add_argument('--budget-imports', type=float, default=150.0,
+                        help="médiane maximale de l'import de main.py (ms)")
+    parser.add_argument('--budget-fenetre', type=float, default=600.0,
+                        help="médiane maximale jusqu'à la fenêtre de connexion dessinée (ms)")
+    args = parser.parse_args()
+
+    # Premier passage : compile les .pyc, non compté
+    mesurer_imports()
+    durees, modules = [], set()
+    for _ in range(args.repetitions):
+        duree, importes = mesurer_imports()
+        durees.append(duree)
+        modules |= importes
+
+    echecs = []
+    mediane = statistics.median(durees)
+    print(f"import main      médiane {mediane:>7.1f} ms  (min {min(durees):.1f}, "
+          f"max {max(durees):.1f}, budget {args.budget_imports:.0f})")
+    if mediane > args.budget_imports:
+        echecs.append(f"imports au-dessus du budget ({mediane:.1f} ms > {args.budget_imports:.0f} ms)")
+
+    charges = sorted(nom for nom in modules if nom.split('.')[0] in INTERDITS or nom in INTERDITS)
+    if charges:
+        echecs.append(f"modules chargés avant la connexion : {', '.join(charges)}")
+
+    fenetres = [mesurer_fenetre()]
+    if fenetres[0] is None:
+        print("fenêtre          non mesurée (pas d'affichage)")
+    else:
+        fenetres += [mesurer_fenetre() for _ in range(args.repetitions - 1)]
+        mediane = statistics.median(fenetres)
+        print(f"fenêtre dessinée médiane {mediane:>7.1f} ms  (min {min(fenetres):.1f}, "
+              f"max {max(fenetres):.1f}, budget {args.budget_fenetre:.0f})")
+        if mediane > args.budget_fenetre:
+            echecs.append(f"fenêtre au-dessus du budget ({mediane:.1f} ms > {args.budget_fenetre:.0f} ms)")
+
+    for echec in echecs:
+        print(f"ÉCHEC : {echec}")
+    if echecs:
+        sys.exit(1)
+    print("Démarrage dans le budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+from models.document import (Livre, Magazine, Journal, OuvrageMultimedia,
+                             document_depuis_ligne)
+
+
+def generer_lignes(nombre):
+    """Lignes (type, id, titre, status, details) comme lues dans la table documents"""
+    rng = random.Random(7)
+    lignes = []
+    for i in range(nombre):
+        type_doc = rng.choice(['livre', 'magazine', 'journal', 'multimedia'])
+        date = f"{rng.randint(1950, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        if type_doc == 'livre':
+            details = {'auteur': 'Auteur', 'nb_pages': 200, 'genre': 'roman'}
+        elif type_doc == 'magazine':
+            details = {'editeur': 'Editeur', 'frequence': 'Mensuel', 'numero': str(i)}
+        elif type_doc == 'journal':
+            details = {'editeur': 'Editeur'}
+        else:
+            details = {'type_media': 'DVD', 'duree': 120}
+        details['date_publication'] = date
+        lignes.append((type_doc, i, f"Titre {i}", 'disponible', json.dumps(details)))
+    return lignes
+
+
+# Classes sans __slots__ (un __dict__ par instance), comme avant la factory
+LivreDict = type('LivreDict', (Livre,), {})
+MagazineDict = type('MagazineDict', (Magazine,), {})
+JournalDict = type('JournalDict', (Journal,), {})
+MultimediaDict = type('MultimediaDict', (OuvrageMultimedia,), {})
+
+
+def hydrater_ancien(lignes):
+    """Chaîne if/elif recopiée dans chaque méthode avant la factory"""
+    documents = []
+    for type_doc, doc_id, titre, status, details in lignes:
+        details = json.loads(details)
+        date_publication = datetime.strptime(details.get('date_publication'), '%Y-%m-%d')
+        if type_doc == 'livre':
+            doc = LivreDict(doc_id, titre, details.get('auteur', ''), int(details.get('nb_pages', 0)),
+                            details.get('genre', ''), date_publication, status)
+        elif type_doc == 'magazine':
+            doc = MagazineDict(doc_id, titre, details.get('editeur', ''), details.get('frequence', ''),
+                               details.get('numero', ''), date_publication, status)
+        elif type_doc == 'journal':
+            doc = JournalDict(doc_id, titre, details.get('editeur', ''), date_publication, status)
+        else:
+            doc = MultimediaDict(doc_id, titre, details.get('type_media', ''),
+                                 int(details.get('duree', 0)), date_publication, status)
+        documents.append(doc)
+    return documents
+
+
+def hydrater_factory(lignes):
+    return [document_depuis_ligne(*ligne) for ligne in lignes]
+
+
+def mesurer(fonction, lignes):
+    gc.collect()
+    debut = time.perf_counter()
+    fonction(lignes)
+    duree = time.perf_counter() - debut
+
+    gc.collect()
+    tracemalloc.start()
+    documents = fonction(lignes)
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del documents
+    return duree, pic
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps et mémoire d'hydratation des documents")
+    parser.add_argument('--lignes', type=int, default=100000)
+    args = parser.parse_args()
+
+    lignes = generer_lignes(args.lignes)
+    print(f"{'Hydratation':<28} {'temps (s)':>10} {'mémoire pic (Mo)':>18}")
+    for libelle, fonction in (("if/elif + strptime + __dict__", hydrater_ancien),
+                              ("factory + __slots__", hydrater_factory)):
+        duree, pic = mesurer(fonction, lignes)
+        print(f"{libelle:<28} {duree:>10.3f} {pic / 1024 / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+
+from database.migrations import appliquer_migrations
+from database.penalites import evaluer_penalites
+from models.document import document_depuis_ligne
+from models.emprunt import Emprunt, aujourd_hui
+
+TYPES = {
+    'livre': lambda rng: {'auteur': 'A', 'nb_pages': 100, 'genre': 'roman'},
+    'magazine': lambda rng: {'editeur': 'E', 'frequence': 'mensuel', 'numero': '1'},
+    'journal': lambda rng: {'editeur': 'E'},
+    'multimedia': lambda rng: {'type_media': rng.choice(['CD', 'DVD']), 'duree': rng.randint(30, 180)},
+}
+
+
+def remplir(conn, nb_emprunts, jour):
+    rng = random.Random(7)
+    documents = []
+    for i in range(max(1, nb_emprunts // 4)):
+        type_doc = rng.choice(list(TYPES))
+        documents.append((type_doc, f"Document {i}", json.dumps(TYPES[type_doc](rng))))
+    conn.executemany('INSERT INTO documents (type, titre, details) VALUES (?, ?, ?)', documents)
+
+    emprunts = []
+    for _ in range(nb_emprunts):
+        debut = jour - rng.randint(0, 120)
+        prevue = debut + 30
+        retour = rng.choice([None, None, min(jour, debut + rng.randint(1, 60))])
+        emprunts.append((rng.randint(1, 200), rng.randint(1, len(documents)), debut, retour, prevue))
+    conn.executemany('''
+        INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt, date_retour, date_retour_prevue)
+        VALUES (?, ?, ?, ?, ?)
+    ''', emprunts)
+    conn.commit()
+
+
+def par_objet(conn, jour):
+    """Chemin d'origine : hydrater chaque emprunt puis calculer_penalites()"""
+    resultats = {}
+    for row in conn.execute('''
+        SELECT e.id, e.date_emprunt, e.date_retour, e.date_retour_prevue,
+               d.id, d.type, d.titre, d.status, d.details
+        FROM emprunts e JOIN documents d ON d.id = e.document_id
+    '''):
+        emprunt_id, debut, retour, prevue, doc_id, type_doc, titre, status, details = row
+        document = document_depuis_ligne(type_doc, doc_id, titre, status, details)
+        emprunt = Emprunt.depuis_ligne(emprunt_id, document, debut, retour, prevue)
+        montant = emprunt.calculer_penalites(jour)
+        if montant:
+            resultats[emprunt_id] = montant
+    return resultats
+
+
+def ensembliste(conn, jour):
+    return {ligne[0]: ligne[4] for ligne in evaluer_penalites(conn, jour)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pénalités : calcul par objet vs évaluation SQL en lot")
+    parser.add_argument('--emprunts', type=int, default=100000)
+    args = parser.parse_args()
+
+    jour = aujourd_hui()
+    with tempfile.TemporaryDirectory() as dossier:
+        conn = sqlite3.connect(os.path.join(dossier, 'penalites.db'))
+        appliquer_migrations(conn)
+        remplir(conn, args.emprunts, jour)
+
+        mesures = {}
+        for nom, fonction in (('par objet', par_objet), ('SQL en lot', ensembliste)):
+            debut = time.perf_counter()
+            mesures[nom] = fonction(conn, jour)
+            print(f"{nom:<12} {(time.perf_counter() - debut) * 1000:>9.1f} ms "
+                  f"({len(mesures[nom])} emprunts pénalisés)")
+        conn.close()
+
+    ecarts = [
+        emprunt_id for emprunt_id in set(mesures['par objet']) | set(mesures['SQL en lot'])
+        if abs(mesures['par objet'].get(emprunt_id, 0) - mesures['SQL en lot'].get(emprunt_id, 0)) > 0.005
+    ]
+    if ecarts:
+        print(f"ÉCHEC : {len(ecarts)} montants différents (ex. emprunt {ecarts[0]})")
+        sys.exit(1)
+    print("Montants identiques")
+
+
+if __name__ == "__main__":
+    main()
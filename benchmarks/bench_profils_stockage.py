@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from database.pool import ConnectionPool
+from database.profils import PROFILS_STOCKAGE, appliquer_profil
+
+
+def mesurer_commits(profil, nb_commits):
+    """Latence de commit (ms) pour un petit emprunt inséré par transaction"""
+    with tempfile.TemporaryDirectory() as dossier:
+        pool = ConnectionPool(
+            os.path.join(dossier, 'bench.db'),
+            initialiser=lambda conn: appliquer_profil(conn, PROFILS_STOCKAGE[profil])
+        )
+        conn = pool.acquerir()
+        try:
+            conn.execute('''
+                CREATE TABLE emprunts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    utilisateur_id INTEGER,
+                    document_id INTEGER,
+                    date_emprunt TEXT NOT NULL
+                )''')
+            conn.commit()
+
+            latences = []
+            for i in range(nb_commits):
+                debut = time.perf_counter()
+                conn.execute(
+                    'INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt) VALUES (?, ?, ?)',
+                    (i % 50, i, '2025-01-01')
+                )
+                conn.commit()
+                latences.append((time.perf_counter() - debut) * 1000)
+            return latences
+        finally:
+            pool.liberer(conn)
+            pool.fermer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence de commit par profil de stockage")
+    parser.add_argument('--commits', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'Profil':<8} {'moyenne':>10} {'p50':>10} {'p99':>10}  (ms, {args.commits} commits)")
+    for profil in PROFILS_STOCKAGE:
+        latences = sorted(mesurer_commits(profil, args.commits))
+        p99 = latences[min(len(latences) - 1, int(len(latences) * 0.99))]
+        print(f"{profil:<8} {statistics.mean(latences):>10.3f} "
+              f"{statistics.median(latences):>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from database.migrations import appliquer_migrations
+from database.recherche import expression_fts, ordre_bm25
+
+MOTS = ['étranger', 'château', 'forêt', 'été', 'mémoire', 'océan', 'rivière', 'nuit',
+        'jardin', 'guerre', 'paix', 'voyage', 'lumière', 'ombre', 'cœur', 'hiver',
+        'île', 'prince', 'misérables', 'peste', 'chute', 'rouge', 'noir', 'éducation']
+AUTEURS = ['Camus', 'Hugo', 'Zola', 'Flaubert', 'Stendhal', 'Sand', 'Duras', 'Proust',
+           'Éluard', 'Modiano', 'Ernaux', 'Céline', 'Gide', 'Colette', 'Verne']
+GENRES = ['roman', 'poésie', 'théâtre', 'essai', 'policier', 'bd']
+
+# (libellé, requête LIKE d'origine, critères FTS équivalents)
+RECHERCHES = [
+    ('titre "etranger"', "LOWER(titre) LIKE LOWER(?)", '%etranger%', {'titre': 'etranger'}),
+    ('titre "château"', "LOWER(titre) LIKE LOWER(?)", '%château%', {'titre': 'château'}),
+    ('auteur "zola"', "json_extract(details, '$.auteur') LIKE ?", '%zola%', {'auteur': 'zola'}),
+]
+
+
+def remplir(conn, nombre):
+    rng = random.Random(42)
+    lot = []
+    debut = time.perf_counter()
+    for i in range(nombre):
+        titre = ' '.join(rng.sample(MOTS, 3)).capitalize()
+        details = {
+            'auteur': rng.choice(AUTEURS),
+            'nb_pages': rng.randint(50, 900),
+            'genre': rng.choice(GENRES),
+            'date_publication': f"{rng.randint(1900, 2024)}-01-01",
+        }
+        lot.append(('livre', f"{titre} {i}", json.dumps(details)))
+        if len(lot) == 10000:
+            conn.executemany('INSERT INTO documents (type, titre, details) VALUES (?, ?, ?)', lot)
+            lot.clear()
+    if lot:
+        conn.executemany('INSERT INTO documents (type, titre, details) VALUES (?, ?, ?)', lot)
+    conn.commit()
+    return time.perf_counter() - debut
+
+
+def chronometrer(conn, requete, params, repetitions):
+    durees = []
+    nb = 0
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        nb = len(conn.execute(requete, params).fetchall())
+        durees.append((time.perf_counter() - debut) * 1000)
+    return statistics.median(durees), nb
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche LIKE vs FTS5 (bm25) sur un catalogue synthétique")
+    parser.add_argument('--tailles', default='100000,1000000',
+                        help="Tailles de catalogue séparées par des virgules")
+    parser.add_argument('--repetitions', type=int, default=5)
+    args = parser.parse_args()
+
+    for taille in (int(t) for t in args.tailles.split(',')):
+        with tempfile.TemporaryDirectory() as dossier:
+            conn = sqlite3.connect(os.path.join(dossier, 'fts.db'))
+            appliquer_migrations(conn)
+            duree = remplir(conn, taille)
+            print(f"\n{taille} documents (chargement + index FTS : {duree:.1f} s)")
+            print(f"{'Recherche':<20} {'LIKE (ms)':>10} {'FTS5 (ms)':>10} {'résultats LIKE/FTS':>20}")
+            for libelle, condition, motif, criteria in RECHERCHES:
+                like_ms, nb_like = chronometrer(
+                    conn, f"SELECT id FROM documents WHERE {condition}", (motif,), args.repetitions)
+                fts_ms, nb_fts = chronometrer(
+                    conn,
+                    f"""SELECT d.id FROM documents_fts
+                        JOIN documents d ON d.id = documents_fts.rowid
+                        WHERE documents_fts MATCH ? ORDER BY {ordre_bm25()} LIMIT 50""",
+                    (expression_fts(criteria),), args.repetitions)
+                print(f"{libelle:<20} {like_ms:>10.2f} {fts_ms:>10.2f} {f'{nb_like}/{nb_fts} (top 50)':>20}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import re
+import sqlite3
+import tempfile
+
+from database.db_manager import DatabaseManager
+from models.document import Livre
+
+# Méthodes de circulation de DatabaseManager dont aucune requête ne doit
+# parcourir une table entière. Les requêtes sont celles réellement exécutées,
+# relevées par set_trace_callback pendant l'appel (paramètres déjà liés).
+SCENARIOS = {
+    'get_emprunts_utilisateur': lambda db, c: db.get_emprunts_utilisateur(c['lecteur']),
+    'get_emprunts_utilisateur (emprunt_ids)':
+        lambda db, c: db.get_emprunts_utilisateur(c['lecteur'], [1, 2]),
+    'creer_emprunt': lambda db, c: db.creer_emprunt(c['lecteur'], c['documents'][0]),
+    'retourner_document': lambda db, c: db.retourner_document(c['documents'][0]),
+    'retourner_documents': lambda db, c: (
+        db.creer_emprunt(c['lecteur'], c['documents'][1]),
+        db.retourner_documents([str(d) for d in c['documents']])),
+    'ajouter_document (doublons)': lambda db, c: db.ajouter_document(Livre(titre="1984", auteur="Orwell")),
+    'creer_demande_emprunt': lambda db, c: db.creer_demande_emprunt(c['lecteur'], c['documents'][1]),
+    'get_demandes_emprunt': lambda db, c: db.get_demandes_emprunt(),
+    'get_demandes_utilisateur': lambda db, c: db.get_demandes_utilisateur(c['lecteur']),
+    'traiter_demandes_emprunt': lambda db, c: db.traiter_demandes_emprunt(
+        [demande[0] for demande in db.get_demandes_emprunt()], 'validee'),
+    'get_documents_page': lambda db, c: db.get_documents_page(c['documents'][0], 10, 'livre'),
+    'get_documents_par_ids': lambda db, c: db.get_documents_par_ids(c['documents']),
+    'search_document_ids (texte)': lambda db, c: db.search_document_ids({'texte': 'orwell'}, 200),
+    'search_document_ids (affinage)':
+        lambda db, c: db.search_document_ids({'titre': '1984', 'type': 'livre'}, parmi=c['documents']),
+    'search_documents (intervalle de dates)':
+        lambda db, c: db.search_documents({'date_debut': '2000-01-01', 'date_fin': '2010-12-31'}),
+    'get_statistiques': lambda db, c: db.get_statistiques(),
+    'get_soldes': lambda db, c: db.get_soldes([c['lecteur']]),
+    # En dernier : le lecteur a encore l'emprunt de la demande validée, la suppression est refusée
+    'supprimer_utilisateur (emprunts en cours)': lambda db, c: db.supprimer_utilisateur(c['lecteur']),
+}
+
+# Tables virtuelles (json_each, index plein texte) et ligne constante : pas des parcours de table
+PARCOURS_COMPLET = re.compile(r'^SCAN (?!CONSTANT ROW)(\w+)(?! VIRTUAL TABLE)(?:\s|$)')
+# Résultats intermédiaires (CTE, sous-requêtes) : lus en entier par construction
+INTERMEDIAIRE = re.compile(r'^(?:MATERIALIZE|CO-ROUTINE) (\w+)')
+# Compteurs tenus par déclencheurs : une ligne par statistique, lus en entier
+PETITES_TABLES = {'stats'}
+# Contrôle de transaction et sous-requêtes des déclencheurs (« -- TRIGGER ») : pas de plan propre
+IGNOREES = re.compile(r'^\s*(--|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA)', re.IGNORECASE)
+
+
+def preparer(db):
+    """Lecteur et documents utilisés par les scénarios"""
+    db.ajouter_utilisateur('verification_plans', 'verification_plans')
+    conn = db.pool.acquerir()
+    try:
+        lecteur = conn.execute(
+            "SELECT id FROM utilisateurs WHERE username = 'verification_plans'").fetchone()[0]
+    finally:
+        db.pool.liberer(conn)
+    for titre in ("1984", "La Ferme des animaux"):
+        db.ajouter_document(Livre(titre=titre, auteur="George Orwell", date_publication='2005-06-01'))
+    conn = db.pool.acquerir()
+    try:
+        documents = [row[0] for row in conn.execute(
+            "SELECT id FROM documents ORDER BY id DESC LIMIT 2")][::-1]
+        conn.execute("UPDATE documents SET quantite_disponible = 2 WHERE id IN (?, ?)", documents)
+        conn.commit()
+    finally:
+        db.pool.liberer(conn)
+    return {'lecteur': lecteur, 'documents': documents}
+
+
+def relever_requetes(db, contexte):
+    """{scénario: [requêtes exécutées]} en appelant les méthodes de DatabaseManager"""
+    requetes = {}
+    conn = db.pool.acquerir()
+    try:
+        for nom, scenario in SCENARIOS.items():
+            relevees = []
+            conn.set_trace_callback(relevees.append)
+            try:
+                scenario(db, contexte)
+            finally:
+                conn.set_trace_callback(None)
+            vues = set()
+            requetes[nom] = []
+            for requete in relevees:
+                requete = ' '.join(requete.split())
+                if requete not in vues and not IGNOREES.match(requete):
+                    vues.add(requete)
+                    requetes[nom].append(requete)
+    finally:
+        db.pool.liberer(conn)
+    return requetes
+
+
+def plans(conn, requetes):
+    """[(scénario, requête, [étapes du plan])]"""
+    return [
+        (nom, requete, [detail for *_, detail in conn.execute(f'EXPLAIN QUERY PLAN {requete}')])
+        for nom, liste in requetes.items() for requete in liste
+    ]
+
+
+def verifier_plans(resultats):
+    """Retourne la liste des (scénario, requête, étape) qui parcourent une table entière"""
+    violations = []
+    for nom, requete, etapes in resultats:
+        intermediaires = {m.group(1) for m in map(INTERMEDIAIRE.match, etapes) if m}
+        for detail in etapes:
+            m = PARCOURS_COMPLET.match(detail)
+            if m and m.group(1) not in intermediaires and m.group(1) not in PETITES_TABLES:
+                violations.append((nom, requete, detail))
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vérifie via EXPLAIN QUERY PLAN l'usage des index")
+    parser.add_argument('db_file', nargs='?',
+                        help="Base dont une copie est vérifiée (par défaut : base vide)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Afficher tous les plans")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'plans.db')
+        # Les scénarios écrivent : une base existante est vérifiée sur une copie
+        if args.db_file:
+            source, copie = sqlite3.connect(args.db_file), sqlite3.connect(chemin)
+            try:
+                source.backup(copie)
+            finally:
+                source.close()
+                copie.close()
+        db = DatabaseManager(chemin)
+        try:
+            contexte = preparer(db)
+            requetes = relever_requetes(db, contexte)
+        finally:
+            db.fermer()
+        conn = sqlite3.connect(chemin)
+        try:
+            resultats = plans(conn, requetes)
+        finally:
+            conn.close()
+
+    if args.verbose:
+        for nom, requete, etapes in resultats:
+            print(f"{nom} : {requete}")
+            for detail in etapes:
+                print(f"    {detail}")
+    violations = verifier_plans(resultats)
+    for nom, requete, detail in violations:
+        print(f"ÉCHEC {nom} : {detail}\n    {requete}")
+    vides = [nom for nom, liste in requetes.items() if not liste]
+    for nom in vides:
+        print(f"ÉCHEC {nom} : aucune requête relevée")
+    if violations or vides:
+        sys.exit(1)
+    print(f"OK : {len(resultats)} requêtes de {len(SCENARIOS)} méthodes sans parcours complet de table")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,69 @@
 from database.db_manager import DatabaseManager
 from models.utilisateur import Utilisateur
+from models.emprunt import aujourd_hui
 from utils.session_manager import SessionManager
 from utils.logger import LibraryLogger
 from utils.config_manager import ConfigManager
 from utils.theme_manager import ThemeManager
 from utils.error_handler import ErrorHandler
+from utils.taches import GestionnaireTaches
+from utils.assets import GestionnaireAssets
 from datetime import timedelta
 
 class MainController:
     def __init__(self):
-        self.db = DatabaseManager()
+        self.config = ConfigManager()
+        self.db = DatabaseManager(
+            self.config.get('db_file', 'bibliotheque.db'),
+            profil=self.config.get('storage_profile', 'desk'),
+            profils_personnalises=self.config.get('storage_profiles', {}),
+            cache_documents=self.config.get('cache_documents', 2000),
+            cache_utilisateurs=self.config.get('cache_utilisateurs', 500),
+            duree_cache=self.config.get('cache_ttl', 300)
+        )
         self.current_user = None
         self.session_manager = SessionManager()
         self.logger = LibraryLogger()
         self.main_window = None
-        self.config = ConfigManager()
         self.theme_manager = ThemeManager()
         self.error_handler = ErrorHandler(self.logger)
+        # Appels à la base depuis les vues, hors du thread de Tk
+        self.taches = GestionnaireTaches(self.config.get('threads_taches', 4))
+        # Dernière version du journal des modifications lue par une tâche de fond
+        self.version_modifications = None
+        # Images de l'interface, redimensionnées une fois et gardées en cache
+        self.assets = GestionnaireAssets()
+        
+        # Indiquer le profil de stockage actif au démarrage
+        self.logger.log_action('storage_profile', None, self.db.get_profil_stockage())
+        
+        # Tâches du premier démarrage de la journée : en arrière-plan, la
+        # fenêtre de connexion n'attend pas ces écritures
+        self.taches.soumettre(
+            self.taches_quotidiennes,
+            sur_erreur=lambda e: print(f"Erreur lors des tâches quotidiennes: {e}")
+        )
     
     def set_main_window(self, window):
         self.main_window = window
+        self.taches.attacher(window)
+    
+    def executer(self, fonction, *args, sur_resultat=None, sur_erreur=None, cle=None, widget=None):
+        """Exécute fonction(*args) en arrière-plan; voir GestionnaireTaches.soumettre"""
+        return self.taches.soumettre(fonction, *args, sur_resultat=sur_resultat,
+                                     sur_erreur=sur_erreur, cle=cle, widget=widget)
+    
+    def charger_image(self, nom, taille, sur_image, widget=None):
+        """Image du dossier image/ à la taille donnée, préparée en arrière-plan"""
+        self.assets.charger(nom, taille, sur_image, executer=self.executer, widget=widget)
+    
+    def annuler_tache(self, cle):
+        self.taches.annuler(cle)
+    
+    def fermer(self):
+        # Attendre les écritures soumises avant de fermer la base
+        self.taches.arreter(attendre=True)
+        self.db.fermer()
     
     def login(self, username, password):
         try:
@@ -68,10 +112,47 @@ class MainController:
     def get_all_documents(self):
         return self.db.get_all_documents()
     
-    def get_user_emprunts(self):
+    def get_documents_page(self, apres_id=0, limite=100, type_doc=None, titre=None, decalage=0):
+        return self.db.get_documents_page(apres_id, limite, type_doc, titre, decalage)
+    
+    def compter_documents(self, type_doc=None, titre=None):
+        return self.db.compter_documents(type_doc, titre)
+    
+    def get_documents_par_ids(self, ids):
+        return self.db.get_documents_par_ids(ids)
+    
+    def iter_documents(self, taille_lot=500, type_doc=None, titre=None):
+        return self.db.iter_documents(taille_lot, type_doc, titre)
+    
+    def get_user_emprunts(self, emprunt_ids=None):
         if not self.current_user:
             return []
-        return self.db.get_emprunts_utilisateur(self.current_user.id)
+        return self.db.get_emprunts_utilisateur(self.current_user.id, emprunt_ids)
+    
+    def get_version_modifications(self):
+        return self._noter_version(self.db.get_version_modifications())
+    
+    def get_modifications(self, depuis, tables):
+        version, modifications = self.db.get_modifications(depuis, tables)
+        self._noter_version(version)
+        return version, modifications
+    
+    def _noter_version(self, version):
+        # Lectures concurrentes : ne jamais revenir à une version plus ancienne
+        if version is not None and (self.version_modifications is None
+                                    or version > self.version_modifications):
+            self.version_modifications = version
+        return version
+    
+    def version_connue(self):
+        """Version du journal déjà lue, sans accès à la base (thread de Tk)"""
+        return self.version_modifications
+    
+    def verifier_version(self, sur_version, widget=None):
+        """Lit la version du journal en arrière-plan et la passe à sur_version"""
+        self.executer(self.get_version_modifications, sur_resultat=sur_version,
+                      sur_erreur=lambda e: print(f"Erreur lors de la lecture de la version des données: {e}"),
+                      widget=widget)
     
     def emprunter_document(self, doc_id):
         try:
@@ -119,6 +200,78 @@ class MainController:
     def get_all_users(self):
         return self.db.get_all_users()
     
+    def get_cache_stats(self):
+        return self.db.get_cache_stats()
+    
+    def get_statistiques(self):
+        if not self.current_user or not self.current_user.is_admin():
+            return None
+        return self.db.get_statistiques()
+    
+    def get_penalites_utilisateur(self):
+        if not self.current_user:
+            return {}
+        return self.db.get_penalites(self.current_user.id)
+    
+    def get_rapport_penalites(self):
+        if not self.current_user or not self.current_user.is_admin():
+            return []
+        return self.db.get_rapport_penalites()
+    
+    def taches_quotidiennes(self):
+        """Cumul des pénalités et purge du journal, une fois par jour"""
+        dernier = self.db.get_dernier_cumul_penalites()
+        if dernier is not None and dernier >= aujourd_hui():
+            return None
+        bilan = self.db.cumuler_penalites()
+        if bilan:
+            self.logger.log_action('penalites_cumulees', None, bilan)
+        # Le journal des modifications ne sert qu'aux rafraîchissements récents
+        self.db.purger_modifications()
+        return bilan
+    
+    def get_solde_utilisateur(self, user_id=None):
+        if not self.current_user:
+            return 0.0
+        if user_id is None or not self.current_user.is_admin():
+            user_id = self.current_user.id
+        return self.db.get_solde(user_id)
+    
+    def get_soldes(self, user_ids=None):
+        if not self.current_user or not self.current_user.is_admin():
+            return {}
+        return self.db.get_soldes(user_ids)
+    
+    def get_utilisateurs(self, user_ids):
+        if not self.current_user or not self.current_user.is_admin():
+            return []
+        return [user for user in map(self.db.get_utilisateur_by_id, sorted(user_ids)) if user]
+    
+    def get_releve_penalites(self, user_id=None):
+        if not self.current_user:
+            return []
+        if user_id is None or not self.current_user.is_admin():
+            user_id = self.current_user.id
+        return self.db.get_releve_penalites(user_id)
+    
+    def enregistrer_paiement(self, user_id, montant, commentaire=None):
+        if not self.current_user or not self.current_user.is_admin():
+            return False, "Accès non autorisé"
+        succes, message = self.db.enregistrer_paiement(user_id, montant, commentaire)
+        if succes:
+            self.logger.log_action('paiement_penalites', self.current_user.id,
+                                   {'utilisateur_id': user_id, 'montant': montant})
+        return succes, message
+    
+    def accorder_remise(self, user_id, montant, emprunt_id=None, commentaire=None):
+        if not self.current_user or not self.current_user.is_admin():
+            return False, "Accès non autorisé"
+        succes, message = self.db.accorder_remise(user_id, montant, emprunt_id, commentaire)
+        if succes:
+            self.logger.log_action('remise_penalites', self.current_user.id,
+                                   {'utilisateur_id': user_id, 'montant': montant})
+        return succes, message
+    
     def modifier_utilisateur(self, user_id, username, password=None, role=None):
         if not self.current_user or not self.current_user.is_admin():
             return False
@@ -134,6 +287,17 @@ class MainController:
             return False
         return self.db.modifier_document(doc_id, document)
     
+    def retourner_documents(self, codes):
+        if not self.current_user or not self.current_user.is_admin():
+            return [(code, False, "Accès non autorisé") for code in codes]
+        resultats = self.db.retourner_documents(codes)
+        self.logger.log_action(
+            'documents_retournes',
+            self.current_user.id,
+            {'codes': [code for code, succes, _ in resultats if succes]}
+        )
+        return resultats
+    
     def demander_emprunt(self, doc_id):
         if not self.current_user:
             return False, "Vous devez être connecté"
@@ -149,6 +313,11 @@ class MainController:
             return False, "Accès non autorisé"
         return self.db.traiter_demande_emprunt(demande_id, decision, commentaire)
     
+    def traiter_demandes_emprunt(self, demande_ids, decision, commentaire=""):
+        if not self.current_user or not self.current_user.is_admin():
+            return {d: (False, "Accès non autorisé") for d in demande_ids}
+        return self.db.traiter_demandes_emprunt(demande_ids, decision, commentaire)
+    
     def initialize_app(self, root):
         # Appliquer le thème initial
         theme = self.config.get('theme', 'light')
@@ -162,6 +331,9 @@ class MainController:
     def search_documents(self, criteria):
         return self.db.search_documents(criteria) 
     
+    def search_document_ids(self, criteria, limite=None, parmi=None, annulation=None):
+        return self.db.search_document_ids(criteria, limite, parmi, annulation)
+    
     def get_mes_demandes(self):
         if not self.current_user:
             return []
@@ -1,6 +1,7 @@
 import sqlite3
 from datetime import datetime
 import json
+from utils.tarification import Tarification
 
 class BibliothequeDB:
     def __init__(self, db_file="bibliotheque.db"):
@@ -135,17 +136,8 @@ class BibliothequeDB:
             if jours_retard <= 0:
                 return 0
             
-            # Calcul selon le type de document
-            if type_doc == 'livre':
-                return jours_retard * 1.0
-            elif type_doc == 'magazine':
-                return (jours_retard * 1.0) + 2.0
-            elif type_doc == 'journal':
-                return jours_retard * 1.0
-            elif type_doc == 'multimedia':
-                return (details['duree'] * 1.0) + (jours_retard * 2.0)
-            
-            return 0
+            # Barème commun (Tarification.BAREME)
+            return Tarification.penalite(type_doc, jours_retard, details.get('duree', 0))
         finally:
             conn.close() 
     
@@ -1,127 +1,294 @@
 import sqlite3
-from datetime import datetime, timedelta
+import re
+from datetime import datetime
 import json
-from models.document import Livre, Magazine, Journal, OuvrageMultimedia
+from models.document import document_depuis_ligne
 from models.utilisateur import Utilisateur
-from models.emprunt import Emprunt
+from models.emprunt import Emprunt, aujourd_hui, date_depuis_jour
 import hashlib
 from utils.tarification import Tarification
+from database.pool import ConnectionPool
+from database.migrations import appliquer_migrations
+from database.recherche import expression_fts, ordre_bm25
+from database.statistiques import lire_statistiques, reconstruire_statistiques
+from database.penalites import evaluer_penalites, cumuler_penalites, dernier_cumul
+from database.profils import PROFIL_PAR_DEFAUT, resoudre_profil, appliquer_profil, lire_pragmas
+from utils.cache import CacheLRU
+
+# Clé de la liste complète dans le cache des utilisateurs (get_all_users)
+TOUS_LES_UTILISATEURS = '*'
 
 class DatabaseManager:
-    def __init__(self, db_file="bibliotheque.db"):
+    def __init__(self, db_file="bibliotheque.db", profil=PROFIL_PAR_DEFAUT, profils_personnalises=None,
+                 cache_documents=2000, cache_utilisateurs=500, duree_cache=300.0):
         self.db_file = db_file
-        self.create_tables()
-        self.update_database_schema()
+        # Profil de stockage (pragmas) appliqué à chaque connexion ouverte
+        self.profil, self.pragmas = resoudre_profil(profil, profils_personnalises)
+        # Connexions persistantes réutilisées par toutes les méthodes
+        self.pool = ConnectionPool(db_file, initialiser=self._initialiser_connexion)
+        # Caches par id, invalidés par chaque écriture qui touche l'entité
+        self.cache_documents = CacheLRU(cache_documents, duree_cache)
+        self.cache_utilisateurs = CacheLRU(cache_utilisateurs, duree_cache)
+        self.migrer()
     
-    def create_tables(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
+    def _initialiser_connexion(self, conn):
+        appliquer_profil(conn, self.pragmas)
+    
+    def get_profil_stockage(self):
+        """Nom du profil actif et valeurs effectives des pragmas"""
+        conn = self.pool.acquerir()
         try:
-            # Table Utilisateurs
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS utilisateurs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                role TEXT NOT NULL DEFAULT 'utilisateur'
-            )''')
-            
-            # Vérifier si un admin existe déjà
-            cursor.execute('SELECT COUNT(*) FROM utilisateurs WHERE role = "administrateur"')
-            if cursor.fetchone()[0] == 0:
-                # Créer un admin par défaut (mot de passe: admin123)
-                admin_password = hashlib.sha256("admin123".encode()).hexdigest()
-                print(f"Création compte admin - Password hash: {admin_password}")  # Pour débogage
-                cursor.execute('''
-                    INSERT INTO utilisateurs (username, password, role)
-                    VALUES (?, ?, ?)
-                ''', ('admin', admin_password, 'administrateur'))
-                conn.commit()
-                print("Compte admin créé avec succès")
-            
-            # Table Documents avec quantité
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                type TEXT NOT NULL,
-                titre TEXT NOT NULL,
-                status TEXT DEFAULT 'disponible',
-                quantite INTEGER DEFAULT 1,
-                quantite_disponible INTEGER DEFAULT 1,
-                details TEXT NOT NULL
-            )''')
-            
-            # Table pour les demandes d'emprunt
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS demandes_emprunt (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                utilisateur_id INTEGER,
-                document_id INTEGER,
-                date_demande TEXT NOT NULL,
-                status TEXT DEFAULT 'en_attente',  -- en_attente, validee, refusee
-                commentaire TEXT,
-                FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
-                FOREIGN KEY (document_id) REFERENCES documents (id)
-            )''')
-            
-            # Table Emprunts
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emprunts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                utilisateur_id INTEGER,
-                document_id INTEGER,
-                date_emprunt TEXT NOT NULL,
-                date_retour TEXT,
-                date_retour_prevue TEXT,
-                FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
-                FOREIGN KEY (document_id) REFERENCES documents (id)
-            )''')
-            
+            return {'profil': self.profil, 'pragmas': lire_pragmas(conn)}
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_pool_stats(self):
+        """Statistiques du pool de connexions (hits, misses, reconnexions)"""
+        return self.pool.get_stats()
+    
+    def get_cache_stats(self):
+        """Statistiques des caches (hits, misses, évictions) pour les dimensionner"""
+        return {
+            'documents': self.cache_documents.get_stats(),
+            'utilisateurs': self.cache_utilisateurs.get_stats()
+        }
+    
+    def _invalider_utilisateur(self, user_id):
+        self.cache_utilisateurs.invalider(user_id, TOUS_LES_UTILISATEURS)
+    
+    def fermer(self):
+        """Ferme toutes les connexions ouvertes par le pool"""
+        self.pool.fermer()
+    
+    def execute_query(self, query, params=()):
+        """Exécute une requête de lecture et retourne toutes les lignes"""
+        conn = self.pool.acquerir()
+        try:
+            return conn.execute(query, params).fetchall()
+        finally:
+            self.pool.liberer(conn)
+    
+    def migrer(self):
+        """Met le schéma à jour (une seule lecture de PRAGMA user_version s'il est à jour)"""
+        conn = self.pool.acquerir()
+        try:
+            appliquer_migrations(conn)
+        finally:
+            self.pool.liberer(conn)
+
+    def get_statistiques(self):
+        """Compteurs du tableau de bord (table stats tenue par déclencheurs)"""
+        conn = self.pool.acquerir()
+        try:
+            return lire_statistiques(conn)
+        finally:
+            self.pool.liberer(conn)
+    
+    def reconstruire_statistiques(self):
+        """Recalcule la table stats depuis les tables (ex. après une correction manuelle)"""
+        conn = self.pool.acquerir()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            reconstruire_statistiques(conn.cursor())
             conn.commit()
-        except Exception as e:
-            print(f"Erreur lors de la création des tables: {str(e)}")
-            conn.rollback()
         finally:
-            conn.close() 
+            self.pool.liberer(conn)
+
+    def get_penalites(self, utilisateur_id):
+        """Pénalités de retard déjà facturées par emprunt : {emprunt_id: montant}"""
+        conn = self.pool.acquerir()
+        try:
+            return dict(conn.execute('''
+                SELECT pe.emprunt_id, pe.montant
+                FROM emprunts e
+                JOIN penalites_emprunts pe ON pe.emprunt_id = e.id
+                WHERE e.utilisateur_id = ? AND pe.montant > 0
+            ''', (utilisateur_id,)))
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_version_modifications(self):
+        """Dernière version du journal des modifications (0 s'il est vide)"""
+        conn = self.pool.acquerir()
+        try:
+            return conn.execute('SELECT COALESCE(MAX(id), 0) FROM journal_modifications').fetchone()[0]
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_modifications(self, depuis, tables):
+        """Clés modifiées après la version depuis : (version, {table: {clés}})
+
+        Retourne (version, None) si le journal a été purgé au-delà de depuis :
+        l'appelant doit alors tout relire.
+        """
+        conn = self.pool.acquerir()
+        try:
+            plus_ancienne, version = conn.execute(
+                'SELECT MIN(id), COALESCE(MAX(id), 0) FROM journal_modifications'
+            ).fetchone()
+            if plus_ancienne is None:
+                return depuis, {table: set() for table in tables}
+            if depuis < plus_ancienne - 1:
+                return version, None
+            modifications = {table: set() for table in tables}
+            for nom_table, cle in conn.execute('''
+                SELECT nom_table, cle FROM journal_modifications
+                WHERE id > ? AND id <= ? AND nom_table IN (SELECT value FROM json_each(?))
+            ''', (depuis, version, json.dumps(list(tables)))):
+                modifications[nom_table].add(cle)
+            return version, modifications
+        finally:
+            self.pool.liberer(conn)
+    
+    def purger_modifications(self, garder=50000):
+        """Ne garde que les garder dernières entrées du journal des modifications"""
+        conn = self.pool.acquerir()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('''
+                DELETE FROM journal_modifications
+                WHERE id <= (SELECT COALESCE(MAX(id), 0) FROM journal_modifications) - ?
+            ''', (garder,))
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            print(f"Erreur lors de la purge du journal des modifications: {e}")
+        finally:
+            self.pool.liberer(conn)
+    
+    def cumuler_penalites(self, jour=None):
+        """Cumul quotidien des pénalités de retard dans le registre
 
-    def update_database_schema(self):
-        """Met à jour le schéma de la base de données si nécessaire"""
-        conn = sqlite3.connect(self.db_file)
+        Retourne {'jour', 'emprunts', 'montant'}, ou None si un cumul plus
+        récent a déjà été fait.
+        """
+        jour = jour if jour is not None else aujourd_hui()
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            bilan = cumuler_penalites(cursor, jour)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            print(f"Erreur lors du cumul des pénalités: {e}")
+            return None
+        finally:
+            self.pool.liberer(conn)
+        if bilan is None:
+            return None
+        return {'jour': jour, 'emprunts': bilan[0], 'montant': bilan[1]}
+    
+    def get_dernier_cumul_penalites(self):
+        """Numéro du jour du dernier cumul des pénalités (None si jamais fait)"""
+        conn = self.pool.acquerir()
+        try:
+            return dernier_cumul(conn.cursor())
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_solde(self, utilisateur_id):
+        """Montant restant dû par l'utilisateur (tenu par déclencheur)"""
+        conn = self.pool.acquerir()
+        try:
+            row = conn.execute(
+                'SELECT solde FROM soldes WHERE utilisateur_id = ?', (utilisateur_id,)
+            ).fetchone()
+            return row[0] if row else 0.0
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_soldes(self, utilisateur_ids=None):
+        """Soldes non nuls : {utilisateur_id: solde} (seulement utilisateur_ids si donné)"""
+        conn = self.pool.acquerir()
+        try:
+            if utilisateur_ids is None:
+                return dict(conn.execute('SELECT utilisateur_id, solde FROM soldes WHERE solde <> 0'))
+            return dict(conn.execute('''
+                SELECT utilisateur_id, solde FROM soldes
+                WHERE utilisateur_id IN (SELECT value FROM json_each(?)) AND solde <> 0
+            ''', (json.dumps(sorted(utilisateur_ids)),)))
+        finally:
+            self.pool.liberer(conn)
+    
+    def get_releve_penalites(self, utilisateur_id, limite=100):
+        """Derniers mouvements du registre de l'utilisateur, du plus récent au plus ancien"""
+        conn = self.pool.acquerir()
+        try:
+            return [
+                {'id': row[0], 'emprunt_id': row[1], 'jour': date_depuis_jour(row[2]),
+                 'nature': row[3], 'montant': row[4], 'commentaire': row[5]}
+                for row in conn.execute('''
+                    SELECT id, emprunt_id, jour, nature, montant, commentaire
+                    FROM penalites
+                    WHERE utilisateur_id = ?
+                    ORDER BY id DESC
+                    LIMIT ?
+                ''', (utilisateur_id, limite))
+            ]
+        finally:
+            self.pool.liberer(conn)
+    
+    def _crediter_solde(self, utilisateur_id, nature, montant, emprunt_id=None, commentaire=None):
+        """Inscrit un paiement ou une remise (montant positif, plafonné au solde dû)"""
+        montant = round(montant, 2)
+        if montant <= 0:
+            return False, "Le montant doit être positif"
         
+        conn = self.pool.acquerir()
+        cursor = conn.cursor()
         try:
-            # Vérifier si la colonne date_retour_prevue existe
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT solde FROM soldes WHERE utilisateur_id = ?', (utilisateur_id,))
+            row = cursor.fetchone()
+            solde = row[0] if row else 0.0
+            if montant > solde:
+                conn.rollback()
+                return False, f"Le montant dépasse le solde dû ({solde:.2f}€)"
             cursor.execute('''
-                SELECT COUNT(*) FROM pragma_table_info('emprunts') 
-                WHERE name='date_retour_prevue'
-            ''')
-            
-            if cursor.fetchone()[0] == 0:
-                # Ajouter la colonne date_retour_prevue
-                cursor.execute('''
-                    ALTER TABLE emprunts 
-                    ADD COLUMN date_retour_prevue TEXT
-                ''')
-                
-                # Mettre à jour les emprunts existants avec une date de retour prévue
-                cursor.execute('''
-                    UPDATE emprunts 
-                    SET date_retour_prevue = date(date_emprunt, '+30 days')
-                    WHERE date_retour_prevue IS NULL
-                ''')
-                
-                conn.commit()
-                print("Schéma de la base de données mis à jour avec succès")
-        
-        except Exception as e:
-            print(f"Erreur lors de la mise à jour du schéma: {str(e)}")
-            conn.rollback()
+                INSERT INTO penalites (utilisateur_id, emprunt_id, jour, nature, montant, commentaire)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (utilisateur_id, emprunt_id, aujourd_hui(), nature, -montant, commentaire))
+            conn.commit()
+            return True, f"Nouveau solde : {solde - montant:.2f}€"
+        except sqlite3.OperationalError as e:
+            print(f"Erreur lors de l'inscription au registre des pénalités: {e}")
+            return False, "Base de données occupée, veuillez réessayer"
+        finally:
+            self.pool.liberer(conn)
+    
+    def enregistrer_paiement(self, utilisateur_id, montant, commentaire=None):
+        return self._crediter_solde(utilisateur_id, 'paiement', montant, commentaire=commentaire)
+    
+    def accorder_remise(self, utilisateur_id, montant, emprunt_id=None, commentaire=None):
+        return self._crediter_solde(utilisateur_id, 'remise', montant, emprunt_id, commentaire)
+    
+    def get_rapport_penalites(self, jour=None):
+        """Pénalités des emprunts en cours, par utilisateur (montant décroissant)"""
+        conn = self.pool.acquerir()
+        try:
+            lignes = evaluer_penalites(conn, jour, en_cours=True)
+            noms = dict(conn.execute(
+                'SELECT id, username FROM utilisateurs WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps(sorted({ligne[1] for ligne in lignes})),)
+            ))
         finally:
-            conn.close()
+            self.pool.liberer(conn)
+        
+        rapport = {}
+        for _, utilisateur_id, _, jours, montant in lignes:
+            entree = rapport.setdefault(utilisateur_id, {
+                'utilisateur_id': utilisateur_id,
+                'username': noms.get(utilisateur_id, '?'),
+                'emprunts_en_retard': 0,
+                'jours_retard_max': 0,
+                'montant': 0.0
+            })
+            entree['emprunts_en_retard'] += 1
+            entree['jours_retard_max'] = max(entree['jours_retard_max'], jours)
+            entree['montant'] = round(entree['montant'] + montant, 2)
+        return sorted(rapport.values(), key=lambda e: e['montant'], reverse=True)
 
     def ajouter_utilisateur(self, username, password, role="utilisateur"):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -129,12 +296,13 @@ class DatabaseManager:
                 (username, password, role)
             )
             conn.commit()
+            self.cache_utilisateurs.invalider(TOUS_LES_UTILISATEURS)
             return Utilisateur(cursor.lastrowid, username, password, role)
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def get_utilisateur(self, username, password):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Ajout de logs pour le débogage
@@ -152,54 +320,25 @@ class DatabaseManager:
                     return Utilisateur(stored_id, stored_username, stored_password, stored_role)
             return None
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def ajouter_document(self, document):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
-            # Vérifier si un document avec le même titre existe déjà
+            type_doc = document.TYPE
+            
+            # Vérifier si un document avec le même titre existe déjà (idx_documents_titre_type)
             cursor.execute('''
                 SELECT id FROM documents 
                 WHERE LOWER(titre) = LOWER(?) AND type = ?
-            ''', (document.titre, document.__class__.__name__.lower()))
+            ''', (document.titre, type_doc))
             
             if cursor.fetchone():
                 print(f"Un document avec le titre '{document.titre}' existe déjà")
                 return None
             
-            # Déterminer le type de document et normaliser le type pour les multimédias
-            type_doc = document.__class__.__name__.lower()
-            if type_doc == 'ouvrageMultimedia'.lower():
-                type_doc = 'multimedia'  # Normaliser le type pour la base de données
-            
-            # Préparer les détails selon le type de document
-            details = {}
-            if type_doc == 'livre':
-                details = {
-                    'auteur': document._auteur,
-                    'nb_pages': document._nb_pages,
-                    'genre': document._genre,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'magazine':
-                details = {
-                    'editeur': document._editeur,
-                    'frequence': document._frequence,
-                    'numero': document._numero,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'journal':
-                details = {
-                    'editeur': document._editeur,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'multimedia':  # Utiliser le type normalisé
-                details = {
-                    'type_media': document._type_media,
-                    'duree': document._duree,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
+            details = document.details_stockage()
             
             # Insérer le document
             cursor.execute('''
@@ -216,6 +355,7 @@ class DatabaseManager:
             
             conn.commit()
             document._id = cursor.lastrowid
+            self.cache_documents.invalider(document.id)
             return document
             
         except Exception as e:
@@ -223,10 +363,18 @@ class DatabaseManager:
             conn.rollback()
             return None
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def get_document(self, doc_id):
-        conn = sqlite3.connect(self.db_file)
+        # Le cache garde la ligne : chaque appel reçoit son propre Document
+        result = self.cache_documents.obtenir(doc_id, self._charger_document)
+        if result:
+            type_doc, titre, status, details = result
+            return document_depuis_ligne(type_doc, doc_id, titre, status, details)
+        return None
+
+    def _charger_document(self, doc_id):
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('''
@@ -238,281 +386,226 @@ class DatabaseManager:
             result = cursor.fetchone()
             if not result:
                 print(f"Document introuvable avec l'ID {doc_id}")
-                return None
-            
-            type_doc, titre, status, details = result
-            details = json.loads(details)
-            
-            # Convertir la date_publication
-            try:
-                date_publication = datetime.strptime(
-                    details.get('date_publication', datetime.now().strftime('%Y-%m-%d')),
-                    '%Y-%m-%d'
-                )
-            except (ValueError, TypeError):
-                date_publication = datetime.now()
-            
-            print(f"Type de document trouvé: {type_doc}")  # Debug
-            
-            if type_doc == 'livre':
-                return Livre(
-                    doc_id, titre,
-                    details.get('auteur', ''),
-                    int(details.get('nb_pages', 0)),
-                    details.get('genre', ''),
-                    date_publication,
-                    status
-                )
-            elif type_doc == 'magazine':
-                return Magazine(
-                    doc_id, titre,
-                    details.get('editeur', ''),
-                    details.get('frequence', ''),
-                    details.get('numero', ''),
-                    date_publication,
-                    status
-                )
-            elif type_doc == 'journal':
-                return Journal(
-                    doc_id, titre,
-                    details.get('editeur', ''),
-                    date_publication,
-                    status
-                )
-            elif type_doc == 'multimedia':  # Changé de 'ouvrageMultimedia' à 'multimedia'
-                return OuvrageMultimedia(
-                    doc_id, titre,
-                    details.get('type_media', ''),
-                    int(details.get('duree', 0)),
-                    date_publication,
-                    status
-                )
-            else:
-                print(f"Type de document non reconnu: {type_doc}")
-                return None
+            return result
         except Exception as e:
             print(f"Erreur lors de la récupération du document: {str(e)}")
             return None
         finally:
-            conn.close()
+            self.pool.liberer(conn)
+
+    def _reserver_exemplaire(self, cursor, doc_id):
+        """Réserve un exemplaire : vérifie et décrémente en une seule instruction
+
+        A appeler dans une transaction BEGIN IMMEDIATE. Retourne la quantité
+        restante, ou None si aucun exemplaire n'est disponible.
+        """
+        cursor.execute('''
+            UPDATE documents
+            SET quantite_disponible = quantite_disponible - 1
+            WHERE id = ? AND quantite_disponible > 0
+            RETURNING quantite_disponible
+        ''', (doc_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _inserer_emprunt(self, cursor, utilisateur_id, doc_id):
+        date_emprunt = aujourd_hui()
+        date_retour_prevue = date_emprunt + Tarification.DUREE_EMPRUNT
+        cursor.execute('''
+            INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt, date_retour_prevue)
+            VALUES (?, ?, ?, ?)
+        ''', (utilisateur_id, doc_id, date_emprunt, date_retour_prevue))
 
     def creer_emprunt(self, utilisateur_id, doc_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
-            # Vérifier la disponibilité
-            cursor.execute('''
-                SELECT quantite_disponible FROM documents WHERE id = ?
-            ''', (doc_id,))
-            if cursor.fetchone()[0] <= 0:
+            # Verrou d'écriture pris dès le début : deux postes ne peuvent pas
+            # réserver le même dernier exemplaire
+            cursor.execute('BEGIN IMMEDIATE')
+            if self._reserver_exemplaire(cursor, doc_id) is None:
+                conn.rollback()
                 return False
             
-            # Créer l'emprunt
-            date_emprunt = datetime.now().strftime('%Y-%m-%d')
-            date_retour_prevue = (datetime.now() + timedelta(days=Tarification.DUREE_EMPRUNT)).strftime('%Y-%m-%d')
-            
-            cursor.execute('''
-                INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt, date_retour_prevue)
-                VALUES (?, ?, ?, ?)
-            ''', (utilisateur_id, doc_id, date_emprunt, date_retour_prevue))
-            
-            # Mettre à jour la quantité disponible
-            cursor.execute('''
-                UPDATE documents 
-                SET quantite_disponible = quantite_disponible - 1
-                WHERE id = ?
-            ''', (doc_id,))
-            
+            self._inserer_emprunt(cursor, utilisateur_id, doc_id)
             conn.commit()
+            self.cache_documents.invalider(doc_id)
             return True
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
-    def get_emprunts_utilisateur(self, user_id):
-        conn = sqlite3.connect(self.db_file)
+    def get_emprunts_utilisateur(self, user_id, emprunt_ids=None):
+        """Emprunts de l'utilisateur, les plus récents d'abord (seulement emprunt_ids si donné)"""
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         
         try:
-            cursor.execute('''
+            query = '''
                 SELECT e.id, e.document_id, e.date_emprunt, e.date_retour, e.date_retour_prevue,
                        d.type, d.titre, d.details, d.status
                 FROM emprunts e
                 JOIN documents d ON e.document_id = d.id
                 WHERE e.utilisateur_id = ?
-                ORDER BY e.date_emprunt DESC
-            ''', (user_id,))
+            '''
+            params = [user_id]
+            if emprunt_ids is not None:
+                query += " AND e.id IN (SELECT value FROM json_each(?))"
+                params.append(json.dumps(sorted(emprunt_ids)))
+            cursor.execute(query + " ORDER BY e.date_emprunt DESC", params)
             
             emprunts = []
             for row in cursor.fetchall():
                 emprunt_id, doc_id, date_emprunt, date_retour, date_retour_prevue, doc_type, titre, details_json, status = row
-                details = json.loads(details_json)
+                document = document_depuis_ligne(doc_type, doc_id, titre, status, details_json)
                 
-                # Créer le document selon son type
-                if doc_type.lower() == 'livre':
-                    document = Livre(
-                        id=doc_id,
-                        titre=titre,
-                        auteur=details.get('auteur', ''),
-                        nb_pages=details.get('nb_pages', 0),
-                        genre=details.get('genre', ''),
-                        date_publication=datetime.strptime(details.get('date_publication', '2000-01-01'), '%Y-%m-%d'),
-                        status=status
-                    )
-                elif doc_type.lower() == 'magazine':
-                    document = Magazine(
-                        id=doc_id,
-                        titre=titre,
-                        editeur=details.get('editeur', ''),
-                        frequence=details.get('frequence', ''),
-                        numero=details.get('numero', ''),
-                        date_publication=datetime.strptime(details.get('date_publication', '2000-01-01'), '%Y-%m-%d'),
-                        status=status
-                    )
-                elif doc_type.lower() == 'journal':
-                    document = Journal(
-                        id=doc_id,
-                        titre=titre,
-                        editeur=details.get('editeur', ''),
-                        date_publication=datetime.strptime(details.get('date_publication', '2000-01-01'), '%Y-%m-%d'),
-                        status=status
-                    )
-                else:  # multimedia
-                    document = OuvrageMultimedia(
-                        id=doc_id,
-                        titre=titre,
-                        type_media=details.get('type_media', ''),
-                        duree=details.get('duree', 0),
-                        date_publication=datetime.strptime(details.get('date_publication', '2000-01-01'), '%Y-%m-%d'),
-                        status=status
-                    )
-                
-                # Créer l'emprunt avec toutes les dates
-                emprunt = Emprunt(
-                    id=emprunt_id,
-                    document=document,
-                    date_emprunt=datetime.strptime(date_emprunt, '%Y-%m-%d'),
-                    date_retour=datetime.strptime(date_retour, '%Y-%m-%d') if date_retour else None,
-                    date_retour_prevue=datetime.strptime(date_retour_prevue, '%Y-%m-%d') if date_retour_prevue else None
-                )
-                emprunts.append(emprunt)
+                # Dates stockées en numéros de jour : aucune analyse de chaîne
+                emprunts.append(Emprunt.depuis_ligne(
+                    emprunt_id, document, date_emprunt, date_retour, date_retour_prevue
+                ))
             
             return emprunts
         
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
-    def get_all_documents(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def get_documents_page(self, apres_id=0, limite=100, type_doc=None, titre=None, decalage=0):
+        """Page du catalogue triée par id, après apres_id (pagination par clé)
+
+        Retourne (documents, dernier_id, suite) : dernier_id est l'id de la
+        dernière ligne lue (à passer en apres_id pour la page suivante),
+        suite indique qu'une page pleine a été lue. decalage saute ce nombre
+        de lignes après apres_id (saut depuis le curseur connu le plus proche).
+        """
+        return self._lire_page_documents(apres_id, limite, type_doc, titre, decalage)
+
+    def _filtre_documents(self, type_doc, titre):
+        conditions, params = [], []
+        if type_doc:
+            conditions.append("type = ?")
+            params.append(type_doc)
+        if titre:
+            conditions.append("LOWER(titre) LIKE LOWER(?)")
+            params.append(f"%{titre}%")
+        return conditions, params
+
+    def _lire_page_documents(self, apres_id, limite, type_doc=None, titre=None, decalage=0):
+        conditions, params = self._filtre_documents(type_doc, titre)
+        query = f"""
+            SELECT id, type, titre, details, quantite_disponible
+            FROM documents
+            WHERE {' AND '.join(['id > ?'] + conditions)}
+            ORDER BY id LIMIT ? OFFSET ?
+        """
+        conn = self.pool.acquerir()
         try:
-            cursor.execute('''
-                SELECT DISTINCT d.id, d.type, d.titre, d.status, d.details, 
-                       d.quantite, d.quantite_disponible 
-                FROM documents d
-                GROUP BY d.id  -- Grouper par ID pour éviter les doublons
-            ''')
-            documents = []
-            seen_ids = set()  # Pour suivre les IDs déjà traités
-            
-            for row in cursor.fetchall():
-                doc_id, type_doc, titre, status, details, quantite, quantite_disponible = row
-                
-                # Éviter les doublons
-                if doc_id in seen_ids:
-                    continue
-                seen_ids.add(doc_id)
-                
-                details = json.loads(details)
-                status = 'disponible' if quantite_disponible > 0 else 'indisponible'
-                
-                try:
-                    date_publication = datetime.strptime(
-                        details.get('date_publication', datetime.now().strftime('%Y-%m-%d')),
-                        '%Y-%m-%d'
-                    )
-                except (ValueError, TypeError):
-                    date_publication = datetime.now()
-                
-                doc = None
-                if type_doc == 'livre':
-                    doc = Livre(
-                        doc_id, titre,
-                        details.get('auteur', ''),
-                        int(details.get('nb_pages', 0)),
-                        details.get('genre', ''),
-                        date_publication,
-                        status
-                    )
-                elif type_doc == 'magazine':
-                    doc = Magazine(
-                        doc_id, titre,
-                        details.get('editeur', ''),
-                        details.get('frequence', ''),
-                        details.get('numero', ''),
-                        date_publication,
-                        status
-                    )
-                elif type_doc == 'journal':
-                    doc = Journal(
-                        doc_id, titre,
-                        details.get('editeur', ''),
-                        date_publication,
-                        status
-                    )
-                elif type_doc == 'multimedia':  # Type normalisé
-                    doc = OuvrageMultimedia(
-                        doc_id, titre,
-                        details.get('type_media', ''),
-                        int(details.get('duree', 0)),
-                        date_publication,
-                        status
-                    )
-                
-                if doc:  # Ajouter seulement si un document valide a été créé
-                    documents.append(doc)
-                
-            return documents
+            rows = conn.execute(query, [apres_id] + params + [limite, decalage]).fetchall()
+        finally:
+            self.pool.liberer(conn)
+        
+        documents = []
+        for doc_id, type_doc, titre, details, quantite_disponible in rows:
+            status = 'disponible' if quantite_disponible > 0 else 'indisponible'
+            doc = document_depuis_ligne(type_doc, doc_id, titre, status, details)
+            if doc:  # Ajouter seulement si un document valide a été créé
+                documents.append(doc)
+        # Le dernier id lu sert de curseur, même si la ligne n'a pas pu être hydratée
+        dernier_id = rows[-1][0] if rows else None
+        return documents, dernier_id, len(rows) == limite
+
+    def compter_documents(self, type_doc=None, titre=None):
+        """Nombre de documents du catalogue (taille des listes virtuelles)"""
+        conditions, params = self._filtre_documents(type_doc, titre)
+        query = "SELECT COUNT(*) FROM documents"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        conn = self.pool.acquerir()
+        try:
+            return conn.execute(query, params).fetchone()[0]
+        finally:
+            self.pool.liberer(conn)
+
+    def get_documents_par_ids(self, ids):
+        """Documents des ids donnés, dans le même ordre (ids disparus ignorés)"""
+        conn = self.pool.acquerir()
+        try:
+            rows = conn.execute("""
+                SELECT id, type, titre, details, quantite_disponible
+                FROM documents
+                WHERE id IN (SELECT value FROM json_each(?))
+            """, (json.dumps(list(ids)),)).fetchall()
         finally:
-            conn.close()
+            self.pool.liberer(conn)
+        
+        par_id = {}
+        for doc_id, type_doc, titre, details, quantite_disponible in rows:
+            status = 'disponible' if quantite_disponible > 0 else 'indisponible'
+            doc = document_depuis_ligne(type_doc, doc_id, titre, status, details)
+            if doc:
+                par_id[doc_id] = doc
+        return [par_id[doc_id] for doc_id in ids if doc_id in par_id]
+
+    def iter_documents(self, taille_lot=500, type_doc=None, titre=None):
+        """Parcourt le catalogue par lots sans le charger entièrement en mémoire"""
+        apres_id = 0
+        while True:
+            documents, dernier_id, suite = self._lire_page_documents(
+                apres_id, taille_lot, type_doc, titre
+            )
+            yield from documents
+            if not suite:
+                return
+            apres_id = dernier_id
+
+    def get_all_documents(self):
+        return list(self.iter_documents())
 
     def get_utilisateur_by_id(self, user_id):
-        conn = sqlite3.connect(self.db_file)
+        # Le cache garde la ligne : chaque appel reçoit son propre Utilisateur
+        result = self.cache_utilisateurs.obtenir(user_id, self._charger_utilisateur)
+        if result:
+            return Utilisateur(*result)
+        return None
+
+    def _charger_utilisateur(self, user_id):
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute(
                 'SELECT id, username, password, role FROM utilisateurs WHERE id = ?',
                 (user_id,)
             )
-            result = cursor.fetchone()
-            if result:
-                return Utilisateur(*result)
-            return None
+            return cursor.fetchone()
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def supprimer_document(self, doc_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('DELETE FROM documents WHERE id = ?', (doc_id,))
             conn.commit()
+            self.cache_documents.invalider(doc_id)
             return True
         except:
             return False
         finally:
-            conn.close() 
+            self.pool.liberer(conn) 
 
     def get_all_users(self):
-        conn = sqlite3.connect(self.db_file)
+        rows = self.cache_utilisateurs.obtenir(TOUS_LES_UTILISATEURS, self._charger_utilisateurs)
+        return [Utilisateur(*row) for row in rows]
+
+    def _charger_utilisateurs(self, cle):
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('SELECT id, username, password, role FROM utilisateurs')
-            return [Utilisateur(*row) for row in cursor.fetchall()]
+            return cursor.fetchall()
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def modifier_utilisateur(self, user_id, username, password=None, role=None):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Vérifier si le username existe déjà pour un autre utilisateur
@@ -547,14 +640,15 @@ class DatabaseManager:
                 ''', (username, user_id))
             
             conn.commit()
+            self._invalider_utilisateur(user_id)
             return True
         except:
             return False
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def supprimer_utilisateur(self, user_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Vérifier s'il y a des emprunts en cours
@@ -567,14 +661,15 @@ class DatabaseManager:
             
             cursor.execute('DELETE FROM utilisateurs WHERE id = ?', (user_id,))
             conn.commit()
+            self._invalider_utilisateur(user_id)
             return True
         except:
             return False
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def retourner_document(self, doc_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Vérifier si le document est emprunté
@@ -589,7 +684,7 @@ class DatabaseManager:
                 return False
             
             # Mettre à jour la date de retour
-            date_retour = datetime.now().strftime('%Y-%m-%d')
+            date_retour = aujourd_hui()
             cursor.execute('''
                 UPDATE emprunts 
                 SET date_retour = ? 
@@ -605,6 +700,7 @@ class DatabaseManager:
             ''', (doc_id,))
             
             conn.commit()
+            self.cache_documents.invalider(doc_id)
             print(f"Document {doc_id} retourné avec succès")
             return True
             
@@ -613,10 +709,85 @@ class DatabaseManager:
             conn.rollback()
             return False
         finally:
-            conn.close()
+            self.pool.liberer(conn)
+
+    def retourner_documents(self, codes):
+        """Retour en lot (boîte de retour) : une transaction pour tous les codes
+
+        Chaque code (id du document, éventuellement préfixé, ex. « DOC-000123 »)
+        ferme l'emprunt ouvert le plus ancien de ce document; un document scanné
+        deux fois ferme deux emprunts. Retourne [(code, succes, message)] dans
+        l'ordre des codes reçus.
+        """
+        resultats = []
+        scans = []
+        for code in codes:
+            chiffres = re.search(r'\d+', str(code))
+            if chiffres:
+                scans.append(int(chiffres.group()))
+            resultats.append([code, int(chiffres.group()) if chiffres else None])
+        if not scans:
+            return [(code, False, "Code illisible") for code, _ in resultats]
+        
+        conn = self.pool.acquerir()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Apparier le n-ième scan d'un document avec son n-ième emprunt ouvert
+            cursor.execute('''
+                WITH scans AS (
+                    SELECT value AS document_id,
+                           ROW_NUMBER() OVER (PARTITION BY value ORDER BY key) AS rang
+                    FROM json_each(?)
+                ),
+                ouverts AS (
+                    SELECT id, document_id,
+                           ROW_NUMBER() OVER (PARTITION BY document_id ORDER BY date_emprunt, id) AS rang
+                    FROM emprunts
+                    WHERE date_retour IS NULL
+                      AND document_id IN (SELECT document_id FROM scans)
+                )
+                UPDATE emprunts SET date_retour = ?
+                FROM ouverts JOIN scans USING (document_id, rang)
+                WHERE emprunts.id = ouverts.id
+                RETURNING emprunts.document_id
+            ''', (json.dumps(scans), aujourd_hui()))
+            retournes = [row[0] for row in cursor.fetchall()]
+            
+            cursor.execute('''
+                UPDATE documents
+                SET status = 'disponible',
+                    quantite_disponible = quantite_disponible + r.nombre
+                FROM (SELECT value AS document_id, COUNT(*) AS nombre
+                      FROM json_each(?) GROUP BY value) AS r
+                WHERE documents.id = r.document_id
+            ''', (json.dumps(retournes),))
+            conn.commit()
+            self.cache_documents.invalider(*set(retournes))
+        except sqlite3.Error as e:
+            print(f"Erreur lors du retour des documents: {e}")
+            conn.rollback()
+            return [(code, False, "Erreur lors du retour") for code, _ in resultats]
+        finally:
+            self.pool.liberer(conn)
+        
+        # Les premiers scans de chaque document sont ceux qui ont été appariés
+        restants = {}
+        for doc_id in retournes:
+            restants[doc_id] = restants.get(doc_id, 0) + 1
+        bilan = []
+        for code, doc_id in resultats:
+            if doc_id is None:
+                bilan.append((code, False, "Code illisible"))
+            elif restants.get(doc_id, 0) > 0:
+                restants[doc_id] -= 1
+                bilan.append((code, True, f"Document {doc_id} retourné"))
+            else:
+                bilan.append((code, False, f"Aucun emprunt en cours pour le document {doc_id}"))
+        return bilan
 
     def modifier_document(self, doc_id, document):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Vérifier si le document existe
@@ -625,38 +796,8 @@ class DatabaseManager:
                 print(f"Document avec l'ID {doc_id} introuvable")
                 return False
 
-            # Normaliser le type pour les documents multimédias
-            type_doc = document.__class__.__name__.lower()
-            if type_doc == 'ouvrageMultimedia'.lower():
-                type_doc = 'multimedia'
-            
-            # Préparer les détails selon le type
-            details = {}
-            if type_doc == 'livre':
-                details = {
-                    'auteur': document._auteur,
-                    'nb_pages': document._nb_pages,
-                    'genre': document._genre,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'magazine':
-                details = {
-                    'editeur': document._editeur,
-                    'frequence': document._frequence,
-                    'numero': document._numero,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'journal':
-                details = {
-                    'editeur': document._editeur,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
-            elif type_doc == 'multimedia':
-                details = {
-                    'type_media': document._type_media,
-                    'duree': document._duree,
-                    'date_publication': document._date_publication.strftime('%Y-%m-%d')
-                }
+            type_doc = document.TYPE
+            details = document.details_stockage()
             
             # Mettre à jour le document existant
             cursor.execute('''
@@ -679,6 +820,7 @@ class DatabaseManager:
                 return False
             
             conn.commit()
+            self.cache_documents.invalider(doc_id)
             print(f"Document {doc_id} modifié avec succès")
             return True
             
@@ -687,10 +829,10 @@ class DatabaseManager:
             conn.rollback()
             return False
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def creer_demande_emprunt(self, utilisateur_id, document_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Vérifier la disponibilité
@@ -724,10 +866,10 @@ class DatabaseManager:
             conn.commit()
             return True, "Demande d'emprunt créée avec succès"
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def get_demandes_emprunt(self, status='en_attente'):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('''
@@ -740,59 +882,99 @@ class DatabaseManager:
             ''', (status,))
             return cursor.fetchall()
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def traiter_demande_emprunt(self, demande_id, decision, commentaire=""):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
-            # Récupérer les informations de la demande
+            cursor.execute('BEGIN IMMEDIATE')
+            # Prendre la demande : un seul poste peut la faire sortir de l'attente
             cursor.execute('''
-                SELECT utilisateur_id, document_id FROM demandes_emprunt
+                UPDATE demandes_emprunt
+                SET status = ?, commentaire = ?
                 WHERE id = ? AND status = 'en_attente'
-            ''', (demande_id,))
+                RETURNING utilisateur_id, document_id
+            ''', (decision, commentaire, demande_id))
             result = cursor.fetchone()
             if not result:
+                conn.rollback()
                 return False, "Demande introuvable ou déjà traitée"
             
             utilisateur_id, document_id = result
             
             if decision == 'validee':
-                # Vérifier la disponibilité
-                cursor.execute('''
-                    SELECT quantite_disponible FROM documents WHERE id = ?
-                ''', (document_id,))
-                if cursor.fetchone()[0] <= 0:
+                if self._reserver_exemplaire(cursor, document_id) is None:
+                    # La demande reste en attente
+                    conn.rollback()
                     return False, "Document non disponible"
-                
-                # Créer l'emprunt
-                date_emprunt = datetime.now().strftime('%Y-%m-%d')
-                cursor.execute('''
-                    INSERT INTO emprunts (utilisateur_id, document_id, date_emprunt)
-                    VALUES (?, ?, ?)
-                ''', (utilisateur_id, document_id, date_emprunt))
-                
-                # Mettre à jour la quantité disponible
-                cursor.execute('''
-                    UPDATE documents 
-                    SET quantite_disponible = quantite_disponible - 1
-                    WHERE id = ?
-                ''', (document_id,))
+                self._inserer_emprunt(cursor, utilisateur_id, document_id)
             
-            # Mettre à jour le statut de la demande
+            conn.commit()
+            self.cache_documents.invalider(document_id)
+            return True, "Demande traitée avec succès"
+        except sqlite3.OperationalError as e:
+            print(f"Erreur lors du traitement de la demande: {e}")
+            return False, "Base de données occupée, veuillez réessayer"
+        finally:
+            self.pool.liberer(conn) 
+
+    def traiter_demandes_emprunt(self, demande_ids, decision, commentaire=""):
+        """Valide ou refuse plusieurs demandes dans une seule transaction
+
+        Les exemplaires sont attribués dans l'ordre des demandes (date, puis id).
+        Retourne {demande_id: (succes, message)} pour chaque id reçu.
+        """
+        demande_ids = list(dict.fromkeys(demande_ids))
+        resultats = {d: (False, "Demande introuvable ou déjà traitée") for d in demande_ids}
+        if not demande_ids:
+            return resultats
+        
+        conn = self.pool.acquerir()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
             cursor.execute('''
+                SELECT id, utilisateur_id, document_id FROM demandes_emprunt
+                WHERE id IN (SELECT value FROM json_each(?)) AND status = 'en_attente'
+                ORDER BY date_demande, id
+            ''', (json.dumps(demande_ids),))
+            demandes = cursor.fetchall()
+            
+            acceptees = demandes
+            if decision == 'validee':
+                # Même réservation que traiter_demande_emprunt et creer_emprunt :
+                # le stock est vérifié et décrémenté par une seule instruction
+                acceptees = []
+                for demande in demandes:
+                    demande_id, utilisateur_id, document_id = demande
+                    if self._reserver_exemplaire(cursor, document_id) is None:
+                        # La demande reste en attente
+                        resultats[demande_id] = (False, "Document non disponible")
+                        continue
+                    self._inserer_emprunt(cursor, utilisateur_id, document_id)
+                    acceptees.append(demande)
+            
+            cursor.executemany('''
                 UPDATE demandes_emprunt
                 SET status = ?, commentaire = ?
                 WHERE id = ?
-            ''', (decision, commentaire, demande_id))
+            ''', [(decision, commentaire, d[0]) for d in acceptees])
             
             conn.commit()
-            return True, "Demande traitée avec succès"
+            self.cache_documents.invalider(*{d[2] for d in acceptees})
+            for demande in acceptees:
+                resultats[demande[0]] = (True, "Demande traitée avec succès")
+            return resultats
+        except sqlite3.Error as e:
+            print(f"Erreur lors du traitement des demandes: {e}")
+            conn.rollback()
+            return {d: (False, "Erreur lors du traitement des demandes") for d in demande_ids}
         finally:
-            conn.close() 
+            self.pool.liberer(conn)
 
     def verifier_disponibilite(self, doc_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('''
@@ -810,98 +992,99 @@ class DatabaseManager:
             
             return True, "Document disponible"
         finally:
-            conn.close() 
+            self.pool.liberer(conn) 
 
-    def search_documents(self, criteria):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        try:
-            query = """
-                SELECT id, type, titre, status, details
-                FROM documents
+    def _requete_recherche(self, criteria, colonnes, parmi=None, limite=None):
+        """Requête (sql, params) de search_documents pour les colonnes demandées
+
+        parmi restreint la recherche à une liste d'ids (résultats d'une
+        recherche que celle-ci affine), limite au nombre de lignes retournées.
+        """
+        params = []
+        
+        # Titre, auteur, éditeur, genre et texte libre : index plein texte,
+        # résultats classés par pertinence (bm25)
+        match = expression_fts(criteria)
+        if match:
+            query = f"""
+                SELECT {colonnes}
+                FROM documents_fts
+                JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+            """
+            params.append(match)
+        else:
+            query = f"""
+                SELECT {colonnes}
+                FROM documents d
                 WHERE 1=1
             """
-            params = []
-            
-            if criteria.get('titre'):
-                query += " AND LOWER(titre) LIKE LOWER(?)"
-                params.append(f"%{criteria['titre']}%")
-            
-            if criteria.get('type'):
-                query += " AND LOWER(type) = LOWER(?)"
-                params.append(criteria['type'].lower())
-            
-            if criteria.get('auteur'):
-                query += " AND json_extract(details, '$.auteur') LIKE ?"
-                params.append(f"%{criteria['auteur']}%")
-            
-            if criteria.get('editeur'):
-                query += " AND json_extract(details, '$.editeur') LIKE ?"
-                params.append(f"%{criteria['editeur']}%")
-            
-            if criteria.get('date_debut'):
-                query += " AND json_extract(details, '$.date_publication') >= ?"
-                params.append(criteria['date_debut'])
-            
-            if criteria.get('date_fin'):
-                query += " AND json_extract(details, '$.date_publication') <= ?"
-                params.append(criteria['date_fin'])
             
+        # Affinage : seuls les résultats précédents sont vérifiés (recherche par rowid dans l'index)
+        if parmi is not None:
+            query += f" AND {'documents_fts.rowid' if match else 'd.id'} IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(parmi)))
+        
+        if criteria.get('type'):
+            query += " AND LOWER(d.type) = LOWER(?)"
+            params.append(criteria['type'].lower())
+        
+        # Intervalle de dates : parcours d'intervalle sur idx_documents_date_publication
+        if criteria.get('date_debut'):
+            query += " AND d.date_publication >= ?"
+            params.append(criteria['date_debut'])
+        
+        if criteria.get('date_fin'):
+            query += " AND d.date_publication <= ?"
+            params.append(criteria['date_fin'])
+        
+        query += f" ORDER BY {ordre_bm25()}" if match else " ORDER BY d.titre"
+        if limite is not None:
+            query += " LIMIT ?"
+            params.append(limite)
+        return query, params
+
+    def search_documents(self, criteria):
+        conn = self.pool.acquerir()
+        cursor = conn.cursor()
+        try:
+            query, params = self._requete_recherche(criteria, "d.id, d.type, d.titre, d.status, d.details")
             cursor.execute(query, params)
             documents = []
             
             for row in cursor.fetchall():
                 doc_id, type_doc, titre, status, details = row
-                details = json.loads(details)
-                
-                 # Récupérer date_publication depuis les détails
-            date_publication = details.get('date_publication', None)
-            if date_publication:
-                # Convertir en objet datetime si c'est une chaîne
-                date_publication = datetime.strptime(date_publication, '%Y-%m-%d')
-                
-                if type_doc == 'livre':
-                    doc = Livre(
-                        doc_id, titre,
-                        details.get('auteur', ''),
-                        int(details.get('nb_pages', 0)),
-                        details.get('genre', ''),
-                        details.get('date_publication', ''),
-                        status
-                    )
-                elif type_doc == 'magazine':
-                    doc = Magazine(
-                        doc_id, titre,
-                        details.get('editeur', ''),
-                        details.get('frequence', ''),
-                        details.get('numero', ''),
-                        details.get('date_publication', ''),
-                        status
-                    )
-                elif type_doc == 'journal':
-                    doc = Journal(
-                        doc_id, titre,
-                        details.get('editeur', ''),
-                        date_publication,
-                        status
-                    )
-                elif type_doc == 'multimedia':
-                    doc = OuvrageMultimedia(
-                        doc_id, titre,
-                        details.get('type_media', ''),
-                        int(details.get('duree', 0)),
-                        date_publication,
-                        status
-                    )
-                
-                documents.append(doc)
+                doc = document_depuis_ligne(type_doc, doc_id, titre, status, details)
+                if doc:
+                    documents.append(doc)
             
             return documents
         finally:
-            conn.close() 
+            self.pool.liberer(conn) 
+
+    def search_document_ids(self, criteria, limite=None, parmi=None, annulation=None):
+        """Ids des résultats de search_documents, dans le même ordre
+
+        annulation() est consultée pendant l'exécution de la requête : si elle
+        retourne True, la requête est interrompue et la méthode retourne None.
+        """
+        conn = self.pool.acquerir()
+        if annulation is not None:
+            conn.set_progress_handler(lambda: 1 if annulation() else 0, 1000)
+        try:
+            query, params = self._requete_recherche(criteria, "d.id", parmi, limite)
+            return [row[0] for row in conn.execute(query, params)]
+        except sqlite3.OperationalError:
+            if annulation is not None and annulation():
+                return None
+            raise
+        finally:
+            if annulation is not None:
+                conn.set_progress_handler(None, 0)
+            self.pool.liberer(conn)
 
     def get_demandes_utilisateur(self, user_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('''
@@ -923,10 +1106,10 @@ class DatabaseManager:
                 'type_document': row[6]
             } for row in cursor.fetchall()]
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def annuler_demande_emprunt(self, demande_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             cursor.execute('''
@@ -937,10 +1120,10 @@ class DatabaseManager:
             conn.commit()
             return cursor.rowcount > 0
         finally:
-            conn.close()
+            self.pool.liberer(conn)
 
     def relancer_demande_emprunt(self, demande_id):
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.acquerir()
         cursor = conn.cursor()
         try:
             # Récupérer les informations de la demande originale
@@ -965,4 +1148,4 @@ class DatabaseManager:
             conn.commit()
             return True
         finally:
-            conn.close() 
\ No newline at end of file
+            self.pool.liberer(conn) 
\ No newline at end of file
@@ -0,0 +1,288 @@
+import csv
+import json
+import os
+import re
+import time
+from contextlib import nullcontext
+
+from models.document import TYPES_DOCUMENTS, _parser_date
+
+# LOWER() de SQLite ne convertit que l'ASCII : même normalisation que
+# le contrôle de doublon de ajouter_document (idx_documents_titre_type)
+_MINUSCULES_ASCII = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+FORMATS = ('csv', 'jsonl', 'marc')
+_EXTENSIONS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.mrc': 'marc',
+    '.marc': 'marc',
+    '.iso2709': 'marc',
+}
+
+# Séparateurs ISO 2709
+_FIN_ENREGISTREMENT = b'\x1d'
+_FIN_CHAMP = b'\x1e'
+_SOUS_CHAMP = b'\x1f'
+
+_ANNEE = re.compile(r'\d{4}')
+_NOMBRE = re.compile(r'\d+')
+
+
+def cle_titre(titre, type_doc):
+    """Clé de doublon : titre en minuscules (ASCII, comme LOWER()) et type"""
+    return titre.translate(_MINUSCULES_ASCII), type_doc
+
+
+def detecter_format(chemin):
+    extension = os.path.splitext(chemin)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"Format de fichier non reconnu : {chemin}")
+    return _EXTENSIONS[extension]
+
+
+def lire_csv(chemin):
+    """Une ligne par document : colonnes type, titre, quantite et champs de détails"""
+    with open(chemin, newline='', encoding='utf-8-sig') as fichier:
+        for ligne in csv.DictReader(fichier):
+            yield {cle: valeur for cle, valeur in ligne.items() if cle and valeur not in (None, '')}
+
+
+def lire_jsonl(chemin):
+    """Un objet JSON par ligne; les détails peuvent être à plat ou sous 'details'"""
+    with open(chemin, encoding='utf-8') as fichier:
+        for ligne in fichier:
+            ligne = ligne.strip()
+            if not ligne:
+                continue
+            try:
+                enregistrement = json.loads(ligne)
+            except json.JSONDecodeError as e:
+                yield {'_erreur': f"JSON invalide : {e}", '_brut': ligne}
+                continue
+            if not isinstance(enregistrement, dict):
+                yield {'_erreur': "Objet JSON attendu", '_brut': ligne}
+                continue
+            details = enregistrement.pop('details', None)
+            if isinstance(details, dict):
+                enregistrement = {**details, **enregistrement}
+            yield enregistrement
+
+
+def _enregistrements_iso2709(fichier, taille_bloc=1 << 16):
+    tampon = b''
+    while True:
+        bloc = fichier.read(taille_bloc)
+        if not bloc:
+            break
+        tampon += bloc
+        *complets, tampon = tampon.split(_FIN_ENREGISTREMENT)
+        for brut in complets:
+            if brut.strip():
+                yield brut
+    if tampon.strip():
+        yield tampon
+
+
+def _champs_marc(brut):
+    """Dict étiquette -> liste de dicts de sous-champs (champs de données)"""
+    base = int(brut[12:17])
+    repertoire = brut[24:base - 1]
+    champs = {}
+    for i in range(0, len(repertoire) - 11, 12):
+        etiquette = repertoire[i:i + 3].decode('ascii')
+        longueur = int(repertoire[i + 3:i + 7])
+        debut = int(repertoire[i + 7:i + 12])
+        donnees = brut[base + debut:base + debut + longueur].rstrip(_FIN_CHAMP)
+        if etiquette < '010':
+            champs.setdefault(etiquette, []).append({'': donnees.decode('utf-8', 'replace')})
+            continue
+        sous_champs = {}
+        for morceau in donnees.split(_SOUS_CHAMP)[1:]:
+            if morceau:
+                code = chr(morceau[0])
+                valeur = morceau[1:].decode('utf-8', 'replace').strip()
+                sous_champs.setdefault(code, valeur)
+        champs.setdefault(etiquette, []).append(sous_champs)
+    return champs
+
+
+def _sous_champ(champs, *references):
+    """Première valeur trouvée parmi des références 'étiquette$code'"""
+    for reference in references:
+        etiquette, code = reference.split('$')
+        for champ in champs.get(etiquette, []):
+            if champ.get(code):
+                # Retirer la ponctuation ISBD de fin (" /", " :", ".")
+                return champ[code].rstrip(' /:;,.')
+    return None
+
+
+def _type_marc(guide, champs):
+    type_notice, niveau = chr(guide[6]), chr(guide[7])
+    if type_notice in 'gj':
+        return 'multimedia', 'DVD' if type_notice == 'g' else 'CD'
+    if niveau == 's':
+        # 008/21 : 'n' pour un journal, sinon périodique
+        zone_008 = (champs.get('008') or [{'': ''}])[0]['']
+        return ('journal' if zone_008[21:22] == 'n' else 'magazine'), None
+    return 'livre', None
+
+
+def lire_marc(chemin):
+    """Notices MARC21 (ISO 2709) converties en enregistrements du catalogue"""
+    with open(chemin, 'rb') as fichier:
+        for brut in _enregistrements_iso2709(fichier):
+            try:
+                champs = _champs_marc(brut)
+                type_doc, type_media = _type_marc(brut[:24], champs)
+            except (ValueError, IndexError, UnicodeDecodeError) as e:
+                yield {'_erreur': f"Notice MARC illisible : {e}",
+                       '_brut': brut[:200].decode('latin-1')}
+                continue
+
+            titre = _sous_champ(champs, '245$a')
+            complement = _sous_champ(champs, '245$b')
+            if titre and complement:
+                titre = f"{titre} : {complement}"
+            date = _sous_champ(champs, '264$c', '260$c')
+            annee = _ANNEE.search(date or '')
+            enregistrement = {
+                'type': type_doc,
+                'titre': titre,
+                'auteur': _sous_champ(champs, '100$a', '110$a', '700$a'),
+                'editeur': _sous_champ(champs, '264$b', '260$b'),
+                'genre': _sous_champ(champs, '655$a', '650$a'),
+                'frequence': _sous_champ(champs, '310$a'),
+                'numero': _sous_champ(champs, '362$a'),
+                'date_publication': f"{annee.group()}-01-01" if annee else None,
+                'type_media': type_media,
+            }
+            pages = _NOMBRE.search(_sous_champ(champs, '300$a') or '')
+            if pages and type_doc == 'livre':
+                enregistrement['nb_pages'] = pages.group()
+            duree = _sous_champ(champs, '306$a')
+            if duree and duree.isdigit():
+                # hhmmss -> minutes
+                duree = duree.zfill(6)
+                enregistrement['duree'] = int(duree[:2]) * 60 + int(duree[2:4])
+            yield {cle: valeur for cle, valeur in enregistrement.items() if valeur is not None}
+
+
+LECTEURS = {'csv': lire_csv, 'jsonl': lire_jsonl, 'marc': lire_marc}
+
+
+def normaliser(enregistrement):
+    """Retourne (type, titre, details JSON, quantite) ou lève ValueError"""
+    if '_erreur' in enregistrement:
+        raise ValueError(enregistrement['_erreur'])
+    cls = TYPES_DOCUMENTS.get(str(enregistrement.get('type', '')).strip().lower())
+    if cls is None:
+        raise ValueError(f"Type de document non reconnu : {enregistrement.get('type')}")
+    titre = str(enregistrement.get('titre') or '').strip()
+    if not titre:
+        raise ValueError("Titre manquant")
+    quantite = int(enregistrement.get('quantite', 1))
+    if quantite < 1:
+        raise ValueError(f"Quantité invalide : {quantite}")
+
+    # Passer par la classe du document : mêmes conversions et mêmes clés
+    # que ajouter_document
+    date_publication = _parser_date(enregistrement.get('date_publication'))
+    document = cls.depuis_details(None, titre, enregistrement, date_publication, 'disponible')
+    return cls.TYPE, titre, json.dumps(document.details_stockage()), quantite
+
+
+class ImporteurCatalogue:
+    """Import en masse du catalogue par lots (executemany, un commit par lot)"""
+
+    def __init__(self, db_manager, taille_lot=5000):
+        self.db = db_manager
+        self.taille_lot = taille_lot
+
+    def _titres_existants(self, conn):
+        return {
+            (titre, type_doc)
+            for titre, type_doc in conn.execute('SELECT LOWER(titre), type FROM documents')
+        }
+
+    def importer(self, chemin, format_fichier=None, fichier_rejets=None, rejets=None):
+        """Importe un fichier CSV, JSONL ou MARC21; retourne le bilan de l'import
+
+        Les enregistrements rejetés (invalides ou doublons) sont écrits, avec la
+        raison du rejet, dans fichier_rejets (par défaut <chemin>.rejets.jsonl).
+        rejets, un fichier déjà ouvert, permet de regrouper les rejets de
+        plusieurs imports : il n'est ni tronqué ni fermé ici.
+        """
+        format_fichier = format_fichier or detecter_format(chemin)
+        if format_fichier not in LECTEURS:
+            raise ValueError(f"Format inconnu : {format_fichier} (attendu : {', '.join(FORMATS)})")
+        if rejets is not None:
+            fichier_rejets = getattr(rejets, 'name', fichier_rejets)
+        fichier_rejets = fichier_rejets or f"{chemin}.rejets.jsonl"
+
+        bilan = {'lus': 0, 'importes': 0, 'doublons': 0, 'rejetes': 0}
+        debut = time.perf_counter()
+        conn = self.db.pool.acquerir()
+        try:
+            titres = self._titres_existants(conn)
+            lot = []
+            with nullcontext(rejets) if rejets is not None else open(fichier_rejets, 'w', encoding='utf-8') as rejets:
+                for numero, enregistrement in enumerate(LECTEURS[format_fichier](chemin), 1):
+                    bilan['lus'] += 1
+                    try:
+                        type_doc, titre, details, quantite = normaliser(enregistrement)
+                    except (ValueError, TypeError) as e:
+                        self._rejeter(rejets, chemin, numero, str(e), enregistrement)
+                        bilan['rejetes'] += 1
+                        continue
+
+                    cle = cle_titre(titre, type_doc)
+                    if cle in titres:
+                        self._rejeter(rejets, chemin, numero, "Doublon (titre et type)", enregistrement)
+                        bilan['doublons'] += 1
+                        continue
+                    titres.add(cle)
+                    lot.append((type_doc, titre, details, quantite, quantite))
+
+                    if len(lot) >= self.taille_lot:
+                        self._inserer_lot(conn, lot)
+                        bilan['importes'] += len(lot)
+                        lot.clear()
+                        self._afficher_progression(bilan, debut)
+                if lot:
+                    self._inserer_lot(conn, lot)
+                    bilan['importes'] += len(lot)
+        finally:
+            self.db.pool.liberer(conn)
+
+        bilan['duree'] = time.perf_counter() - debut
+        bilan['lignes_par_seconde'] = bilan['lus'] / bilan['duree'] if bilan['duree'] else 0
+        bilan['fichier_rejets'] = fichier_rejets
+        return bilan
+
+    def _inserer_lot(self, conn, lot):
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('''
+                INSERT INTO documents (type, titre, status, details, quantite, quantite_disponible)
+                VALUES (?, ?, 'disponible', ?, ?, ?)
+            ''', lot)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _rejeter(self, rejets, chemin, numero, raison, enregistrement):
+        rejets.write(json.dumps({
+            'fichier': chemin,
+            'enregistrement': numero,
+            'raison': raison,
+            'donnees': enregistrement.get('_brut', enregistrement)
+        }, ensure_ascii=False, default=str) + '\n')
+
+    def _afficher_progression(self, bilan, debut):
+        duree = time.perf_counter() - debut
+        print(f"{bilan['lus']} lignes lues, {bilan['importes']} importées "
+              f"({bilan['lus'] / duree:.0f} lignes/s)")
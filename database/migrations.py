@@ -0,0 +1,606 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+
+from database.statistiques import reconstruire_statistiques
+
+# Chaque migration est appliquée une seule fois, dans sa propre transaction,
+# puis PRAGMA user_version prend son numéro.
+
+
+def _table_existe(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table,)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+def _colonne_existe(cursor, table, colonne):
+    cursor.execute(
+        'SELECT COUNT(*) FROM pragma_table_info(?) WHERE name = ?',
+        (table, colonne)
+    )
+    return cursor.fetchone()[0] > 0
+
+
+# Correspondances de l'ancien schéma anglais (users/documents/loans/reservations)
+ANCIENS_TYPES = {
+    'book': 'livre',
+    'magazine': 'magazine',
+    'newspaper': 'journal',
+    'journal': 'journal',
+    'multimedia': 'multimedia',
+    'cd': 'multimedia',
+    'dvd': 'multimedia',
+}
+ANCIENS_ROLES = {'administrator': 'administrateur', 'user': 'utilisateur'}
+ANCIENS_DETAILS = {
+    'author': 'auteur',
+    'pages': 'nb_pages',
+    'genre': 'genre',
+    'publisher': 'editeur',
+    'frequency': 'frequence',
+    'issue': 'numero',
+    'number': 'numero',
+    'media_type': 'type_media',
+    'duration': 'duree',
+    'publication_date': 'date_publication',
+}
+ANCIENS_STATUTS_RESERVATION = {
+    'active': 'en_attente',
+    'completed': 'validee',
+    'cancelled': 'annulee',
+}
+
+
+def _renommer_schema_anglais(cursor):
+    """Met de côté les tables de l'ancien schéma anglais (anciennes sauvegardes)"""
+    if not _table_existe(cursor, 'users') or _table_existe(cursor, 'utilisateurs'):
+        return False
+    for table in ('users', 'documents', 'loans', 'reservations'):
+        if _table_existe(cursor, table):
+            cursor.execute(f'ALTER TABLE {table} RENAME TO ancien_{table}')
+    return True
+
+
+def _importer_schema_anglais(cursor):
+    cursor.execute('SELECT id, username, password, role FROM ancien_users')
+    for user_id, username, password, role in cursor.fetchall():
+        cursor.execute(
+            'INSERT INTO utilisateurs (id, username, password, role) VALUES (?, ?, ?, ?)',
+            (user_id, username, password, ANCIENS_ROLES.get(role, role))
+        )
+
+    cursor.execute('SELECT id, type, title, status, additional_info FROM ancien_documents')
+    for doc_id, type_doc, titre, status, infos in cursor.fetchall():
+        try:
+            infos = json.loads(infos or '{}')
+        except ValueError:
+            infos = {}
+        details = {}
+        for cle, valeur in infos.get('type_specific', infos).items():
+            cle = ANCIENS_DETAILS.get(cle, cle)
+            if cle in ('nb_pages', 'duree'):
+                try:
+                    valeur = int(valeur)
+                except (TypeError, ValueError):
+                    valeur = 0
+            details[cle] = valeur
+        disponible = 0 if status == 'borrowed' else 1
+        cursor.execute('''
+            INSERT INTO documents (id, type, titre, status, quantite, quantite_disponible, details)
+            VALUES (?, ?, ?, 'disponible', 1, ?, ?)
+        ''', (doc_id, ANCIENS_TYPES.get((type_doc or '').lower(), (type_doc or '').lower()),
+              titre, disponible, json.dumps(details)))
+
+    if _table_existe(cursor, 'ancien_loans'):
+        cursor.execute('''
+            INSERT INTO emprunts (id, utilisateur_id, document_id, date_emprunt,
+                                  date_retour, date_retour_prevue)
+            SELECT id, user_id, document_id, date(loan_date), date(return_date), date(due_date)
+            FROM ancien_loans
+        ''')
+
+    if _table_existe(cursor, 'ancien_reservations'):
+        cursor.execute('''
+            SELECT id, user_id, document_id, date(reservation_date), status
+            FROM ancien_reservations
+        ''')
+        for row in cursor.fetchall():
+            *valeurs, status = row
+            cursor.execute('''
+                INSERT INTO demandes_emprunt (id, utilisateur_id, document_id, date_demande, status)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (*valeurs, ANCIENS_STATUTS_RESERVATION.get(status, status)))
+
+    for table in ('reservations', 'loans', 'documents', 'users'):
+        cursor.execute(f'DROP TABLE IF EXISTS ancien_{table}')
+    print("Ancien schéma converti avec succès")
+
+
+def _migration_schema_initial(cursor):
+    schema_anglais = _renommer_schema_anglais(cursor)
+
+    # Table Utilisateurs
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS utilisateurs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'utilisateur'
+    )''')
+
+    # Table Documents avec quantité
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        titre TEXT NOT NULL,
+        status TEXT DEFAULT 'disponible',
+        quantite INTEGER DEFAULT 1,
+        quantite_disponible INTEGER DEFAULT 1,
+        details TEXT NOT NULL
+    )''')
+
+    # Table pour les demandes d'emprunt
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS demandes_emprunt (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        utilisateur_id INTEGER,
+        document_id INTEGER,
+        date_demande TEXT NOT NULL,
+        status TEXT DEFAULT 'en_attente',  -- en_attente, validee, refusee
+        commentaire TEXT,
+        FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    )''')
+
+    # Table Emprunts
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS emprunts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        utilisateur_id INTEGER,
+        document_id INTEGER,
+        date_emprunt TEXT NOT NULL,
+        date_retour TEXT,
+        date_retour_prevue TEXT,
+        FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    )''')
+
+    if schema_anglais:
+        _importer_schema_anglais(cursor)
+
+    # Créer un admin par défaut (mot de passe: admin123) si aucun n'existe
+    cursor.execute("SELECT COUNT(*) FROM utilisateurs WHERE role = 'administrateur'")
+    if cursor.fetchone()[0] == 0:
+        admin_password = hashlib.sha256("admin123".encode()).hexdigest()
+        cursor.execute('''
+            INSERT INTO utilisateurs (username, password, role)
+            VALUES (?, ?, ?)
+        ''', ('admin', admin_password, 'administrateur'))
+        print("Compte admin créé avec succès")
+
+
+def _migration_date_retour_prevue(cursor):
+    # Bases créées avant l'ajout de la colonne date_retour_prevue
+    if not _colonne_existe(cursor, 'emprunts', 'date_retour_prevue'):
+        cursor.execute('ALTER TABLE emprunts ADD COLUMN date_retour_prevue TEXT')
+
+    cursor.execute('''
+        UPDATE emprunts
+        SET date_retour_prevue = date(date_emprunt, '+30 days')
+        WHERE date_retour_prevue IS NULL
+    ''')
+
+
+def _migration_index_circulation(cursor):
+    # Emprunts d'un utilisateur, triés par date (get_emprunts_utilisateur)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_emprunts_utilisateur
+        ON emprunts (utilisateur_id, date_emprunt)
+    ''')
+    # Emprunts en cours d'un document (retourner_document)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_emprunts_ouverts_document
+        ON emprunts (document_id) WHERE date_retour IS NULL
+    ''')
+    # Emprunts en cours d'un utilisateur (supprimer_utilisateur, creer_demande_emprunt)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_emprunts_ouverts_utilisateur
+        ON emprunts (utilisateur_id, document_id) WHERE date_retour IS NULL
+    ''')
+    # File des demandes par statut (get_demandes_emprunt)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_demandes_status
+        ON demandes_emprunt (status)
+    ''')
+    # Demande déjà en attente pour ce couple utilisateur/document
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_demandes_en_attente
+        ON demandes_emprunt (utilisateur_id, document_id) WHERE status = 'en_attente'
+    ''')
+    # Historique des demandes d'un utilisateur (get_demandes_utilisateur)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_demandes_utilisateur
+        ON demandes_emprunt (utilisateur_id, date_demande)
+    ''')
+    # Détection des doublons insensible à la casse (ajouter_document)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_documents_titre_type
+        ON documents (lower(titre), type)
+    ''')
+
+
+# Champs JSON de documents.details exposés en colonnes générées indexées
+COLONNES_DETAILS = ('auteur', 'editeur', 'genre', 'date_publication')
+
+
+def _migration_colonnes_details(cursor):
+    for colonne in COLONNES_DETAILS:
+        if not _colonne_existe(cursor, 'documents', colonne):
+            # json_valid protège la création d'index contre un détail mal formé
+            cursor.execute(f'''
+                ALTER TABLE documents ADD COLUMN {colonne} TEXT
+                GENERATED ALWAYS AS (
+                    CASE WHEN json_valid(details) THEN json_extract(details, '$.{colonne}') END
+                ) VIRTUAL
+            ''')
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_documents_{colonne}
+            ON documents ({colonne})
+        ''')
+
+
+def _migration_recherche_plein_texte(cursor):
+    # Index externe : le texte reste dans documents, FTS5 ne stocke que l'index
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            titre, auteur, editeur, genre,
+            content='documents', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS documents_fts_ai AFTER INSERT ON documents BEGIN
+            INSERT INTO documents_fts (rowid, titre, auteur, editeur, genre)
+            VALUES (new.id, new.titre, new.auteur, new.editeur, new.genre);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS documents_fts_ad AFTER DELETE ON documents BEGIN
+            INSERT INTO documents_fts (documents_fts, rowid, titre, auteur, editeur, genre)
+            VALUES ('delete', old.id, old.titre, old.auteur, old.editeur, old.genre);
+        END
+    ''')
+    # Seules les modifications du titre ou des détails touchent l'index
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS documents_fts_au AFTER UPDATE OF titre, details ON documents BEGIN
+            INSERT INTO documents_fts (documents_fts, rowid, titre, auteur, editeur, genre)
+            VALUES ('delete', old.id, old.titre, old.auteur, old.editeur, old.genre);
+            INSERT INTO documents_fts (rowid, titre, auteur, editeur, genre)
+            VALUES (new.id, new.titre, new.auteur, new.editeur, new.genre);
+        END
+    ''')
+    cursor.execute("INSERT INTO documents_fts (documents_fts) VALUES ('rebuild')")
+
+
+def _ajouter_stat(cle, valeur):
+    # UPSERT : crée le compteur au premier usage
+    return f'''
+            INSERT INTO stats (cle, valeur) VALUES ({cle}, {valeur})
+            ON CONFLICT (cle) DO UPDATE SET valeur = valeur + excluded.valeur;'''
+
+
+def _migration_statistiques(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            cle TEXT PRIMARY KEY,
+            valeur INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+
+    declencheurs = {
+        'documents_stats_ai': ('AFTER INSERT ON documents', None, [
+            ("'documents'", '1'),
+            ("'type:' || new.type", '1'),
+            ("'exemplaires'", 'COALESCE(new.quantite, 0)'),
+            ("'exemplaires_disponibles'", 'COALESCE(new.quantite_disponible, 0)'),
+        ]),
+        'documents_stats_ad': ('AFTER DELETE ON documents', None, [
+            ("'documents'", '-1'),
+            ("'type:' || old.type", '-1'),
+            ("'exemplaires'", '-COALESCE(old.quantite, 0)'),
+            ("'exemplaires_disponibles'", '-COALESCE(old.quantite_disponible, 0)'),
+        ]),
+        'documents_stats_au_type': ('AFTER UPDATE OF type ON documents', 'old.type IS NOT new.type', [
+            ("'type:' || old.type", '-1'),
+            ("'type:' || new.type", '1'),
+        ]),
+        # Chaque emprunt ou retour modifie quantite_disponible
+        'documents_stats_au_quantite': (
+            'AFTER UPDATE OF quantite, quantite_disponible ON documents',
+            'old.quantite IS NOT new.quantite OR old.quantite_disponible IS NOT new.quantite_disponible', [
+                ("'exemplaires'", 'COALESCE(new.quantite, 0) - COALESCE(old.quantite, 0)'),
+                ("'exemplaires_disponibles'",
+                 'COALESCE(new.quantite_disponible, 0) - COALESCE(old.quantite_disponible, 0)'),
+            ]),
+        'emprunts_stats_ai': ('AFTER INSERT ON emprunts', None, [
+            ("'emprunts'", '1'),
+            ("'emprunts_en_cours'", 'new.date_retour IS NULL'),
+        ]),
+        'emprunts_stats_ad': ('AFTER DELETE ON emprunts', None, [
+            ("'emprunts'", '-1'),
+            ("'emprunts_en_cours'", '-(old.date_retour IS NULL)'),
+        ]),
+        'emprunts_stats_au': (
+            'AFTER UPDATE OF date_retour ON emprunts',
+            '(old.date_retour IS NULL) <> (new.date_retour IS NULL)', [
+                ("'emprunts_en_cours'", '(new.date_retour IS NULL) - (old.date_retour IS NULL)'),
+            ]),
+        'demandes_stats_ai': ('AFTER INSERT ON demandes_emprunt', None, [
+            ("'demandes:' || new.status", '1'),
+        ]),
+        'demandes_stats_ad': ('AFTER DELETE ON demandes_emprunt', None, [
+            ("'demandes:' || old.status", '-1'),
+        ]),
+        'demandes_stats_au': ('AFTER UPDATE OF status ON demandes_emprunt', 'old.status IS NOT new.status', [
+            ("'demandes:' || old.status", '-1'),
+            ("'demandes:' || new.status", '1'),
+        ]),
+    }
+    for nom, (evenement, condition, compteurs) in declencheurs.items():
+        quand = f' WHEN {condition}' if condition else ''
+        corps = ''.join(_ajouter_stat(cle, valeur) for cle, valeur in compteurs)
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS {nom} {evenement}{quand} BEGIN{corps}
+            END
+        ''')
+
+    # Emprunts en retard : compte par intervalle sur l'échéance des emprunts ouverts
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_emprunts_ouverts_echeance
+        ON emprunts (date_retour_prevue) WHERE date_retour IS NULL
+    ''')
+
+    reconstruire_statistiques(cursor)
+
+
+def _jour(colonne):
+    # Date texte -> jours depuis le 1970-01-01 (julianday('1970-01-01') = 2440587.5)
+    return f"CAST(julianday({colonne}) - 2440587.5 AS INTEGER)"
+
+
+def _migration_dates_entieres(cursor):
+    # SQLite ne sait pas changer le type d'une colonne : la table est recréée,
+    # puis ses index et déclencheurs sont recréés à l'identique
+    cursor.execute('''
+        SELECT sql FROM sqlite_master
+        WHERE tbl_name = 'emprunts' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''')
+    objets = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute('''
+    CREATE TABLE emprunts_jours (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        utilisateur_id INTEGER,
+        document_id INTEGER,
+        date_emprunt INTEGER NOT NULL,   -- jours depuis le 1970-01-01
+        date_retour INTEGER,
+        date_retour_prevue INTEGER,
+        FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
+        FOREIGN KEY (document_id) REFERENCES documents (id)
+    )''')
+    cursor.execute(f'''
+        INSERT INTO emprunts_jours (id, utilisateur_id, document_id, date_emprunt,
+                                    date_retour, date_retour_prevue)
+        SELECT id, utilisateur_id, document_id,
+               COALESCE({_jour('date_emprunt')}, {_jour("'now'")}),
+               {_jour('date_retour')},
+               {_jour('date_retour_prevue')}
+        FROM emprunts
+    ''')
+    cursor.execute('DROP TABLE emprunts')
+    cursor.execute('ALTER TABLE emprunts_jours RENAME TO emprunts')
+    for sql in objets:
+        cursor.execute(sql)
+
+
+
+def _migration_registre_penalites(cursor):
+    # Registre des pénalités : montant > 0 dû, montant < 0 paiement ou remise
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS penalites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            utilisateur_id INTEGER NOT NULL,
+            emprunt_id INTEGER,
+            jour INTEGER NOT NULL,           -- jours depuis le 1970-01-01
+            nature TEXT NOT NULL CHECK (nature IN ('retard', 'paiement', 'remise')),
+            montant REAL NOT NULL,
+            commentaire TEXT,
+            FOREIGN KEY (utilisateur_id) REFERENCES utilisateurs (id),
+            FOREIGN KEY (emprunt_id) REFERENCES emprunts (id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_penalites_utilisateur
+        ON penalites (utilisateur_id, id)
+    ''')
+
+    # Soldes par utilisateur et montant déjà facturé par emprunt, tenus par
+    # déclencheur : lecture en une recherche de clé
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS soldes (
+            utilisateur_id INTEGER PRIMARY KEY,
+            solde REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS penalites_emprunts (
+            emprunt_id INTEGER PRIMARY KEY,
+            montant REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS penalites_soldes_ai AFTER INSERT ON penalites BEGIN
+            INSERT INTO soldes (utilisateur_id, solde) VALUES (new.utilisateur_id, new.montant)
+            ON CONFLICT (utilisateur_id) DO UPDATE SET solde = ROUND(solde + excluded.solde, 2);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS penalites_soldes_ad AFTER DELETE ON penalites BEGIN
+            UPDATE soldes SET solde = ROUND(solde - old.montant, 2)
+            WHERE utilisateur_id = old.utilisateur_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS penalites_emprunts_ai AFTER INSERT ON penalites
+        WHEN new.nature = 'retard' BEGIN
+            INSERT INTO penalites_emprunts (emprunt_id, montant) VALUES (new.emprunt_id, new.montant)
+            ON CONFLICT (emprunt_id) DO UPDATE SET montant = ROUND(montant + excluded.montant, 2);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS penalites_emprunts_ad AFTER DELETE ON penalites
+        WHEN old.nature = 'retard' BEGIN
+            UPDATE penalites_emprunts SET montant = ROUND(montant - old.montant, 2)
+            WHERE emprunt_id = old.emprunt_id;
+        END
+    ''')
+
+    # Dernier passage des tâches périodiques (cumul quotidien des pénalités)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS taches (
+            nom TEXT PRIMARY KEY,
+            dernier_jour INTEGER
+        ) WITHOUT ROWID
+    ''')
+
+    # Retours en retard depuis le dernier cumul : intervalle sur date_retour
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_emprunts_rendus_en_retard
+        ON emprunts (date_retour) WHERE date_retour > date_retour_prevue
+    ''')
+
+
+
+# Tables suivies par le journal des modifications : (table, clé journalisée)
+TABLES_JOURNALISEES = {
+    'documents': 'id',
+    'emprunts': 'id',
+    'utilisateurs': 'id',
+    'demandes_emprunt': 'id',
+    'soldes': 'utilisateur_id',
+    'penalites_emprunts': 'emprunt_id',
+}
+
+
+def _migration_journal_modifications(cursor):
+    # Une ligne par écriture : les vues ne relisent que les clés modifiées
+    # depuis la dernière version (id) qu'elles ont affichée
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS journal_modifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nom_table TEXT NOT NULL,
+            cle INTEGER NOT NULL
+        )
+    ''')
+    for table, cle in TABLES_JOURNALISEES.items():
+        for evenement, ligne in (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old')):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_journal_{evenement.lower()}
+                AFTER {evenement} ON {table} BEGIN
+                    INSERT INTO journal_modifications (nom_table, cle) VALUES ('{table}', {ligne}.{cle});
+                END
+            ''')
+
+
+MIGRATIONS = [
+    (1, "Schéma initial", _migration_schema_initial),
+    (2, "Date de retour prévue des emprunts", _migration_date_retour_prevue),
+    (3, "Index des tables de circulation", _migration_index_circulation),
+    (4, "Colonnes générées pour les détails des documents", _migration_colonnes_details),
+    (5, "Index plein texte du catalogue", _migration_recherche_plein_texte),
+    (6, "Statistiques tenues par déclencheurs", _migration_statistiques),
+    (7, "Dates d'emprunt en numéros de jour", _migration_dates_entieres),
+    (8, "Registre des pénalités et soldes", _migration_registre_penalites),
+    (9, "Journal des modifications", _migration_journal_modifications),
+]
+
+VERSION_SCHEMA = MIGRATIONS[-1][0]
+
+
+def version_courante(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def appliquer_migrations(conn):
+    """Applique les migrations manquantes; retourne le nombre de migrations appliquées"""
+    version = version_courante(conn)
+    # Démarrage à chaud : une seule lecture quand le schéma est à jour
+    if version == VERSION_SCHEMA:
+        return 0
+    if version > VERSION_SCHEMA:
+        raise RuntimeError(
+            f"Base en version {version}, plus récente que l'application ({VERSION_SCHEMA})"
+        )
+
+    appliquees = 0
+    cursor = conn.cursor()
+    for numero, description, migration in MIGRATIONS:
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            # Relire la version sous verrou : un autre poste a pu migrer entre-temps
+            if version_courante(conn) >= numero:
+                conn.rollback()
+                continue
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {numero}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        appliquees += 1
+        print(f"Migration {numero} appliquée : {description}")
+    return appliquees
+
+
+def mettre_a_jour_fichier(db_file):
+    """Met à niveau un fichier de base (ex. une sauvegarde) vers VERSION_SCHEMA"""
+    conn = sqlite3.connect(db_file)
+    try:
+        avant = version_courante(conn)
+        appliquer_migrations(conn)
+        return avant, version_courante(conn)
+    finally:
+        conn.close()
+
+
+def main():
+    # Usage : python -m database.migrations [fichiers...]
+    parser = argparse.ArgumentParser(description="Met à niveau le schéma de fichiers de base")
+    parser.add_argument('fichiers', nargs='*', default=['backups/*.db'],
+                        help="Fichiers ou motifs (par défaut : backups/*.db)")
+    args = parser.parse_args()
+
+    for motif in args.fichiers:
+        for db_file in sorted(glob.glob(motif)) or [motif]:
+            if not os.path.isfile(db_file):
+                print(f"{db_file} : fichier introuvable")
+                continue
+            try:
+                avant, apres = mettre_a_jour_fichier(db_file)
+                print(f"{db_file} : version {avant} -> {apres}")
+            except (sqlite3.Error, RuntimeError) as e:
+                print(f"{db_file} : échec de la mise à niveau ({e})")
+
+
+if __name__ == "__main__":
+    main()
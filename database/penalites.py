@@ -0,0 +1,122 @@
+# Évaluation ensembliste des pénalités de retard : une seule requête pour tous
+# les emprunts concernés, à une date d'évaluation fixe, avec le barème de
+# Tarification.BAREME (le même que Emprunt.calculer_penalites).
+
+from models.document import TYPES_DOCUMENTS
+from models.emprunt import aujourd_hui
+from utils.tarification import Tarification
+
+
+def _bareme_sql():
+    """CTE du barème, une ligne par type stocké en base (alias compris)"""
+    lignes = []
+    params = []
+    for type_doc, cls in TYPES_DOCUMENTS.items():
+        if cls.TYPE in Tarification.BAREME:
+            lignes.append('(?, ?, ?, ?)')
+            params.extend((type_doc, *Tarification.BAREME[cls.TYPE]))
+    return f"bareme (type, par_jour, par_minute, forfait) AS (VALUES {', '.join(lignes)})", params
+
+
+def _requete_penalites(jour, conditions, params_conditions):
+    """Requête (sql, params) des pénalités dues au jour donné pour les emprunts filtrés"""
+    bareme, params = _bareme_sql()
+    params.append(jour)
+    params.append(jour)
+    params.extend(params_conditions)
+    sql = f'''
+        WITH {bareme},
+        retards AS (
+            SELECT e.id, e.utilisateur_id, e.document_id, d.type, d.details,
+                   COALESCE(e.date_retour, ?) - e.date_retour_prevue AS jours
+            FROM emprunts e
+            JOIN documents d ON d.id = e.document_id
+            WHERE e.date_retour_prevue < COALESCE(e.date_retour, ?)
+              {''.join(f' AND {condition}' for condition in conditions)}
+        )
+        SELECT r.id, r.utilisateur_id, r.document_id, r.jours,
+               ROUND(b.par_jour * r.jours
+                     + b.par_minute * COALESCE(json_extract(r.details, '$.duree'), 0)
+                     + b.forfait, 2) AS montant
+        FROM retards r
+        JOIN bareme b ON b.type = r.type
+    '''
+    return sql, params
+
+
+def evaluer_penalites(conn, jour=None, utilisateur_id=None, en_cours=False):
+    """Pénalités dues au jour donné (numéro de jour, aujourd'hui par défaut)
+
+    Retourne [(emprunt_id, utilisateur_id, document_id, jours_retard, montant)]
+    pour les emprunts en retard uniquement. en_cours=True se limite aux
+    emprunts non rendus (index partiel idx_emprunts_ouverts_echeance).
+    """
+    jour = jour if jour is not None else aujourd_hui()
+    conditions = []
+    params = []
+    if en_cours:
+        conditions.append('e.date_retour IS NULL AND e.date_retour_prevue < ?')
+        params.append(jour)
+    if utilisateur_id is not None:
+        conditions.append('e.utilisateur_id = ?')
+        params.append(utilisateur_id)
+    sql, params = _requete_penalites(jour, conditions, params)
+    return conn.execute(sql, params).fetchall()
+
+
+# Cumul quotidien dans le registre des pénalités : seuls les emprunts encore en
+# retard et ceux rendus en retard depuis le dernier passage sont réévalués, et
+# seule la différence avec le montant déjà facturé est inscrite.
+TACHE_CUMUL = 'cumul_penalites'
+
+
+def dernier_cumul(cursor):
+    """Jour du dernier cumul des pénalités (None s'il n'a jamais eu lieu)"""
+    cursor.execute('SELECT dernier_jour FROM taches WHERE nom = ?', (TACHE_CUMUL,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def cumuler_penalites(cursor, jour=None):
+    """Inscrit les pénalités de retard dues au jour donné (dans une transaction ouverte)
+
+    Retourne (nb_emprunts_factures, montant_facture), ou None si un cumul plus
+    récent a déjà eu lieu. Rejouer le même jour n'inscrit que les retours du jour.
+    Le premier cumul ne porte que sur les emprunts encore ouverts : les retards
+    rendus avant la mise en service du registre ne sont pas facturés après coup.
+    """
+    jour = jour if jour is not None else aujourd_hui()
+    precedent = dernier_cumul(cursor)
+    if precedent is not None and jour < precedent:
+        return None
+
+    selections = [
+        # Emprunts ouverts en retard (index partiel idx_emprunts_ouverts_echeance)
+        (['e.date_retour IS NULL AND e.date_retour_prevue < ?'], [jour]),
+    ]
+    if precedent is not None:
+        # Rendus en retard depuis le dernier cumul (index idx_emprunts_rendus_en_retard)
+        selections.append(
+            (['e.date_retour > e.date_retour_prevue AND e.date_retour >= ?'], [precedent])
+        )
+    nb_emprunts = 0
+    montant = 0.0
+    for conditions, params_conditions in selections:
+        sql, params = _requete_penalites(jour, conditions, params_conditions)
+        cursor.execute(f'''
+            INSERT INTO penalites (utilisateur_id, emprunt_id, jour, nature, montant)
+            SELECT p.utilisateur_id, p.id, ?, 'retard', ROUND(p.montant - COALESCE(pe.montant, 0), 2)
+            FROM ({sql}) p
+            LEFT JOIN penalites_emprunts pe ON pe.emprunt_id = p.id
+            WHERE p.montant - COALESCE(pe.montant, 0) >= 0.01
+            RETURNING montant
+        ''', [jour] + params)
+        inscrits = [row[0] for row in cursor.fetchall()]
+        nb_emprunts += len(inscrits)
+        montant += sum(inscrits)
+
+    cursor.execute('''
+        INSERT INTO taches (nom, dernier_jour) VALUES (?, ?)
+        ON CONFLICT (nom) DO UPDATE SET dernier_jour = excluded.dernier_jour
+    ''', (TACHE_CUMUL, jour))
+    return nb_emprunts, round(montant, 2)
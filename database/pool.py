@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import time
+
+
+class ConnectionPool:
+    """Pool de connexions SQLite affectées à un thread.
+
+    Chaque thread réutilise sa propre connexion : un appel imbriqué
+    (ex. verifier_disponibilite depuis creer_demande_emprunt) reçoit la même
+    connexion que l'appelant, sans nouvelle ouverture.
+    """
+
+    def __init__(self, db_file, initialiser=None, delai_verification=30.0):
+        self.db_file = db_file
+        # Fonction appelée sur chaque nouvelle connexion (pragmas du profil)
+        self.initialiser = initialiser
+        # Durée d'inactivité après laquelle la connexion est vérifiée avant usage
+        self.delai_verification = delai_verification
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connexions = []
+        self.stats = {'hits': 0, 'misses': 0, 'verifications': 0, 'reconnexions': 0}
+
+    def _ouvrir(self):
+        conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        if self.initialiser:
+            self.initialiser(conn)
+        with self._lock:
+            self._connexions.append(conn)
+            self.stats['misses'] += 1
+        return conn
+
+    def _fermer(self, conn):
+        with self._lock:
+            if conn in self._connexions:
+                self._connexions.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _est_valide(self, conn):
+        with self._lock:
+            self.stats['verifications'] += 1
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquerir(self):
+        """Emprunte la connexion du thread courant (l'ouvre si nécessaire)"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+
+        if conn is not None and local.profondeur == 0:
+            # Vérifier la connexion si elle est restée inactive trop longtemps
+            if time.monotonic() - local.derniere_utilisation > self.delai_verification:
+                if not self._est_valide(conn):
+                    self._fermer(conn)
+                    conn = None
+                    with self._lock:
+                        self.stats['reconnexions'] += 1
+
+        if conn is None:
+            conn = self._ouvrir()
+            local.conn = conn
+            local.profondeur = 0
+            local.derniere_utilisation = time.monotonic()
+        else:
+            with self._lock:
+                self.stats['hits'] += 1
+
+        local.profondeur += 1
+        return conn
+
+    def liberer(self, conn):
+        """Rend la connexion au pool; annule toute transaction laissée ouverte"""
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            # Connexion inconnue pour ce thread : on la ferme simplement
+            self._fermer(conn)
+            return
+
+        local.profondeur -= 1
+        if local.profondeur == 0:
+            if conn.in_transaction:
+                conn.rollback()
+            local.derniere_utilisation = time.monotonic()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['connexions_ouvertes'] = len(self._connexions)
+        return stats
+
+    def fermer(self):
+        """Ferme toutes les connexions du pool"""
+        with self._lock:
+            connexions = list(self._connexions)
+            self._connexions.clear()
+        for conn in connexions:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -0,0 +1,58 @@
+# Profils de stockage SQLite appliqués à chaque nouvelle connexion
+
+PROFILS_STOCKAGE = {
+    # Postes de prêt : lecteurs non bloqués par les écritures, fsync au checkpoint
+    'desk': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,  # 256 Mo
+        'cache_size': -16000,    # 16 Mo (valeur négative = Kio)
+        'busy_timeout': 5000,
+        'temp_store': 'MEMORY',
+    },
+    # Durabilité maximale : journal de rollback et fsync complet à chaque commit
+    'safe': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,
+        'busy_timeout': 5000,
+        'temp_store': 'DEFAULT',
+    },
+}
+
+PROFIL_PAR_DEFAUT = 'desk'
+
+# Ordre d'application : journal_mode doit précéder synchronous
+ORDRE_PRAGMAS = ('busy_timeout', 'journal_mode', 'synchronous',
+                 'mmap_size', 'cache_size', 'temp_store')
+
+
+def resoudre_profil(nom, profils_personnalises=None):
+    """Retourne (nom, pragmas) pour un profil intégré ou défini dans la configuration"""
+    profils = dict(PROFILS_STOCKAGE)
+    for nom_perso, pragmas in (profils_personnalises or {}).items():
+        # Un profil personnalisé peut surcharger un profil intégré
+        base = dict(profils.get(nom_perso, {}))
+        base.update(pragmas)
+        profils[nom_perso] = base
+
+    if nom not in profils:
+        print(f"Profil de stockage inconnu '{nom}', utilisation de '{PROFIL_PAR_DEFAUT}'")
+        nom = PROFIL_PAR_DEFAUT
+    return nom, profils[nom]
+
+
+def appliquer_profil(conn, pragmas):
+    """Applique les pragmas du profil sur une connexion"""
+    for pragma in ORDRE_PRAGMAS:
+        if pragma in pragmas:
+            conn.execute(f"PRAGMA {pragma} = {pragmas[pragma]}")
+
+
+def lire_pragmas(conn):
+    """Valeurs effectives des pragmas sur une connexion"""
+    return {
+        pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        for pragma in ORDRE_PRAGMAS
+    }
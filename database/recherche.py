@@ -0,0 +1,64 @@
+import re
+import unicodedata
+
+# Critères textuels servis par l'index plein texte documents_fts
+# ('texte' cherche dans toutes les colonnes indexées)
+CHAMPS_TEXTE = ('texte', 'titre', 'auteur', 'editeur', 'genre')
+
+# Pondération bm25 des colonnes de documents_fts : titre, auteur, editeur, genre
+POIDS_BM25 = (10.0, 5.0, 2.0, 1.0)
+
+_MOT = re.compile(r'\w+', re.UNICODE)
+
+
+def expression_fts(criteria):
+    """Construit l'expression MATCH FTS5 des critères textuels (None si aucun)
+
+    Chaque mot saisi devient un préfixe entre guillemets : la saisie ne peut
+    donc pas injecter d'opérateur FTS5. Accents et casse sont ignorés par le
+    tokenizer unicode61 (remove_diacritics 2).
+    """
+    termes = []
+    for champ in CHAMPS_TEXTE:
+        mots = _MOT.findall(criteria.get(champ) or '')
+        if not mots:
+            continue
+        expression = ' AND '.join(f'"{mot}"*' for mot in mots)
+        if champ == 'texte':
+            termes.append(f'({expression})')
+        else:
+            termes.append(f'{champ} : ({expression})')
+    return ' AND '.join(termes) or None
+
+
+def _normaliser(mot):
+    # Comme le tokenizer : casse et accents ignorés
+    decompose = unicodedata.normalize('NFKD', mot.casefold())
+    return ''.join(c for c in decompose if not unicodedata.combining(c))
+
+
+def est_affinage(anciens, nouveaux):
+    """Vrai si les résultats des critères nouveaux sont inclus dans ceux de anciens
+
+    C'est le cas quand chaque mot de l'ancienne saisie est le début d'un mot
+    de la nouvelle, dans le même champ (préfixes FTS5), et que les autres
+    critères sont identiques ou n'étaient pas renseignés.
+    """
+    for champ in CHAMPS_TEXTE:
+        anciens_mots = [_normaliser(mot) for mot in _MOT.findall(anciens.get(champ) or '')]
+        nouveaux_mots = [_normaliser(mot) for mot in _MOT.findall(nouveaux.get(champ) or '')]
+        for mot in anciens_mots:
+            if not any(nouveau.startswith(mot) for nouveau in nouveaux_mots):
+                return False
+    for champ in set(anciens) | set(nouveaux):
+        if champ in CHAMPS_TEXTE:
+            continue
+        ancien = anciens.get(champ) or None
+        if ancien is not None and ancien != (nouveaux.get(champ) or None):
+            return False
+    return True
+
+
+def ordre_bm25(table='documents_fts'):
+    poids = ', '.join(str(p) for p in POIDS_BM25)
+    return f'bm25({table}, {poids})'
@@ -0,0 +1,62 @@
+# Compteurs du tableau de bord tenus à jour par les déclencheurs de la
+# migration 6 : chaque lecture est un simple parcours de la petite table stats.
+#
+# Clés : documents, type:<type>, exemplaires, exemplaires_disponibles,
+#        emprunts, emprunts_en_cours, demandes:<status>
+
+from models.emprunt import aujourd_hui
+
+
+def reconstruire_statistiques(cursor):
+    """Recalcule tous les compteurs à partir des tables (dans la transaction courante)"""
+    cursor.execute('DELETE FROM stats')
+    cursor.execute('''
+        INSERT INTO stats (cle, valeur)
+        SELECT 'documents', COUNT(*) FROM documents
+        UNION ALL
+        SELECT 'exemplaires', COALESCE(SUM(quantite), 0) FROM documents
+        UNION ALL
+        SELECT 'exemplaires_disponibles', COALESCE(SUM(quantite_disponible), 0) FROM documents
+        UNION ALL
+        SELECT 'type:' || type, COUNT(*) FROM documents GROUP BY type
+        UNION ALL
+        SELECT 'emprunts', COUNT(*) FROM emprunts
+        UNION ALL
+        SELECT 'emprunts_en_cours', COUNT(*) FROM emprunts WHERE date_retour IS NULL
+        UNION ALL
+        SELECT 'demandes:' || status, COUNT(*) FROM demandes_emprunt GROUP BY status
+    ''')
+
+
+def compter_emprunts_en_retard(conn, jour=None):
+    """Emprunts ouverts dont l'échéance est passée
+
+    jour est un numéro de jour (voir models.emprunt). Un déclencheur ne voit
+    pas le temps passer : ce compteur est lu par un parcours d'intervalle de
+    l'index partiel idx_emprunts_ouverts_echeance.
+    """
+    return conn.execute('''
+        SELECT COUNT(*) FROM emprunts
+        WHERE date_retour IS NULL AND date_retour_prevue < ?
+    ''', (jour if jour is not None else aujourd_hui(),)).fetchone()[0]
+
+
+def lire_statistiques(conn):
+    compteurs = dict(conn.execute('SELECT cle, valeur FROM stats'))
+    stats = {
+        'documents': compteurs.get('documents', 0),
+        'documents_par_type': {},
+        'exemplaires': compteurs.get('exemplaires', 0),
+        'exemplaires_disponibles': compteurs.get('exemplaires_disponibles', 0),
+        'emprunts': compteurs.get('emprunts', 0),
+        'emprunts_en_cours': compteurs.get('emprunts_en_cours', 0),
+        'demandes_par_status': {},
+    }
+    for cle, valeur in compteurs.items():
+        if cle.startswith('type:') and valeur:
+            stats['documents_par_type'][cle[5:]] = valeur
+        elif cle.startswith('demandes:') and valeur:
+            stats['demandes_par_status'][cle[9:]] = valeur
+    stats['exemplaires_empruntes'] = stats['exemplaires'] - stats['exemplaires_disponibles']
+    stats['emprunts_en_retard'] = compter_emprunts_en_retard(conn)
+    return stats
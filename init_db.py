@@ -3,6 +3,8 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from database.db_manager import DatabaseManager
+from database.importeur import ImporteurCatalogue, FORMATS
+import argparse
 import hashlib
 from datetime import datetime, timedelta
 from models.document import Livre, Magazine, Journal, OuvrageMultimedia
@@ -52,5 +54,66 @@ def initialiser_bibliotheque():
     print("Admin - username: admin, password: admin123")
     print("User  - username: user,  password: user123")
 
+def importer_catalogue(fichiers, format_fichier=None, taille_lot=5000, fichier_rejets=None):
+    db = DatabaseManager()
+    importeur = ImporteurCatalogue(db, taille_lot=taille_lot)
+    
+    # Fichier de rejets explicite : ouvert une fois pour tous les fichiers importés
+    rejets = open(fichier_rejets, 'w', encoding='utf-8') if fichier_rejets else None
+    try:
+        for chemin in fichiers:
+            bilan = importeur.importer(chemin, format_fichier, rejets=rejets)
+            print(f"{chemin} : {bilan['importes']} documents importés sur {bilan['lus']} lus "
+                  f"en {bilan['duree']:.1f} s ({bilan['lignes_par_seconde']:.0f} lignes/s)")
+            if bilan['doublons'] or bilan['rejetes']:
+                print(f"  {bilan['doublons']} doublons, {bilan['rejetes']} rejetés -> {bilan['fichier_rejets']}")
+    finally:
+        if rejets is not None:
+            rejets.close()
+    
+    db.fermer()
+
+def reconstruire_statistiques():
+    db = DatabaseManager()
+    db.reconstruire_statistiques()
+    stats = db.get_statistiques()
+    print(f"Statistiques reconstruites : {stats['documents']} documents, "
+          f"{stats['emprunts_en_cours']} emprunts en cours")
+    db.fermer()
+
+def cumuler_penalites():
+    db = DatabaseManager()
+    bilan = db.cumuler_penalites()
+    if bilan is None:
+        print("Pénalités déjà cumulées à une date plus récente")
+    else:
+        print(f"Pénalités cumulées : {bilan['montant']:.2f}€ sur {bilan['emprunts']} emprunts")
+    db.fermer()
+
+def main():
+    parser = argparse.ArgumentParser(description="Initialisation et import du catalogue de la bibliothèque")
+    parser.add_argument('--importer', nargs='+', metavar='FICHIER',
+                        help="Fichiers CSV, JSONL ou MARC21 à importer en masse")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="Format des fichiers (déduit de l'extension par défaut)")
+    parser.add_argument('--taille-lot', type=int, default=5000,
+                        help="Documents insérés par transaction")
+    parser.add_argument('--rejets',
+                        help="Fichier des rejets de tous les fichiers importés (par défaut <fichier>.rejets.jsonl pour chacun)")
+    parser.add_argument('--reconstruire-stats', action='store_true',
+                        help="Recalculer les compteurs du tableau de bord")
+    parser.add_argument('--cumuler-penalites', action='store_true',
+                        help="Cumul quotidien des pénalités de retard (tâche planifiée)")
+    args = parser.parse_args()
+    
+    if args.reconstruire_stats:
+        reconstruire_statistiques()
+    elif args.cumuler_penalites:
+        cumuler_penalites()
+    elif args.importer:
+        importer_catalogue(args.importer, args.format, args.taille_lot, args.rejets)
+    else:
+        initialiser_bibliotheque()
+
 if __name__ == "__main__":
-    initialiser_bibliotheque()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk
 from views.main_window import MainWindow
 from controllers.main_controller import MainController
-import os
 
 def main():
     # Créer le contrôleur
@@ -11,19 +10,12 @@ def main():
     # Créer la fenêtre principale
     window = MainWindow(controller)
     
-    # Définir l'icône de l'application avec chemin absolu
-    try:
-        # Obtenir le chemin absolu du répertoire du script
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        icon_path = os.path.join(base_dir, 'image', 'icon.png')
-        icon = tk.PhotoImage(file=icon_path)
-        window.iconphoto(True, icon)
-    except Exception as e:
-        print(f"Erreur lors du chargement de l'icône: {e}")
-    
     # Lier la fenêtre au contrôleur
     controller.set_main_window(window)
     
+    # Icône de l'application, lue par le gestionnaire d'images (chemin relatif au projet)
+    controller.charger_image('icon.png', None, lambda icon: window.iconphoto(True, icon))
+    
     # Démarrer l'application
     window.mainloop()
 
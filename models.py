@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from utils.tarification import Tarification
 
 class Document(ABC):
     def __init__(self, titre, status="disponible"):
@@ -25,7 +26,7 @@ class Livre(Document):
         return f"Livre: {self.titre} par {self.auteur}, {self.nb_pages} pages, Genre: {self.genre}"
     
     def calculer_frais_retard(self, jours_retard):
-        return jours_retard * 1.0  # TAUXA = 1.0
+        return Tarification.penalite('livre', jours_retard)
 
 class Magazine(Document):
     def __init__(self, titre, editeur, frequence, numero):
@@ -38,7 +39,7 @@ class Magazine(Document):
         return f"Magazine: {self.titre}, Éditeur: {self.editeur}, N°{self.numero}"
     
     def calculer_frais_retard(self, jours_retard):
-        return (jours_retard * 1.0) + 2.0  # TAUXA = 1.0, TAUXB = 2.0
+        return Tarification.penalite('magazine', jours_retard)
 
 class Journal(Document):
     def __init__(self, titre, editeur, date_publication):
@@ -50,7 +51,7 @@ class Journal(Document):
         return f"Journal: {self.titre}, Éditeur: {self.editeur}, Date: {self.date_publication}"
     
     def calculer_frais_retard(self, jours_retard):
-        return jours_retard * 1.0  # TAUXA = 1.0
+        return Tarification.penalite('journal', jours_retard)
 
 class MultiMedia(Document):
     def __init__(self, titre, type_media, duree):
@@ -62,4 +63,4 @@ class MultiMedia(Document):
         return f"{self.type_media}: {self.titre}, Durée: {self.duree} min"
     
     def calculer_frais_retard(self, jours_retard):
-        return (self.duree * 1.0) + (jours_retard * 2.0)  # TAUXA = 1.0, TAUXB = 2.0 
\ No newline at end of file
+        return Tarification.penalite('multimedia', jours_retard, self.duree) 
\ No newline at end of file
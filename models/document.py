@@ -1,7 +1,51 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from functools import lru_cache
+import json
+from utils.tarification import Tarification
+
+# Registre type stocké en base -> classe de document (voir enregistrer_type)
+TYPES_DOCUMENTS = {}
+
+
+def enregistrer_type(type_doc):
+    """Associe une classe de document à la valeur de la colonne documents.type"""
+    def decorateur(cls):
+        cls.TYPE = type_doc
+        TYPES_DOCUMENTS[type_doc] = cls
+        return cls
+    return decorateur
+
+
+@lru_cache(maxsize=4096)
+def _parser_date(valeur):
+    # Les dates de publication se répètent beaucoup dans un catalogue
+    try:
+        return datetime.fromisoformat(valeur)
+    except (ValueError, TypeError):
+        return None
+
+
+def document_depuis_ligne(type_doc, doc_id, titre, status, details):
+    """Construit le document correspondant à une ligne de la table documents
+
+    details peut être la chaîne JSON stockée ou un dict déjà décodé.
+    Retourne None si le type n'est pas enregistré.
+    """
+    cls = TYPES_DOCUMENTS.get(type_doc)
+    if cls is None:
+        print(f"Type de document non reconnu: {type_doc}")
+        return None
+    if isinstance(details, str):
+        details = json.loads(details)
+    date_publication = _parser_date(details.get('date_publication'))
+    return cls.depuis_details(doc_id, titre, details, date_publication, status)
+
 
 class Document(ABC):
+    __slots__ = ('_id', '_titre', '_date_publication', '_status')
+    TYPE = None
+
     def __init__(self, id=None, titre="", date_publication=None, status="disponible"):
         self._id = id
         self._titre = titre
@@ -14,7 +58,7 @@ class Document(ABC):
         else:
             self._date_publication = date_publication or datetime.now()
         self._status = status
-    
+
     @property
     def id(self): return self._id
     @property
@@ -23,11 +67,20 @@ class Document(ABC):
     def status(self): return self._status
     @property
     def date_publication(self): return self._date_publication
-    
+
+    @classmethod
     @abstractmethod
+    def depuis_details(cls, id, titre, details, date_publication, status):
+        """Construit le document à partir du dict details stocké en base"""
+
+    def details_stockage(self):
+        """Dict sérialisé dans la colonne documents.details"""
+        return {'date_publication': self._date_publication.strftime('%Y-%m-%d')}
+
     def calculer_frais_retard(self, jours_retard):
-        pass
-    
+        # Barème commun : voir Tarification.BAREME
+        return Tarification.penalite(self.TYPE, jours_retard, getattr(self, 'duree', 0))
+
     def get_details(self):
         # Implémentation de base pour tous les documents
         return {
@@ -37,17 +90,30 @@ class Document(ABC):
             'status': self._status
         }
 
+@enregistrer_type('livre')
 class Livre(Document):
-    def __init__(self, id=None, titre="", auteur="", nb_pages=0, genre="", 
+    __slots__ = ('_auteur', '_nb_pages', '_genre')
+
+    def __init__(self, id=None, titre="", auteur="", nb_pages=0, genre="",
                  date_publication=None, status="disponible"):
         super().__init__(id, titre, date_publication, status)
         self._auteur = auteur
         self._nb_pages = nb_pages
         self._genre = genre
-    
-    def calculer_frais_retard(self, jours_retard):
-        return 0.50 * jours_retard  # 50 centimes par jour
-    
+
+    @classmethod
+    def depuis_details(cls, id, titre, details, date_publication, status):
+        return cls(id, titre, details.get('auteur', ''), int(details.get('nb_pages', 0)),
+                   details.get('genre', ''), date_publication, status)
+
+    def details_stockage(self):
+        return {
+            'auteur': self._auteur,
+            'nb_pages': self._nb_pages,
+            'genre': self._genre,
+            **super().details_stockage()
+        }
+
     def get_details(self):
         details = super().get_details()
         details.update({
@@ -57,17 +123,30 @@ class Livre(Document):
         })
         return details
 
+@enregistrer_type('magazine')
 class Magazine(Document):
+    __slots__ = ('_editeur', '_frequence', '_numero')
+
     def __init__(self, id=None, titre="", editeur="", frequence="", numero="",
                  date_publication=None, status="disponible"):
         super().__init__(id, titre, date_publication, status)
         self._editeur = editeur
         self._frequence = frequence  # hebdomadaire, mensuel, etc.
         self._numero = numero
-    
-    def calculer_frais_retard(self, jours_retard):
-        return (0.30 * jours_retard) + 1.0  # 30 centimes par jour + 1€ fixe
-    
+
+    @classmethod
+    def depuis_details(cls, id, titre, details, date_publication, status):
+        return cls(id, titre, details.get('editeur', ''), details.get('frequence', ''),
+                   details.get('numero', ''), date_publication, status)
+
+    def details_stockage(self):
+        return {
+            'editeur': self._editeur,
+            'frequence': self._frequence,
+            'numero': self._numero,
+            **super().details_stockage()
+        }
+
     def get_details(self):
         details = super().get_details()
         details.update({
@@ -77,14 +156,21 @@ class Magazine(Document):
         })
         return details
 
+@enregistrer_type('journal')
 class Journal(Document):
+    __slots__ = ('_editeur',)
+
     def __init__(self, id=None, titre="", editeur="", date_publication=None, status="disponible"):
         super().__init__(id, titre, date_publication, status)
         self._editeur = editeur
-    
-    def calculer_frais_retard(self, jours_retard):
-        return 0.70 * jours_retard  # 70 centimes par jour
-    
+
+    @classmethod
+    def depuis_details(cls, id, titre, details, date_publication, status):
+        return cls(id, titre, details.get('editeur', ''), date_publication, status)
+
+    def details_stockage(self):
+        return {'editeur': self._editeur, **super().details_stockage()}
+
     def get_details(self):
         details = super().get_details()
         details.update({
@@ -92,22 +178,38 @@ class Journal(Document):
         })
         return details
 
+@enregistrer_type('multimedia')
 class OuvrageMultimedia(Document):
-    def __init__(self, id=None, titre="", type_media="", duree=0, 
+    __slots__ = ('_type_media', '_duree')
+
+    def __init__(self, id=None, titre="", type_media="", duree=0,
                  date_publication=None, status="disponible"):
         super().__init__(id, titre, date_publication, status)
         self._type_media = type_media  # CD ou DVD
         self._duree = duree  # en minutes
-    
-    def calculer_frais_retard(self, jours_retard):
-        # 1€ par jour + supplément selon le type
-        supplement = 2.0 if self._type_media.upper() == "DVD" else 1.0
-        return (1.0 * jours_retard) + supplement
-    
+
+    @classmethod
+    def depuis_details(cls, id, titre, details, date_publication, status):
+        return cls(id, titre, details.get('type_media', ''), int(details.get('duree', 0)),
+                   date_publication, status)
+
+    def details_stockage(self):
+        return {
+            'type_media': self._type_media,
+            'duree': self._duree,
+            **super().details_stockage()
+        }
+
+    @property
+    def duree(self): return self._duree
+
     def get_details(self):
         details = super().get_details()
         details.update({
             'type_media': self._type_media,
             'duree': self._duree
         })
-        return details 
\ No newline at end of file
+        return details
+
+# Type enregistré par d'anciennes versions pour les documents multimédias
+TYPES_DOCUMENTS['ouvragemultimedia'] = OuvrageMultimedia
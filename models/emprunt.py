@@ -1,6 +1,25 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from utils.tarification import Tarification
-from models.document import Livre, Magazine, Journal, OuvrageMultimedia
+
+# Les dates d'emprunt sont stockées en jours depuis le 1970-01-01 (INTEGER)
+_ORDINAL_1970 = date(1970, 1, 1).toordinal()
+
+
+def jour_depuis_date(valeur):
+    """date ou datetime -> numéro de jour stocké en base"""
+    return valeur.toordinal() - _ORDINAL_1970
+
+
+def date_depuis_jour(jour):
+    """Numéro de jour stocké en base -> datetime à minuit (None si absent)"""
+    if jour is None:
+        return None
+    return datetime.fromordinal(jour + _ORDINAL_1970)
+
+
+def aujourd_hui():
+    return jour_depuis_date(date.today())
+
 
 class Emprunt:
     def __init__(self, id, document, date_emprunt, date_retour=None, date_retour_prevue=None):
@@ -14,35 +33,32 @@ class Emprunt:
         else:
             self.date_retour_prevue = date_retour_prevue
 
-    def est_en_retard(self):
+    @classmethod
+    def depuis_ligne(cls, id, document, jour_emprunt, jour_retour, jour_retour_prevue):
+        """Construit l'emprunt à partir des numéros de jour lus en base"""
+        return cls(id, document, date_depuis_jour(jour_emprunt),
+                   date_depuis_jour(jour_retour), date_depuis_jour(jour_retour_prevue))
+
+    def jours_retard(self, jour=None):
+        """Jours de retard à la date jour (numéro de jour, aujourd'hui par défaut)"""
         if not self.date_retour_prevue:
-            return False
+            return 0
         if self.date_retour:
-            return self.date_retour > self.date_retour_prevue
-        return datetime.now() > self.date_retour_prevue
+            fin = jour_depuis_date(self.date_retour)
+        else:
+            fin = jour if jour is not None else aujourd_hui()
+        return max(0, fin - jour_depuis_date(self.date_retour_prevue))
 
-    def jours_retard(self):
-        if not self.est_en_retard():
-            return 0
-        
-        date_fin = self.date_retour if self.date_retour else datetime.now()
-        return (date_fin - self.date_retour_prevue).days
-
-    def calculer_penalites(self):
-        if not self.est_en_retard():
-            return 0.0
-        
-        jours = self.jours_retard()
-        
-        if isinstance(self.document, Livre):
-            return Tarification.TAUX_A * jours
-        elif isinstance(self.document, Magazine):
-            return (Tarification.TAUX_A * jours) + Tarification.TAUX_B
-        elif isinstance(self.document, Journal):
-            return Tarification.TAUX_A * jours
-        elif isinstance(self.document, OuvrageMultimedia):
-            return (Tarification.TAUX_A * self.document.duree) + (Tarification.TAUX_B * jours)
-        return 0.0
+    def est_en_retard(self, jour=None):
+        return self.jours_retard(jour) > 0
+
+    def calculer_penalites(self, jour=None):
+        # Même barème que l'évaluation en lot (database/penalites.py)
+        return Tarification.penalite(
+            getattr(self.document, 'TYPE', None),
+            self.jours_retard(jour),
+            getattr(self.document, 'duree', 0)
+        )
 
     def get_status(self):
         if self.date_retour:
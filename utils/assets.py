@@ -0,0 +1,103 @@
+import hashlib
+import os
+import threading
+import tkinter as tk
+
+# Chemins résolus depuis le projet, pas depuis le répertoire courant
+DOSSIER_PROJET = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOSSIER_IMAGES = os.path.join(DOSSIER_PROJET, 'image')
+DOSSIER_CACHE = os.path.join(DOSSIER_PROJET, 'cache', 'images')
+
+
+def chemin_projet(*parties):
+    return os.path.join(DOSSIER_PROJET, *parties)
+
+
+class GestionnaireAssets:
+    """Images de l'interface, dérivées une fois puis gardées sur disque et en mémoire.
+
+    Une variante (image source redimensionnée) est enregistrée en PNG dans
+    le cache disque sous une clé tirée du contenu de la source et de la
+    taille demandée : une image modifiée produit une nouvelle variante. Le
+    PNG est relu directement par Tk, sans Pillow. Les PhotoImage créées sont
+    conservées, si bien qu'une vue reconstruite réutilise la même image.
+    """
+
+    def __init__(self, dossier_images=DOSSIER_IMAGES, dossier_cache=DOSSIER_CACHE):
+        self.dossier_images = dossier_images
+        self.dossier_cache = dossier_cache
+        self._photos = {}  # (nom, taille) -> PhotoImage, thread de Tk uniquement
+        self._lock = threading.Lock()
+
+    def source(self, nom):
+        return os.path.join(self.dossier_images, nom)
+
+    def _empreinte(self, chemin):
+        sha = hashlib.sha256()
+        with open(chemin, 'rb') as f:
+            for bloc in iter(lambda: f.read(65536), b''):
+                sha.update(bloc)
+        return sha.hexdigest()[:16]
+
+    def preparer(self, nom, taille=None):
+        """Chemin d'un fichier lisible par Tk pour nom à la taille (largeur, hauteur)
+
+        Sans taille, la source est utilisée telle quelle. Peut s'exécuter hors
+        du thread de Tk (aucun appel à Tk).
+        """
+        source = self.source(nom)
+        if taille is None:
+            return source
+
+        largeur, hauteur = taille
+        base = os.path.splitext(nom)[0]
+        variante = os.path.join(
+            self.dossier_cache, f"{base}-{self._empreinte(source)}-{largeur}x{hauteur}.png")
+        if os.path.exists(variante):
+            return variante
+
+        # Première utilisation de cette variante : redimensionner avec Pillow
+        from PIL import Image
+        with Image.open(source) as image:
+            image = image.resize((largeur, hauteur), Image.Resampling.LANCZOS)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            with self._lock:
+                os.makedirs(self.dossier_cache, exist_ok=True)
+            # Écriture atomique : un autre appel peut préparer la même variante
+            temporaire = f"{variante}.{os.getpid()}.{threading.get_ident()}.tmp"
+            image.save(temporaire, 'PNG')
+        os.replace(temporaire, variante)
+        return variante
+
+    def photo_en_memoire(self, nom, taille=None):
+        return self._photos.get((nom, taille))
+
+    def photo(self, nom, taille=None, chemin=None):
+        """PhotoImage de la variante (à appeler depuis le thread de Tk)"""
+        cle = (nom, taille)
+        photo = self._photos.get(cle)
+        if photo is None:
+            photo = tk.PhotoImage(file=chemin or self.preparer(nom, taille))
+            self._photos[cle] = photo
+        return photo
+
+    def charger(self, nom, taille, sur_image, executer=None, widget=None):
+        """Appelle sur_image(photo) dès que l'image est prête
+
+        Avec executer (MainController.executer), la variante est préparée
+        hors du thread de Tk; une image déjà en mémoire est donnée tout de suite.
+        """
+        photo = self.photo_en_memoire(nom, taille)
+        if photo is not None:
+            sur_image(photo)
+            return
+        if executer is None:
+            sur_image(self.photo(nom, taille))
+            return
+        executer(
+            self.preparer, nom, taille,
+            sur_resultat=lambda chemin: sur_image(self.photo(nom, taille, chemin)),
+            sur_erreur=lambda e: print(f"Erreur lors du chargement de l'image {nom}: {e}"),
+            widget=widget
+        )
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """Cache borné (LRU) avec durée de vie, partagé entre threads.
+
+    obtenir(cle, charger) lit à travers le cache : en cas d'absence, charger(cle)
+    est appelé hors verrou et son résultat est conservé (sauf None). Une
+    invalidation survenue pendant le chargement empêche de conserver une
+    valeur devenue obsolète.
+    """
+
+    def __init__(self, taille_max=1000, duree_vie=300.0, horloge=time.monotonic):
+        self.taille_max = taille_max
+        self.duree_vie = duree_vie
+        self.horloge = horloge
+        self._entrees = OrderedDict()  # cle -> (valeur, expiration)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+
+    def _lire(self, cle):
+        entree = self._entrees.get(cle)
+        if entree is None:
+            return None, False
+        valeur, expiration = entree
+        if self.horloge() >= expiration:
+            del self._entrees[cle]
+            self.stats['expirations'] += 1
+            return None, False
+        self._entrees.move_to_end(cle)
+        return valeur, True
+
+    def get(self, cle, defaut=None):
+        with self._lock:
+            valeur, trouve = self._lire(cle)
+            self.stats['hits' if trouve else 'misses'] += 1
+        return valeur if trouve else defaut
+
+    def mettre(self, cle, valeur):
+        with self._lock:
+            self._mettre(cle, valeur)
+
+    def _mettre(self, cle, valeur):
+        if self.taille_max <= 0:
+            return
+        self._entrees[cle] = (valeur, self.horloge() + self.duree_vie)
+        self._entrees.move_to_end(cle)
+        while len(self._entrees) > self.taille_max:
+            self._entrees.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def obtenir(self, cle, charger):
+        with self._lock:
+            valeur, trouve = self._lire(cle)
+            self.stats['hits' if trouve else 'misses'] += 1
+            generation = self._generation
+        if trouve:
+            return valeur
+
+        valeur = charger(cle)
+        if valeur is not None:
+            with self._lock:
+                if self._generation == generation:
+                    self._mettre(cle, valeur)
+        return valeur
+
+    def invalider(self, *cles):
+        with self._lock:
+            self._generation += 1
+            for cle in cles:
+                if self._entrees.pop(cle, None) is not None:
+                    self.stats['invalidations'] += 1
+
+    def vider(self):
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidations'] += len(self._entrees)
+            self._entrees.clear()
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['taille'] = len(self._entrees)
+        stats['taille_max'] = self.taille_max
+        demandes = stats['hits'] + stats['misses']
+        stats['taux_hits'] = stats['hits'] / demandes if demandes else 0.0
+        return stats
@@ -19,7 +19,17 @@ class ConfigManager:
             'session_duration': 7200,  # 2 hours in seconds
             'max_login_attempts': 3,
             'log_level': 'INFO',
+            'log_retention_jours': 30,  # fichiers journaux compressés gardés
+            'log_echantillonnage': {'get_document': 100},  # actions fréquentes : 1 sur N
+            'log_dossier': None,  # dossier des journaux, logs/ du projet si None
             'db_file': 'bibliotheque.db',
+            'storage_profile': 'desk',  # desk, safe ou profil de storage_profiles
+            'storage_profiles': {},
+            'cache_documents': 2000,  # entrées, 0 pour désactiver
+            'cache_utilisateurs': 500,
+            'cache_ttl': 300,  # secondes
+            'threads_taches': 4,  # appels à la base hors du thread de Tk
+            'vues_en_cache': 4,  # vues du tableau de bord gardées entre deux clics de menu
             'secret_key': 'your-secret-key-change-this'
         }
         self._load_config()
@@ -1,56 +1,142 @@
+import atexit
+import copy
+import gzip
+import itertools
+import json
 import logging
-from datetime import datetime
+import logging.handlers
 import os
+import queue
+import shutil
+from datetime import datetime
+from utils.config_manager import ConfigManager
+
+DOSSIER_LOGS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+
+
+class FormateurJSON(logging.Formatter):
+    """Une ligne JSON par enregistrement (JSON Lines)"""
+
+    def format(self, record):
+        ligne = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'niveau': record.levelname,
+        }
+        if isinstance(record.msg, dict):
+            ligne.update(record.msg)
+        else:
+            ligne['message'] = record.getMessage()
+        if record.exc_info:
+            ligne['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            ligne['exception'] = record.exc_text
+        return json.dumps(ligne, ensure_ascii=False, default=str)
+
+
+class _FileAttente(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Le message (dict) est transmis tel quel : c'est le formateur JSON qui l'écrit
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _compresser(source, destination):
+    with open(source, 'rb') as entree, gzip.open(destination, 'wb') as sortie:
+        shutil.copyfileobj(entree, sortie)
+    os.remove(source)
+
 
 class LibraryLogger:
+    """Journal de l'application, écrit hors du thread appelant.
+
+    Les enregistrements passent par une file vidée par un QueueListener :
+    l'interface n'attend jamais le disque. Le fichier library.jsonl du
+    dossier log_dossier (logs/ du projet par défaut) change à minuit; les
+    jours précédents sont compressés (gzip) et seuls les log_retention_jours
+    derniers sont gardés. Les actions fréquentes
+    (log_echantillonnage, ex. {'get_document': 100}) ne sont écrites qu'une
+    fois sur N, avec le champ echantillon = N.
+    """
     _instance = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(LibraryLogger, cls).__new__(cls)
             cls._instance._initialize_logger()
         return cls._instance
-    
+
     def _initialize_logger(self):
+        config = ConfigManager()
         self.logger = logging.getLogger('library')
-        self.logger.setLevel(logging.INFO)
-        
-        # Créer le dossier logs s'il n'existe pas
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
-        
-        # Log file handler
-        file_handler = logging.FileHandler(
-            f'logs/library_{datetime.now().strftime("%Y%m%d")}.log'
+        self.logger.setLevel(config.get('log_level', 'INFO'))
+        self.logger.propagate = False
+
+        # Créer le dossier logs s'il n'existe pas (log_dossier : dossier du projet par défaut)
+        dossier = config.get('log_dossier') or DOSSIER_LOGS
+        os.makedirs(dossier, exist_ok=True)
+
+        # Fichier JSON Lines, rotation quotidienne compressée
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            os.path.join(dossier, 'library.jsonl'),
+            when='midnight',
+            backupCount=config.get('log_retention_jours', 30),
+            encoding='utf-8',
+            delay=True
         )
-        file_handler.setLevel(logging.INFO)
-        
+        file_handler.namer = lambda nom: nom + '.gz'
+        file_handler.rotator = _compresser
+        file_handler.setFormatter(FormateurJSON())
+
         # Console handler
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        
-        # Formatter
-        formatter = logging.Formatter(
+        console_handler.setFormatter(logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        ))
+
+        # Écriture (et rotation) dans le thread du listener
+        self.file = queue.SimpleQueue()
+        self.logger.handlers = [_FileAttente(self.file)]
+        self.listener = logging.handlers.QueueListener(
+            self.file, file_handler, console_handler, respect_handler_level=True
         )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-        
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
-    
+        self.listener.start()
+        atexit.register(self.fermer)
+
+        self.echantillonnage = config.get('log_echantillonnage', {'get_document': 100})
+        self._compteurs = {action: itertools.count() for action in self.echantillonnage}
+
+    def fermer(self):
+        """Écrit les enregistrements en attente et arrête le listener"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def _echantillon(self, action_type):
+        # None : pas d'échantillonnage; 0 : enregistrement ignoré
+        taux = self.echantillonnage.get(action_type)
+        if not taux or taux <= 1:
+            return None
+        return taux if next(self._compteurs[action_type]) % taux == 0 else 0
+
     def log_action(self, action_type, user_id, details):
-        self.logger.info({
+        echantillon = self._echantillon(action_type)
+        if echantillon == 0:
+            return
+        enregistrement = {
             'action': action_type,
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
             'details': details
-        })
-    
+        }
+        if echantillon:
+            enregistrement['echantillon'] = echantillon
+        self.logger.info(enregistrement)
+
     def log_error(self, error_type, user_id, error_details):
         self.logger.error({
             'error': error_type,
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
             'details': error_details
-        }) 
\ No newline at end of file
+        })
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import List, Dict, Any
+from database.recherche import expression_fts, ordre_bm25
 
 class SearchManager:
     def __init__(self, db_manager):
@@ -15,17 +16,26 @@ class SearchManager:
         }
     
     def search_documents(self, criteria: Dict[str, Any]) -> List[Dict]:
-        query = """
-            SELECT d.id, d.type, d.titre, d.status, d.details, 
-                   d.quantite, d.quantite_disponible 
-            FROM documents d
-            WHERE 1=1
-        """
         params = []
         
-        if 'titre' in criteria and criteria['titre']:
-            query += " AND LOWER(d.titre) LIKE LOWER(?)"
-            params.append(f"%{criteria['titre']}%")
+        # Critères textuels : index plein texte, classement bm25
+        match = expression_fts(criteria)
+        if match:
+            query = """
+                SELECT d.id, d.type, d.titre, d.status, d.details, 
+                       d.quantite, d.quantite_disponible 
+                FROM documents_fts
+                JOIN documents d ON d.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+            """
+            params.append(match)
+        else:
+            query = """
+                SELECT d.id, d.type, d.titre, d.status, d.details, 
+                       d.quantite, d.quantite_disponible 
+                FROM documents d
+                WHERE 1=1
+            """
         
         if 'type' in criteria and criteria['type']:
             query += " AND d.type = ?"
@@ -36,17 +46,14 @@ class SearchManager:
             params.append(criteria['status'])
         
         if 'date_debut' in criteria and criteria['date_debut']:
-            query += " AND json_extract(d.details, '$.date_publication') >= ?"
+            query += " AND d.date_publication >= ?"
             params.append(criteria['date_debut'])
         
         if 'date_fin' in criteria and criteria['date_fin']:
-            query += " AND json_extract(d.details, '$.date_publication') <= ?"
+            query += " AND d.date_publication <= ?"
             params.append(criteria['date_fin'])
         
-        # Recherche dans les détails JSON
-        for field in ['auteur', 'editeur', 'genre']:
-            if field in criteria and criteria[field]:
-                query += f" AND json_extract(d.details, '$.{field}') LIKE ?"
-                params.append(f"%{criteria[field]}%")
+        if match:
+            query += f" ORDER BY {ordre_bm25()}"
         
         return self.db.execute_query(query, params) 
\ No newline at end of file
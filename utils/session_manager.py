@@ -1,5 +1,4 @@
 from datetime import datetime, timedelta
-import jwt
 import uuid
 
 class SessionManager:
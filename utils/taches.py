@@ -0,0 +1,126 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Tache:
+    """Appel soumis au GestionnaireTaches; annuler() écarte son résultat"""
+
+    def __init__(self, cle=None):
+        self.cle = cle
+        self.future = None
+        self._annulee = threading.Event()
+
+    def annuler(self):
+        self._annulee.set()
+        if self.future is not None:
+            self.future.cancel()  # sans effet si l'appel a déjà commencé
+
+    @property
+    def annulee(self):
+        return self._annulee.is_set()
+
+
+class GestionnaireTaches:
+    """Exécute les appels lents (base de données) hors du thread de Tk.
+
+    Les résultats passent par une file que le thread de Tk relève avec after()
+    tant que des tâches sont en cours : Tk n'est jamais appelé depuis un
+    thread du pool. Une tâche soumise avec une clé annule la précédente de
+    même clé (ex. une nouvelle recherche remplace celle en cours).
+    """
+
+    def __init__(self, nb_threads=4, intervalle=25):
+        self.intervalle = intervalle
+        self.racine = None
+        self._executeur = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix='tache')
+        self._resultats = queue.SimpleQueue()
+        self._par_cle = {}
+        self._en_cours = 0
+        self._sondage = None
+
+    def attacher(self, racine):
+        """Fenêtre Tk qui reçoit les résultats (à appeler depuis le thread de Tk)"""
+        self.racine = racine
+        if self._en_cours > 0:
+            self._planifier()
+
+    def soumettre(self, fonction, *args, sur_resultat=None, sur_erreur=None, cle=None, widget=None, **kwargs):
+        """Lance fonction(*args, **kwargs) dans le pool
+
+        sur_resultat(resultat) ou sur_erreur(exception) sont appelés dans le
+        thread de Tk, sauf si la tâche a été annulée ou si widget a été détruit.
+        """
+        if cle is not None:
+            self.annuler(cle)
+        tache = Tache(cle)
+        if cle is not None:
+            self._par_cle[cle] = tache
+
+        def executer():
+            resultat = erreur = None
+            if not tache.annulee:
+                try:
+                    resultat = fonction(*args, **kwargs)
+                except Exception as e:
+                    erreur = e
+            self._resultats.put((tache, resultat, erreur, sur_resultat, sur_erreur, widget))
+
+        self._en_cours += 1
+        tache.future = self._executeur.submit(executer)
+        tache.future.add_done_callback(self._sur_fin)
+        self._planifier()
+        return tache
+
+    def _sur_fin(self, future):
+        # Tâche annulée avant son démarrage : rien ne passera par la file
+        if future.cancelled():
+            self._resultats.put(None)
+
+    def annuler(self, cle):
+        tache = self._par_cle.pop(cle, None)
+        if tache is not None:
+            tache.annuler()
+
+    def _planifier(self):
+        if self._sondage is None and self.racine is not None:
+            self._sondage = self.racine.after(self.intervalle, self._relever)
+
+    def _relever(self):
+        self._sondage = None
+        while True:
+            try:
+                element = self._resultats.get_nowait()
+            except queue.Empty:
+                break
+            self._en_cours -= 1
+            if element is None:
+                continue
+            tache, resultat, erreur, sur_resultat, sur_erreur, widget = element
+            if tache.cle is not None and self._par_cle.get(tache.cle) is tache:
+                del self._par_cle[tache.cle]
+            if tache.annulee or (widget is not None and not widget.winfo_exists()):
+                continue
+            try:
+                if erreur is not None:
+                    if sur_erreur is not None:
+                        sur_erreur(erreur)
+                    else:
+                        print(f"Erreur dans une tâche de fond: {erreur}")
+                elif sur_resultat is not None:
+                    sur_resultat(resultat)
+            except Exception as e:
+                print(f"Erreur lors de l'affichage du résultat d'une tâche: {e}")
+        # Relever tant que des tâches sont en cours, puis laisser Tk au repos
+        if self._en_cours > 0:
+            self._planifier()
+
+    def arreter(self, attendre=False):
+        """Arrête le pool; avec attendre, les tâches sans clé déjà soumises
+        (écritures, ex. retours en lot) s'exécutent avant la fermeture"""
+        for cle in list(self._par_cle):
+            self.annuler(cle)
+        if self._sondage is not None and self.racine is not None:
+            self.racine.after_cancel(self._sondage)
+            self._sondage = None
+        self._executeur.shutdown(wait=attendre, cancel_futures=not attendre)
@@ -1,4 +1,24 @@
 class Tarification:
     TAUX_A = 0.50  # 0.50€ par jour de retard
     TAUX_B = 5.00  # 5€ de pénalité fixe
-    DUREE_EMPRUNT = 30  # Durée d'emprunt en jours 
\ No newline at end of file
+    DUREE_EMPRUNT = 30  # Durée d'emprunt en jours
+
+    # Barème unique des pénalités de retard, par type de document :
+    # (par jour de retard, par minute de durée, forfait)
+    #   livre, journal : TAUX_A x jours
+    #   magazine       : TAUX_A x jours + TAUX_B
+    #   multimedia     : TAUX_A x durée + TAUX_B x jours
+    BAREME = {
+        'livre': (TAUX_A, 0.0, 0.0),
+        'magazine': (TAUX_A, 0.0, TAUX_B),
+        'journal': (TAUX_A, 0.0, 0.0),
+        'multimedia': (TAUX_B, TAUX_A, 0.0),
+    }
+
+    @classmethod
+    def penalite(cls, type_doc, jours_retard, duree=0):
+        """Montant dû pour jours_retard jours de retard (0 si pas de retard)"""
+        if jours_retard <= 0:
+            return 0.0
+        par_jour, par_minute, forfait = cls.BAREME.get(type_doc, (0.0, 0.0, 0.0))
+        return round(par_jour * jours_retard + par_minute * (duree or 0) + forfait, 2)
@@ -1,13 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from .document_management_view import AddDocumentDialog
 import tkinter.messagebox as messagebox
-from .emprunt_view import EmpruntView
-from .user_view import UserView
 from utils.tooltip import ToolTip
-from .search_view import SearchView
-from views.edit_document_dialog import EditDocumentDialog
-from models.document import Livre, Magazine, Journal, OuvrageMultimedia
+from .liste_virtuelle import ListePaginee, valeurs_document
+from .registre_vues import RegistreVues
+
+# Les autres vues et les dialogues sont importés à leur premier affichage :
+# seul le catalogue est nécessaire pour afficher le tableau de bord
 
 class DashboardView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -58,6 +57,14 @@ class DashboardView(ttk.Frame):
         self.content_frame = ttk.Frame(self, style='Content.TFrame')
         self.content_frame.pack(fill='both', expand=True, padx=20, pady=0)  # Changer pady=20 en pady=0
         
+        # Vues gardées entre deux clics de menu, rafraîchies si les données ont changé
+        self.vues = RegistreVues(
+            self.content_frame,
+            version=self.controller.version_connue,
+            verifier=self.controller.verifier_version,
+            max_vues=self.controller.config.get('vues_en_cache', 4)
+        )
+        
         # Afficher le catalogue par défaut
         self.show_catalogue()
     
@@ -119,6 +126,24 @@ class DashboardView(ttk.Frame):
                 command=self.show_gestion_utilisateurs,
                 style='Menu.TButton'
             ).pack(side='left', padx=5)
+            
+            retours_btn = ttk.Button(
+                menu_frame,
+                text="Retours",
+                command=self.show_retours,
+                style='Menu.TButton'
+            )
+            retours_btn.pack(side='left', padx=5)
+            ToolTip(retours_btn, "Enregistrer les retours scannés (boîte de retour)")
+            
+            stats_btn = ttk.Button(
+                menu_frame,
+                text="Statistiques",
+                command=self.show_statistiques,
+                style='Menu.TButton'
+            )
+            stats_btn.pack(side='left', padx=5)
+            ToolTip(stats_btn, "Indicateurs de la bibliothèque")
         
         # Ajouter le bouton de recherche avancée
         search_btn = ttk.Button(
@@ -130,11 +155,21 @@ class DashboardView(ttk.Frame):
         search_btn.pack(side='left', padx=5)
         ToolTip(search_btn, "Recherche avancée dans le catalogue")
     
+    def afficher_vue(self, nom, fabrique):
+        vue = self.vues.afficher(nom, fabrique)
+        # Les actions sur les documents portent sur la liste affichée
+        if hasattr(vue, 'chargeur'):
+            self.tree = vue.tree
+            self.chargeur = vue.chargeur
+        return vue
+    
+    def rafraichir(self):
+        self.vues.rafraichir_courante()
+    
     def show_catalogue(self):
-        # Nettoyer le contenu
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
+        self.afficher_vue('catalogue', self.creer_catalogue)
+    
+    def creer_catalogue(self, parent):
         # Configuration du style pour le catalogue
         style = ttk.Style()
         style.configure("Modern.Treeview", 
@@ -153,9 +188,8 @@ class DashboardView(ttk.Frame):
                  background=[("selected", "#2196F3")],
                  foreground=[("selected", "white")])
         
-        # Frame principal sans padding
-        main_frame = ttk.Frame(self.content_frame, style='Content.TFrame')
-        main_frame.pack(fill='both', expand=True)
+        # Frame principal sans padding (affiché par le registre de vues)
+        main_frame = ttk.Frame(parent, style='Content.TFrame')
         
         # Bouton d'emprunt en haut avec style spécial
         top_frame = ttk.Frame(main_frame, style='Content.TFrame')
@@ -175,8 +209,8 @@ class DashboardView(ttk.Frame):
         
         # Tableau moderne
         columns = ('ID', 'Type', 'Titre', 'Status', 'Détails')
-        self.tree = ttk.Treeview(main_frame, columns=columns, show='headings', 
-                                height=20, style="Modern.Treeview")
+        tree = ttk.Treeview(main_frame, columns=columns, show='headings',
+                            height=20, style="Modern.Treeview")
         
         # Configuration des colonnes
         column_widths = {
@@ -188,30 +222,31 @@ class DashboardView(ttk.Frame):
         }
         
         for col in columns:
-            self.tree.heading(col, text=col.upper(), anchor='w')
-            self.tree.column(col, width=column_widths[col], anchor='w')
+            tree.heading(col, text=col.upper(), anchor='w')
+            tree.column(col, width=column_widths[col], anchor='w')
         
         # Placement direct du tableau et scrollbar sans frame intermédiaire
-        self.tree.pack(side='left', fill='both', expand=True)
-        scrollbar = ttk.Scrollbar(main_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar = ttk.Scrollbar(main_frame, orient='vertical', command=tree.yview)
         scrollbar.pack(side='right', fill='y')
         
-        # Chargement des documents avec alternance de couleurs
-        documents = self.controller.get_all_documents()
-        for i, doc in enumerate(documents):
-            tags = ('evenrow',) if i % 2 == 0 else ('oddrow',)
-            self.tree.insert('', 'end', values=(
-                doc.id,
-                doc.__class__.__name__,
-                doc.titre,
-                doc.status,
-                str(doc.get_details())
-            ), tags=tags)
-        
         # Configuration des couleurs alternées
-        self.tree.tag_configure('oddrow', background='#f8f9fa')
-        self.tree.tag_configure('evenrow', background='white')
+        tree.tag_configure('oddrow', background='#f8f9fa')
+        tree.tag_configure('evenrow', background='white')
+        
+        # Liste virtuelle : seules les lignes visibles sont créées et lues, page par page
+        main_frame.tree = tree
+        main_frame.chargeur = ListePaginee(
+            tree, scrollbar,
+            self.controller.compter_documents,
+            self.lire_page_catalogue,
+            self.controller.get_documents_par_ids,
+            self.valeurs_document_catalogue,
+            executer=self.controller.executer,
+            journal=self.controller
+        )
+        main_frame.chargeur.recharger()
+        main_frame.rafraichir = main_frame.chargeur.rafraichir
         
         # Menu contextuel moderne
         self.context_menu = tk.Menu(self, tearoff=0, font=('Helvetica', 10),
@@ -222,17 +257,23 @@ class DashboardView(ttk.Frame):
             self.context_menu.add_separator()
         self.context_menu.add_command(label="📚 Emprunter", command=self.demander_emprunt)
         
-        self.tree.bind('<Button-3>', self.show_context_menu)
-        self.tree.bind('<Double-1>', lambda e: self.demander_emprunt())
+        tree.bind('<Button-3>', self.show_context_menu)
+        tree.bind('<Double-1>', lambda e: self.demander_emprunt())
+        return main_frame
+    
+    def lire_page_catalogue(self, apres_id, limite, decalage):
+        # Exécuté dans le pool de tâches : une page du catalogue complet
+        return self.controller.get_documents_page(apres_id, limite, decalage=decalage)
+    
+    def valeurs_document_catalogue(self, doc, index):
+        # Alternance de couleurs selon la position dans la liste complète
+        values, _ = valeurs_document(doc, index)
+        return values, ('evenrow',) if index % 2 == 0 else ('oddrow',)
     
     def show_emprunts(self):
-        # Nettoyer le contenu
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
         # Afficher la vue des emprunts
-        emprunt_view = EmpruntView(self.content_frame, self.controller)
-        emprunt_view.pack(fill='both', expand=True)
+        from .emprunt_view import EmpruntView
+        self.afficher_vue('emprunts', lambda parent: EmpruntView(parent, self.controller))
     
     def show_gestion_documents(self):
         # Vérifier les droits d'administration
@@ -240,16 +281,14 @@ class DashboardView(ttk.Frame):
             messagebox.showerror("Erreur", "Accès non autorisé")
             return
         
-        # Nettoyer le contenu
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
+        self.afficher_vue('gestion_documents', self.creer_gestion_documents)
+    
+    def creer_gestion_documents(self, parent):
         # Frame principal pour la gestion des documents
-        self.gestion_frame = ttk.Frame(self.content_frame)
-        self.gestion_frame.pack(fill='both', expand=True)
+        gestion_frame = ttk.Frame(parent)
         
         # Frame pour les actions
-        action_frame = ttk.LabelFrame(self.gestion_frame, text="Actions", padding="10")
+        action_frame = ttk.LabelFrame(gestion_frame, text="Actions", padding="10")
         action_frame.pack(fill='x', padx=5, pady=5)
         
         # Boutons de gestion
@@ -275,20 +314,17 @@ class DashboardView(ttk.Frame):
         ).pack(side='left', padx=5)
         
         # Frame pour la liste des documents
-        self.list_frame = ttk.LabelFrame(self.gestion_frame, text="Liste des documents", padding="10")
-        self.list_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        list_frame = ttk.LabelFrame(gestion_frame, text="Liste des documents", padding="10")
+        list_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
         # Afficher les documents
-        self.afficher_documents_gestion()
+        self.afficher_documents_gestion(gestion_frame, list_frame)
+        return gestion_frame
 
-    def afficher_documents_gestion(self):
-        # Nettoyer le list_frame
-        for widget in self.list_frame.winfo_children():
-            widget.destroy()
-        
+    def afficher_documents_gestion(self, gestion_frame, list_frame):
         # Créer le tableau des documents avec padding réduit
         columns = ('ID', 'Type', 'Titre', 'Status', 'Détails')
-        self.tree = ttk.Treeview(self.list_frame, columns=columns, show='headings', height=15)
+        tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
         
         # Configuration des colonnes
         column_widths = {
@@ -300,40 +336,55 @@ class DashboardView(ttk.Frame):
         }
         
         for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=column_widths[col], anchor='w')
+            tree.heading(col, text=col)
+            tree.column(col, width=column_widths[col], anchor='w')
         
         # Placement direct du tree et scrollbar sans frame intermédiaire
-        self.tree.pack(side='left', fill='both', expand=True)
-        scrollbar = ttk.Scrollbar(self.list_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=tree.yview)
         scrollbar.pack(side='right', fill='y')
         
-        # Charger les documents
-        documents = self.controller.get_all_documents()
-        for doc in documents:
-            self.tree.insert('', 'end', values=(
-                doc.id,
-                doc.__class__.__name__,
-                doc.titre,
-                doc.status,
-                str(doc.get_details())
-            ))
+        # Liste virtuelle des documents
+        gestion_frame.tree = tree
+        gestion_frame.chargeur = ListePaginee(
+            tree, scrollbar,
+            self.controller.compter_documents,
+            self.lire_page_catalogue,
+            self.controller.get_documents_par_ids,
+            valeurs_document,
+            executer=self.controller.executer,
+            journal=self.controller
+        )
+        gestion_frame.chargeur.recharger()
+        gestion_frame.rafraichir = gestion_frame.chargeur.rafraichir
     
     def show_gestion_utilisateurs(self):
-        # Nettoyer le contenu
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
         # Afficher la vue de gestion des utilisateurs
-        user_view = UserView(self.content_frame, self.controller)
-        user_view.pack(fill='both', expand=True)
+        from .user_view import UserView
+        self.afficher_vue('gestion_utilisateurs', lambda parent: UserView(parent, self.controller))
+    
+    def show_retours(self):
+        # Afficher le poste de retour
+        from .retour_view import RetourView
+        self.afficher_vue('retours', lambda parent: RetourView(parent, self.controller))
+    
+    def show_statistiques(self):
+        # Afficher le panneau de statistiques
+        from .statistiques_view import StatistiquesView
+        self.afficher_vue('statistiques', lambda parent: StatistiquesView(parent, self.controller))
 
+    def rafraichir_documents(self):
+        # Seuls les documents modifiés sont relus : sélection et position conservées
+        chargeur = getattr(self, 'chargeur', None)
+        if chargeur is not None and chargeur.tree.winfo_exists():
+            chargeur.rafraichir()
+    
     def ajouter_document(self):
         if not self.controller.current_user.is_admin():
             messagebox.showerror("Erreur", "Accès non autorisé")
             return
-        dialog = AddDocumentDialog(self, self.controller, self.afficher_documents_gestion)
+        from .document_management_view import AddDocumentDialog
+        dialog = AddDocumentDialog(self, self.controller, self.rafraichir_documents)
         dialog.grab_set()
 
     def show_context_menu(self, event):
@@ -376,7 +427,7 @@ class DashboardView(ttk.Frame):
             success, message = self.controller.demander_emprunt(doc_id)
             if success:
                 messagebox.showinfo("Succès", message)
-                self.show_catalogue()  # Rafraîchir la liste
+                self.rafraichir_documents()
             else:
                 messagebox.showerror("Erreur", message) 
 
@@ -396,7 +447,8 @@ class DashboardView(ttk.Frame):
             return
         
         # Ouvrir la boîte de dialogue d'édition
-        dialog = EditDocumentDialog(self, self.controller, document, self.afficher_documents_gestion)
+        from .edit_document_dialog import EditDocumentDialog
+        dialog = EditDocumentDialog(self, self.controller, document, self.rafraichir_documents)
         dialog.grab_set()
 
     def supprimer_document(self):
@@ -416,15 +468,11 @@ class DashboardView(ttk.Frame):
         if messagebox.askyesno("Confirmation", f"Voulez-vous vraiment supprimer le document '{titre}' ?"):
             if self.controller.supprimer_document(doc_id):
                 messagebox.showinfo("Succès", "Document supprimé avec succès")
-                self.afficher_documents_gestion()
+                self.rafraichir_documents()
             else:
                 messagebox.showerror("Erreur", "Impossible de supprimer le document") 
 
     def show_search(self):
-        # Nettoyer le contenu
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        
         # Afficher la vue de recherche
-        search_view = SearchView(self.content_frame, self.controller)
-        search_view.pack(fill='both', expand=True) 
\ No newline at end of file
+        from .search_view import SearchView
+        self.afficher_vue('search', lambda parent: SearchView(parent, self.controller))
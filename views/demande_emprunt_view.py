@@ -1,5 +1,18 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
+from .pagination import afficher_chargement
+from .index_lignes import IndexLignes
+
+
+def resume_traitement(resultats):
+    """Message récapitulatif d'un traitement par lot des demandes"""
+    traitees = sum(1 for succes, _ in resultats.values() if succes)
+    lignes = [f"{traitees} demande(s) traitée(s) sur {len(resultats)}"]
+    for demande_id, (succes, message) in resultats.items():
+        if not succes:
+            lignes.append(f"Demande {demande_id} : {message}")
+    return "\n".join(lignes)
+
 
 class DemandeEmpruntView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -8,9 +21,18 @@ class DemandeEmpruntView(ttk.Frame):
         self.setup_ui()
     
     def setup_ui(self):
-        # Tableau des demandes
+        # Actions sur plusieurs demandes sélectionnées
+        action_frame = ttk.Frame(self)
+        action_frame.pack(side='bottom', fill='x', pady=5)
+        ttk.Button(action_frame, text="Valider la sélection",
+                  command=self.valider_selection).pack(side='left', padx=5)
+        ttk.Button(action_frame, text="Refuser la sélection",
+                  command=self.refuser_selection).pack(side='left', padx=5)
+        
+        # Tableau des demandes (sélection multiple avec Ctrl/Maj)
         columns = ('ID', 'Utilisateur', 'Document', 'Type', 'Date demande', 'Actions')
-        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=15)
+        self.tree = ttk.Treeview(self, columns=columns, show='headings', height=15,
+                                 selectmode='extended')
         
         # Configuration des colonnes
         for col in columns:
@@ -30,21 +52,28 @@ class DemandeEmpruntView(ttk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        self.index_demandes = IndexLignes(self.tree)
         self.charger_demandes()
     
     def charger_demandes(self):
-        # Nettoyer la liste
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Charger les demandes
-        demandes = self.controller.get_demandes_emprunt()
+        if not self.index_demandes:
+            afficher_chargement(self.tree)
+        self.controller.executer(self.controller.get_demandes_emprunt,
+                                 sur_resultat=self.afficher_demandes,
+                                 cle='demandes_emprunt', widget=self.tree)
+    
+    def afficher_demandes(self, demandes):
+        # Lignes indexées par l'id de la demande : seules les différences touchent au tableau
+        lignes = []
         for demande in demandes:
             demande_id, user_id, doc_id, date_demande, username, titre, type_doc = demande
-            
-            item = self.tree.insert('', 'end', values=(
+            lignes.append((demande_id, (
                 demande_id, username, titre, type_doc, date_demande, ''
-            ))
+            ), ()))
+        self.index_demandes.remplacer(lignes)
+        
+        for demande_id, _, _ in lignes:
+            item = str(demande_id)
             
             # Ajouter les boutons d'action
             frame = ttk.Frame(self.tree)
@@ -66,7 +95,7 @@ class DemandeEmpruntView(ttk.Frame):
                 messagebox.showerror("Erreur", message)
     
     def refuser_demande(self, demande_id):
-        commentaire = tk.simpledialog.askstring("Motif", "Motif du refus :")
+        commentaire = simpledialog.askstring("Motif", "Motif du refus :")
         if commentaire is not None:
             success, message = self.controller.traiter_demande_emprunt(
                 demande_id, 'refusee', commentaire)
@@ -74,4 +103,39 @@ class DemandeEmpruntView(ttk.Frame):
                 messagebox.showinfo("Succès", message)
                 self.charger_demandes()
             else:
-                messagebox.showerror("Erreur", message) 
\ No newline at end of file
+                messagebox.showerror("Erreur", message)
+    
+    def ids_selectionnes(self):
+        return [self.tree.item(item)['values'][0] for item in self.tree.selection()]
+    
+    def valider_selection(self):
+        ids = self.ids_selectionnes()
+        if not ids:
+            messagebox.showwarning("Attention", "Veuillez sélectionner au moins une demande")
+            return
+        if messagebox.askyesno("Confirmation", f"Valider {len(ids)} demande(s) d'emprunt ?"):
+            self.traiter_selection(ids, 'validee')
+    
+    def refuser_selection(self):
+        ids = self.ids_selectionnes()
+        if not ids:
+            messagebox.showwarning("Attention", "Veuillez sélectionner au moins une demande")
+            return
+        commentaire = simpledialog.askstring("Motif", f"Motif du refus ({len(ids)} demande(s)) :")
+        if commentaire is not None:
+            self.traiter_selection(ids, 'refusee', commentaire)
+    
+    def traiter_selection(self, ids, decision, commentaire=""):
+        # Transaction d'écriture en arrière-plan; pas de clé : un lot n'annule pas le précédent
+        self.controller.executer(
+            self.controller.traiter_demandes_emprunt, ids, decision, commentaire,
+            sur_resultat=self.afficher_traitement,
+            sur_erreur=lambda e: messagebox.showerror("Erreur", f"Erreur lors du traitement des demandes : {e}"),
+            widget=self
+        )
+    
+    def afficher_traitement(self, resultats):
+        # Demandes traitées retirées tout de suite, puis liste relue (diff par IndexLignes)
+        self.index_demandes.maj([], supprimees=[d for d, (succes, _) in resultats.items() if succes])
+        messagebox.showinfo("Traitement terminé", resume_traitement(resultats))
+        self.charger_demandes()
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from models.document import Livre, Magazine, Journal, OuvrageMultimedia
 from datetime import datetime
+from .liste_virtuelle import ListePaginee, valeurs_document
 
 class DocumentView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -67,12 +68,17 @@ class DocumentView(ttk.Frame):
         
         # Scrollbar
         scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
         
         # Placement
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
         
+        # Liste virtuelle filtrée côté base
+        self.chargeur = ListePaginee(self.tree, scrollbar, self.compter_documents, self.lire_page,
+                                     self.controller.get_documents_par_ids, valeurs_document,
+                                     executer=self.controller.executer,
+                                     journal=self.controller, garder=self.correspond_aux_filtres)
+        
         # Ajouter un menu contextuel (clic droit) modifié
         self.context_menu = tk.Menu(self, tearoff=0)
         if self.controller.current_user.is_admin():
@@ -95,28 +101,26 @@ class DocumentView(ttk.Frame):
                   command=self.supprimer_document).pack(side='left', padx=5)
     
     def charger_documents(self):
-        # Nettoyer la liste
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Charger les documents
-        documents = self.controller.get_all_documents()
-        for doc in documents:
-            # Filtrer par type si nécessaire
-            if self.type_var.get() != "tous" and doc.__class__.__name__.lower() != self.type_var.get():
-                continue
-            
-            # Filtrer par titre si recherche
-            if self.search_var.get() and self.search_var.get().lower() not in doc.titre.lower():
-                continue
-            
-            self.tree.insert('', 'end', values=(
-                doc.id,
-                doc.__class__.__name__,
-                doc.titre,
-                doc.status,
-                str(doc.get_details())
-            ))
+        # Filtres lus ici, dans le thread de Tk : les pages sont lues en arrière-plan
+        type_doc = self.type_var.get()
+        self.filtres = {
+            'type_doc': None if type_doc == "tous" else type_doc,
+            'titre': self.search_var.get() or None
+        }
+        self.chargeur.recharger(conserver_position=False)
+    
+    def correspond_aux_filtres(self, doc):
+        # Même filtre que get_documents_page, pour les documents modifiés
+        titre = self.filtres['titre']
+        return ((not self.filtres['type_doc'] or doc.TYPE == self.filtres['type_doc'])
+                and (not titre or titre.lower() in doc.titre.lower()))
+    
+    def compter_documents(self):
+        # Filtrer par type et par titre dans la requête
+        return self.controller.compter_documents(**self.filtres)
+    
+    def lire_page(self, apres_id, limite, decalage):
+        return self.controller.get_documents_page(apres_id, limite, decalage=decalage, **self.filtres)
     
     def rechercher(self):
         self.charger_documents()
@@ -134,14 +138,14 @@ class DocumentView(ttk.Frame):
             if messagebox.askyesno("Emprunter", "Voulez-vous emprunter ce document ?"):
                 if self.controller.emprunter_document(doc_id):
                     messagebox.showinfo("Succès", "Document emprunté avec succès")
-                    self.charger_documents()
+                    self.chargeur.rafraichir()
                 else:
                     messagebox.showerror("Erreur", "Impossible d'emprunter ce document")
         elif status == 'emprunté':
             if messagebox.askyesno("Retourner", "Voulez-vous retourner ce document ?"):
                 if self.controller.retourner_document(doc_id):
                     messagebox.showinfo("Succès", "Document retourné avec succès")
-                    self.charger_documents()
+                    self.chargeur.rafraichir()
                 else:
                     messagebox.showerror("Erreur", "Impossible de retourner ce document")
 
@@ -1,6 +1,9 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime
+from .demande_emprunt_view import resume_traitement
+from .pagination import afficher_chargement
+from .index_lignes import IndexLignes
 
 class EmpruntView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -68,6 +71,15 @@ class EmpruntView(ttk.Frame):
             command=self.retourner_document
         ).pack(side='left', padx=5)
         
+        # Solde des pénalités (registre tenu par le cumul quotidien)
+        self.solde_var = tk.StringVar()
+        ttk.Label(action_frame, textvariable=self.solde_var).pack(side='right', padx=5)
+        
+        # Lignes indexées par emprunt : les rafraîchissements ne touchent que les lignes modifiées
+        self.emprunts_tree.tag_configure('retard', foreground='red')
+        self.index_emprunts = IndexLignes(self.emprunts_tree)
+        self.version_emprunts = None
+        
         self.charger_emprunts()
     
     def setup_demandes(self):
@@ -75,9 +87,10 @@ class EmpruntView(ttk.Frame):
         demandes_frame = ttk.Frame(self.demandes_frame)
         demandes_frame.pack(fill='both', expand=True)
         
-        # Tableau des demandes
+        # Tableau des demandes (sélection multiple avec Ctrl/Maj)
         columns = ('ID', 'Utilisateur', 'Document', 'Type', 'Date demande', 'Actions')
-        self.demandes_tree = ttk.Treeview(demandes_frame, columns=columns, show='headings', height=15)
+        self.demandes_tree = ttk.Treeview(demandes_frame, columns=columns, show='headings', height=15,
+                                          selectmode='extended')
         
         # Configuration des colonnes
         for col in columns:
@@ -99,60 +112,127 @@ class EmpruntView(ttk.Frame):
         
         # Ajouter un gestionnaire d'événements pour le double-clic
         self.demandes_tree.bind('<Double-Button-1>', self.on_demande_double_click)
+        self.index_demandes = IndexLignes(self.demandes_tree)
+        
+        # Actions sur plusieurs demandes sélectionnées
+        action_frame = ttk.Frame(self.demandes_frame)
+        action_frame.pack(fill='x', pady=5)
+        ttk.Button(action_frame, text="Valider la sélection",
+                  command=self.valider_selection).pack(side='left', padx=5)
+        ttk.Button(action_frame, text="Refuser la sélection",
+                  command=self.refuser_selection).pack(side='left', padx=5)
         
         # Charger les demandes
         self.charger_demandes()
     
     def charger_emprunts(self):
-        # Nettoyer la liste actuelle
-        for item in self.emprunts_tree.get_children():
-            self.emprunts_tree.delete(item)
-        
-        # Charger les emprunts
-        emprunts = self.controller.get_user_emprunts()
-        
-        # Remplir le tableau
-        for emprunt in emprunts:
-            # Calculer les pénalités
-            penalites = emprunt.calculer_penalites() if hasattr(emprunt, 'calculer_penalites') else 0
-            penalites_str = f"{penalites:.2f}€" if penalites > 0 else "Pas de pénalité"
-            
-            # Obtenir le statut
-            status = emprunt.get_status()
-            
-            # Formater les dates
-            date_emprunt = emprunt.date_emprunt.strftime('%Y-%m-%d')
-            date_retour_prevue = emprunt.date_retour_prevue.strftime('%Y-%m-%d') if emprunt.date_retour_prevue else ""
-            date_retour = emprunt.date_retour.strftime('%Y-%m-%d') if emprunt.date_retour else ""
-            
-            # Déterminer les actions possibles
-            actions = "Retourner" if not emprunt.date_retour else ""
-            
-            # Insérer dans le tableau
-            item = self.emprunts_tree.insert('', 'end', values=(
-                emprunt.document.id,
-                emprunt.document.titre,
-                emprunt.document.__class__.__name__,
-                date_emprunt,
-                date_retour_prevue,
-                date_retour,
-                status,
-                penalites_str,
-                actions
-            ))
-            
-            # Colorer en rouge si en retard
-            if status == "En retard":
-                self.emprunts_tree.tag_configure('retard', foreground='red')
-                self.emprunts_tree.item(item, tags=('retard',))
+        # Lecture complète (premier affichage, ou journal purgé)
+        if not self.index_emprunts:
+            afficher_chargement(self.emprunts_tree)
+        self.controller.executer(self.lire_emprunts, sur_resultat=self.afficher_emprunts,
+                                 cle='emprunts', widget=self.emprunts_tree)
+    
+    def lire_emprunts(self):
+        # Exécuté dans le pool de tâches : aucun appel à Tk ici
+        return (
+            self.controller.get_version_modifications(),
+            self.controller.get_user_emprunts(),
+            # Pénalités déjà facturées par emprunt, lues dans le registre
+            self.controller.get_penalites_utilisateur(),
+            self.controller.get_solde_utilisateur()
+        )
+    
+    def afficher_emprunts(self, donnees):
+        self.version_emprunts, emprunts, penalites_par_emprunt, solde = donnees
+        self.solde_var.set(f"Solde des pénalités : {solde:.2f}€")
+        self.index_emprunts.remplacer([
+            self.ligne_emprunt(emprunt, penalites_par_emprunt) for emprunt in emprunts
+        ])
+    
+    def rafraichir_emprunts(self):
+        """Ne relit que les emprunts modifiés depuis le dernier affichage"""
+        if self.version_emprunts is None:
+            self.charger_emprunts()
+            return
+        self.controller.executer(self.lire_modifications_emprunts,
+                                 sur_resultat=self.appliquer_modifications_emprunts,
+                                 cle='emprunts', widget=self.emprunts_tree)
+    
+    def rafraichir(self):
+        # Appelé par le registre de vues quand la vue est réaffichée
+        self.rafraichir_emprunts()
+        self.charger_mes_demandes()
+        if self.controller.current_user.is_admin():
+            self.charger_demandes()
+    
+    def lire_modifications_emprunts(self):
+        # Exécuté dans le pool de tâches
+        version, modifications = self.controller.get_modifications(
+            self.version_emprunts, ('emprunts', 'penalites_emprunts', 'soldes'))
+        if modifications is None:
+            return None, self.lire_emprunts()
+        ids = modifications['emprunts'] | modifications['penalites_emprunts']
+        emprunts = self.controller.get_user_emprunts(ids) if ids else []
+        penalites = self.controller.get_penalites_utilisateur() if ids else {}
+        solde = None
+        if self.controller.current_user.id in modifications['soldes']:
+            solde = self.controller.get_solde_utilisateur()
+        return version, (ids, emprunts, penalites, solde)
+    
+    def appliquer_modifications_emprunts(self, resultat):
+        version, donnees = resultat
+        if version is None:
+            self.afficher_emprunts(donnees)
+            return
+        self.version_emprunts = version
+        ids, emprunts, penalites_par_emprunt, solde = donnees
+        if solde is not None:
+            self.solde_var.set(f"Solde des pénalités : {solde:.2f}€")
+        # Emprunts d'autres utilisateurs ignorés; les nouveaux vont en tête (plus récents d'abord)
+        self.index_emprunts.maj(
+            [self.ligne_emprunt(emprunt, penalites_par_emprunt) for emprunt in emprunts],
+            supprimees=ids - {emprunt.id for emprunt in emprunts},
+            index=0
+        )
+    
+    def ligne_emprunt(self, emprunt, penalites_par_emprunt):
+        penalites = penalites_par_emprunt.get(emprunt.id, 0)
+        penalites_str = f"{penalites:.2f}€" if penalites > 0 else "Pas de pénalité"
+        
+        # Obtenir le statut
+        status = emprunt.get_status()
+        
+        # Formater les dates
+        date_emprunt = emprunt.date_emprunt.strftime('%Y-%m-%d')
+        date_retour_prevue = emprunt.date_retour_prevue.strftime('%Y-%m-%d') if emprunt.date_retour_prevue else ""
+        date_retour = emprunt.date_retour.strftime('%Y-%m-%d') if emprunt.date_retour else ""
+        
+        # Déterminer les actions possibles
+        actions = "Retourner" if not emprunt.date_retour else ""
+        
+        values = (
+            emprunt.document.id,
+            emprunt.document.titre,
+            emprunt.document.__class__.__name__,
+            date_emprunt,
+            date_retour_prevue,
+            date_retour,
+            status,
+            penalites_str,
+            actions
+        )
+        # Colorer en rouge si en retard
+        return emprunt.id, values, ('retard',) if status == "En retard" else ()
     
     def charger_demandes(self):
-        # Nettoyer la liste
-        for item in self.demandes_tree.get_children():
-            self.demandes_tree.delete(item)
-        
-        # Charger les demandes
-        demandes = self.controller.get_demandes_emprunt()
+        if not self.index_demandes:
+            afficher_chargement(self.demandes_tree)
+        self.controller.executer(self.controller.get_demandes_emprunt,
+                                 sur_resultat=self.afficher_demandes,
+                                 cle='demandes_emprunt', widget=self.demandes_tree)
+    
+    def afficher_demandes(self, demandes):
+        lignes = []
         for demande in demandes:
             demande_id, user_id, doc_id, date_demande, username, titre, type_doc = demande
             
@@ -163,15 +243,16 @@ class EmpruntView(ttk.Frame):
             ttk.Button(frame, text="Refuser", width=8,
                       command=lambda d=demande_id: self.refuser_demande(d)).pack(side='left', padx=2)
             
-            # Insérer la ligne dans le tableau
-            self.demandes_tree.insert('', 'end', values=(
+            # Ligne du tableau, indexée par l'id de la demande
+            lignes.append((demande_id, (
                 demande_id,
                 username,
                 titre,
                 type_doc,
                 date_demande,
                 "Valider/Refuser"  # Texte pour la colonne Actions
-            ))
+            ), ()))
+        self.index_demandes.remplacer(lignes)
     
     def retourner_document(self):
         selection = self.emprunts_tree.selection()
@@ -187,7 +268,7 @@ class EmpruntView(ttk.Frame):
             if self.controller.retourner_document(doc_id):
                 messagebox.showinfo("Succès", "Document retourné avec succès")
                 # Rafraîchir la liste des emprunts
-                self.charger_emprunts()
+                self.rafraichir_emprunts()
                 # Rafraîchir aussi la liste des demandes si elle existe
                 if hasattr(self, 'charger_mes_demandes'):
                     self.charger_mes_demandes()
@@ -200,12 +281,12 @@ class EmpruntView(ttk.Frame):
             if success:
                 messagebox.showinfo("Succès", message)
                 self.charger_demandes()
-                self.charger_emprunts()
+                self.rafraichir_emprunts()
             else:
                 messagebox.showerror("Erreur", message)
     
     def refuser_demande(self, demande_id):
-        commentaire = tk.simpledialog.askstring("Motif", "Motif du refus :")
+        commentaire = simpledialog.askstring("Motif", "Motif du refus :")
         if commentaire is not None:
             success, message = self.controller.traiter_demande_emprunt(
                 demande_id, 'refusee', commentaire)
@@ -215,6 +296,42 @@ class EmpruntView(ttk.Frame):
             else:
                 messagebox.showerror("Erreur", message)
     
+    def ids_demandes_selectionnees(self):
+        return [self.demandes_tree.item(item)['values'][0] for item in self.demandes_tree.selection()]
+    
+    def valider_selection(self):
+        ids = self.ids_demandes_selectionnees()
+        if not ids:
+            messagebox.showwarning("Attention", "Veuillez sélectionner au moins une demande")
+            return
+        if messagebox.askyesno("Confirmation", f"Valider {len(ids)} demande(s) d'emprunt ?"):
+            self.traiter_selection(ids, 'validee')
+    
+    def refuser_selection(self):
+        ids = self.ids_demandes_selectionnees()
+        if not ids:
+            messagebox.showwarning("Attention", "Veuillez sélectionner au moins une demande")
+            return
+        commentaire = simpledialog.askstring("Motif", f"Motif du refus ({len(ids)} demande(s)) :")
+        if commentaire is not None:
+            self.traiter_selection(ids, 'refusee', commentaire)
+    
+    def traiter_selection(self, ids, decision, commentaire=""):
+        # Transaction d'écriture en arrière-plan; pas de clé : un lot n'annule pas le précédent
+        self.controller.executer(
+            self.controller.traiter_demandes_emprunt, ids, decision, commentaire,
+            sur_resultat=self.afficher_traitement,
+            sur_erreur=lambda e: messagebox.showerror("Erreur", f"Erreur lors du traitement des demandes : {e}"),
+            widget=self
+        )
+    
+    def afficher_traitement(self, resultats):
+        # Demandes traitées retirées tout de suite, puis liste relue (diff par IndexLignes)
+        self.index_demandes.maj([], supprimees=[d for d, (succes, _) in resultats.items() if succes])
+        messagebox.showinfo("Traitement terminé", resume_traitement(resultats))
+        self.charger_demandes()
+        self.rafraichir_emprunts()
+    
     def on_demande_double_click(self, event):
         item = self.demandes_tree.selection()[0]
         demande_id = self.demandes_tree.item(item)['values'][0]
@@ -276,12 +393,16 @@ class EmpruntView(ttk.Frame):
         self.charger_mes_demandes()
     
     def charger_mes_demandes(self):
+        afficher_chargement(self.mes_demandes_tree)
+        self.controller.executer(self.controller.get_mes_demandes,
+                                 sur_resultat=self.afficher_mes_demandes,
+                                 cle='mes_demandes', widget=self.mes_demandes_tree)
+    
+    def afficher_mes_demandes(self, demandes):
         # Nettoyer la liste
         for item in self.mes_demandes_tree.get_children():
             self.mes_demandes_tree.delete(item)
         
-        # Charger les demandes
-        demandes = self.controller.get_mes_demandes()
         for demande in demandes:
             item = self.mes_demandes_tree.insert('', 'end', values=(
                 demande['id'],
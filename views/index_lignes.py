@@ -0,0 +1,49 @@
+class IndexLignes:
+    """Lignes d'un Treeview indexées par clé (l'iid de la ligne est la clé).
+
+    remplacer() applique une liste complète et maj() quelques lignes : seules
+    les lignes ajoutées, retirées ou dont les valeurs ont changé touchent au
+    Treeview, la sélection et la position de défilement sont conservées.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.lignes = {}  # iid -> (values, tags)
+
+    def __len__(self):
+        return len(self.lignes)
+
+    def _ecrire(self, cle, values, tags, index):
+        iid = str(cle)
+        ligne = (tuple(values), tuple(tags))
+        if iid not in self.lignes:
+            self.tree.insert('', index, iid=iid, values=values, tags=tags)
+        elif self.lignes[iid] != ligne:
+            self.tree.item(iid, values=values, tags=tags)
+        self.lignes[iid] = ligne
+
+    def remplacer(self, lignes):
+        """lignes : [(clé, values, tags)] dans l'ordre d'affichage"""
+        ordre = [str(cle) for cle, _, _ in lignes]
+        gardees = set(ordre)
+        # Lignes disparues, et lignes hors index (ex. « Chargement… »)
+        intrus = [iid for iid in self.tree.get_children() if iid not in gardees or iid not in self.lignes]
+        if intrus:
+            self.tree.delete(*intrus)
+        for iid in set(self.lignes) - gardees:
+            del self.lignes[iid]
+        for position, (cle, values, tags) in enumerate(lignes):
+            self._ecrire(cle, values, tags, position)
+        if list(self.tree.get_children()) != ordre:
+            for position, iid in enumerate(ordre):
+                self.tree.move(iid, '', position)
+
+    def maj(self, lignes, supprimees=(), index='end'):
+        """Met à jour ou ajoute (à index) les lignes données, retire les clés supprimees"""
+        for cle, values, tags in lignes:
+            self._ecrire(cle, values, tags, index)
+        retirees = [str(cle) for cle in supprimees if str(cle) in self.lignes]
+        if retirees:
+            self.tree.delete(*retirees)
+            for iid in retirees:
+                del self.lignes[iid]
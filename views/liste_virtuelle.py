@@ -0,0 +1,501 @@
+import bisect
+from collections import OrderedDict
+from tkinter import ttk
+
+
+class FenetreVirtuelle:
+    """Treeview virtuel : seules les lignes visibles existent dans le tableau.
+
+    Base de ListeVirtuelle et ListePaginee : défilement, lignes du Treeview
+    réutilisées, sélection tenue par id. Une sous-classe fournit __len__(),
+    _ligne(index) -> (id, document, lu), recharger(), _demander_pages() et,
+    pour rafraichir(), _lire_modifications() et _modifications_recues().
+    valeurs(document, index) retourne (values, tags) d'une ligne. Avec
+    executer (MainController.executer), les lectures se font hors du thread
+    de Tk.
+    """
+
+    def __init__(self, tree, scrollbar, valeurs, executer=None, taille_page=100,
+                 journal=None, table='documents', garder=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.valeurs = valeurs
+        self.executer = executer
+        self.taille_page = taille_page
+        self.journal = journal
+        self.table = table
+        self.garder = garder
+
+        self.version = None
+        self.debut = 0
+        self.nb_visibles = 1
+        self.items = []          # lignes du Treeview, réutilisées
+        self.id_par_item = {}
+        self.selection_ids = set()
+        self._demandes = set()   # lectures en cours
+        self._generation = 0
+        # Un rechargement annule la lecture encore en cours
+        self.cle = f"liste:{id(self)}"
+
+        self.scrollbar.configure(command=self._sur_scrollbar)
+        self.tree.configure(yscrollcommand=lambda *args: None)
+        self.tree.bind('<Configure>', self._sur_redimensionnement, add='+')
+        self.tree.bind('<<TreeviewSelect>>', self._sur_selection, add='+')
+        self.tree.bind('<MouseWheel>', self._sur_molette)
+        self.tree.bind('<Button-4>', lambda e: self._defiler_de(-3))
+        self.tree.bind('<Button-5>', lambda e: self._defiler_de(3))
+        self.tree.bind('<Up>', lambda e: self._sur_fleche(-1))
+        self.tree.bind('<Down>', lambda e: self._sur_fleche(1))
+        self.tree.bind('<Prior>', lambda e: self._defiler_de(-self.nb_visibles))
+        self.tree.bind('<Next>', lambda e: self._defiler_de(self.nb_visibles))
+
+    # --- Données ---------------------------------------------------------
+
+    def _executer(self, fonction, sur_resultat, cle=None):
+        if self.executer is None:
+            sur_resultat(fonction())
+            return
+        self.executer(fonction, sur_resultat=sur_resultat,
+                      sur_erreur=lambda e: print(f"Erreur lors du chargement de la liste: {e}"),
+                      cle=cle, widget=self.tree)
+
+    def rafraichir(self):
+        """Applique les seules modifications du journal depuis le dernier chargement"""
+        if self.journal is None or self.version is None:
+            self.recharger()
+            return
+        self._executer(self._lire_modifications, self._modifications_recues, cle=self.cle)
+
+    def _page_en_erreur(self, generation, ids, erreur):
+        # Les lignes seront redemandées au prochain affichage
+        if generation == self._generation:
+            self._demandes.difference_update(ids)
+        print(f"Erreur lors du chargement d'une page: {erreur}")
+
+    # --- Affichage -------------------------------------------------------
+
+    def _afficher(self, demander=True):
+        total = len(self)
+        self.debut = max(0, min(self.debut, total - self.nb_visibles))
+        nb_lignes = min(self.nb_visibles, total - self.debut)
+
+        while len(self.items) < nb_lignes:
+            self.items.append(self.tree.insert('', 'end'))
+        if len(self.items) > nb_lignes:
+            self.tree.delete(*self.items[nb_lignes:])
+            del self.items[nb_lignes:]
+
+        self.id_par_item = {}
+        selection = []
+        for position, item in enumerate(self.items):
+            index = self.debut + position
+            doc_id, document, lu = self._ligne(index)
+            if document is not None:
+                values, tags = self.valeurs(document, index)
+            else:
+                values, tags = (doc_id or '', "Chargement…" if not lu else "Document introuvable"), ()
+            self.tree.item(item, values=values, tags=tags)
+            if doc_id is None:
+                continue
+            self.id_par_item[item] = doc_id
+            if doc_id in self.selection_ids:
+                selection.append(item)
+        self.tree.selection_set(selection)
+        self.tree.yview_moveto(0)
+
+        if total:
+            self.scrollbar.set(self.debut / total, (self.debut + nb_lignes) / total)
+        else:
+            self.scrollbar.set(0, 1)
+        if demander:
+            self._demander_pages()
+
+    def defiler_vers(self, debut):
+        debut = max(0, min(debut, len(self) - self.nb_visibles))
+        if debut != self.debut:
+            self.debut = debut
+            self._afficher()
+
+    def _defiler_de(self, nb_lignes):
+        self.defiler_vers(self.debut + nb_lignes)
+        return 'break'
+
+    def _sur_scrollbar(self, action, quantite, unite=None):
+        if action == 'moveto':
+            self.defiler_vers(int(float(quantite) * len(self)))
+        elif action == 'scroll':
+            pas = self.nb_visibles if unite == 'pages' else 1
+            self.defiler_vers(self.debut + int(quantite) * pas)
+
+    def _sur_molette(self, event):
+        return self._defiler_de(-3 if event.delta > 0 else 3)
+
+    def _sur_fleche(self, sens):
+        # Aux bords de la fenêtre visible, faire défiler au lieu de sortir du tableau
+        if not self.items:
+            return None
+        focus = self.tree.focus()
+        bord = self.items[0] if sens < 0 else self.items[-1]
+        if focus != bord:
+            return None
+        ancien_debut = self.debut
+        self.defiler_vers(self.debut + sens)
+        if self.debut != ancien_debut:
+            self.selection_ids = {self.id_par_item[bord]}
+            self.tree.selection_set(bord)
+        return 'break'
+
+    def _sur_redimensionnement(self, event):
+        hauteur_ligne = int(ttk.Style().lookup(self.tree.cget('style') or 'Treeview', 'rowheight') or 20)
+        # Hauteur de l'en-tête : position de la première ligne si elle est affichée
+        entete = hauteur_ligne
+        if self.items:
+            bbox = self.tree.bbox(self.items[0])
+            if bbox:
+                entete = bbox[1]
+        nb_visibles = max(1, (event.height - entete) // hauteur_ligne)
+        if nb_visibles != self.nb_visibles:
+            self.nb_visibles = nb_visibles
+            self._afficher()
+
+    def _sur_selection(self, event):
+        # Sélection tenue par id : elle suit les documents, pas les lignes réutilisées
+        visibles = set(self.id_par_item.values())
+        choisis = {self.id_par_item[item] for item in self.tree.selection() if item in self.id_par_item}
+        self.selection_ids = (self.selection_ids - visibles) | choisis
+
+
+class ListeVirtuelle(FenetreVirtuelle):
+    """Liste virtuelle d'ids connus à l'avance (ex. résultats d'une recherche).
+
+    charger_ids() retourne la liste ordonnée des ids à afficher (elle donne le
+    nombre de lignes et l'accès direct à une position de la barre de défilement);
+    charger_lignes(ids) retourne les documents de ces ids; valeurs(document, index)
+    retourne (values, tags) d'une ligne. Les documents sont lus par pages à la
+    demande.
+
+    Avec journal (MainController) et table, rafraichir() ne relit que les
+    documents modifiés depuis le dernier chargement. garder(document) dit si un
+    document modifié appartient encore à la liste; trie_par_id place les
+    nouveaux documents à leur rang (sinon seuls les documents affichés sont
+    mis à jour).
+    """
+
+    def __init__(self, tree, scrollbar, charger_ids, charger_lignes, valeurs,
+                 executer=None, taille_page=100, pages_en_memoire=20,
+                 journal=None, table='documents', garder=None, trie_par_id=True):
+        super().__init__(tree, scrollbar, valeurs, executer=executer, taille_page=taille_page,
+                         journal=journal, table=table, garder=garder)
+        self.charger_ids = charger_ids
+        self.charger_lignes = charger_lignes
+        self.taille_memoire = taille_page * pages_en_memoire
+        self.trie_par_id = trie_par_id
+
+        self.ids = []
+        self._presents = set()
+        self._documents = OrderedDict()  # id -> document (None : introuvable)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _ligne(self, index):
+        """(id, document, lu) de la ligne index; document None tant qu'il n'est pas lu"""
+        doc_id = self.ids[index]
+        if doc_id in self._documents:
+            self._documents.move_to_end(doc_id)
+            return doc_id, self._documents[doc_id], True
+        return doc_id, None, False
+
+    # --- Données ---------------------------------------------------------
+
+    def _lire_ids(self):
+        # Version lue avant les ids : une écriture concurrente sera revue au rafraîchissement
+        version = self.journal.get_version_modifications() if self.journal else None
+        return version, self.charger_ids()
+
+    def recharger(self, conserver_position=True):
+        """Relit la liste des ids, puis les pages visibles"""
+        self._executer(
+            self._lire_ids,
+            lambda resultat: self.definir_ids(resultat[1], conserver_position, resultat[0]),
+            cle=self.cle
+        )
+
+    def definir_ids(self, ids, conserver_position=True, version=None):
+        """Remplace le contenu de la liste (les documents seront relus)"""
+        self._generation += 1
+        self.version = version
+        self.ids = list(ids)
+        self._presents = set(self.ids)
+        self._documents.clear()
+        self._demandes.clear()
+        self.selection_ids &= self._presents
+        if not conserver_position:
+            self.debut = 0
+        self._afficher()
+
+    def _lire_modifications(self):
+        # Exécuté dans le pool de tâches
+        version, modifications = self.journal.get_modifications(self.version, (self.table,))
+        if modifications is None:
+            return version, None, self.charger_ids()
+        ids = sorted(modifications[self.table])
+        return version, ids, self.charger_lignes(ids) if ids else []
+
+    def _modifications_recues(self, resultat):
+        version, ids, donnees = resultat
+        if ids is None:
+            # Journal purgé depuis le dernier chargement : tout relire
+            self.definir_ids(donnees, True, version)
+            return
+        self.version = version
+        self.appliquer_modifications(ids, donnees)
+
+    def appliquer_modifications(self, ids, documents):
+        """Met à jour, ajoute ou retire les documents ids (documents : ceux qui existent encore)"""
+        if not ids:
+            return
+        # Les pages en cours de lecture ont pu lire un état antérieur : elles seront redemandées
+        self._generation += 1
+        self._demandes.clear()
+        par_id = {doc.id: doc for doc in documents if self.garder is None or self.garder(doc)}
+        # Garder la même première ligne visible malgré les insertions et suppressions
+        ancre = self.ids[self.debut] if self.debut < len(self.ids) else None
+
+        retires = [doc_id for doc_id in ids if doc_id in self._presents and doc_id not in par_id]
+        if retires:
+            retires = set(retires)
+            self.ids = [doc_id for doc_id in self.ids if doc_id not in retires]
+            self._presents -= retires
+            self.selection_ids -= retires
+        for doc_id, doc in par_id.items():
+            if doc_id not in self._presents:
+                if not self.trie_par_id:
+                    continue
+                bisect.insort(self.ids, doc_id)
+                self._presents.add(doc_id)
+            self._memoriser(doc_id, doc)
+        for doc_id in ids:
+            if doc_id not in par_id:
+                self._documents.pop(doc_id, None)
+
+        if ancre is not None and ancre in self._presents and (retires or len(par_id)):
+            self.debut = bisect.bisect_left(self.ids, ancre) if self.trie_par_id else self.ids.index(ancre)
+        self._afficher()
+
+    def _memoriser(self, doc_id, doc):
+        self._documents[doc_id] = doc
+        self._documents.move_to_end(doc_id)
+        while len(self._documents) > self.taille_memoire:
+            self._documents.popitem(last=False)
+
+    def _demander_pages(self):
+        # Lignes visibles, plus une page de part et d'autre pour anticiper le défilement
+        premiere = max(0, self.debut - self.nb_visibles) // self.taille_page * self.taille_page
+        derniere = min(len(self.ids), self.debut + 2 * self.nb_visibles)
+        for depart in range(premiere, derniere, self.taille_page):
+            ids = [
+                doc_id for doc_id in self.ids[depart:depart + self.taille_page]
+                if doc_id not in self._documents and doc_id not in self._demandes
+            ]
+            if not ids:
+                continue
+            self._demandes.update(ids)
+            generation = self._generation
+            if self.executer is None:
+                self._page_recue(generation, ids, self.charger_lignes(ids))
+            else:
+                self.executer(
+                    self.charger_lignes, ids,
+                    sur_resultat=lambda docs, g=generation, i=ids: self._page_recue(g, i, docs),
+                    sur_erreur=lambda e, g=generation, i=ids: self._page_en_erreur(g, i, e),
+                    widget=self.tree
+                )
+
+    def _page_recue(self, generation, ids, documents):
+        if generation != self._generation:
+            return
+        self._demandes.difference_update(ids)
+        par_id = {doc.id: doc for doc in documents}
+        for doc_id in ids:
+            self._memoriser(doc_id, par_id.get(doc_id))
+        visibles = set(self.ids[self.debut:self.debut + self.nb_visibles])
+        if visibles.intersection(ids):
+            self._afficher(demander=False)
+
+
+class ListePaginee(FenetreVirtuelle):
+    """Liste virtuelle du catalogue lue par pages de clés, sans liste des ids.
+
+    compter() donne le nombre de lignes (taille de la barre de défilement);
+    lire_page(apres_id, limite, decalage) retourne (documents, dernier_id,
+    suite) comme DatabaseManager.get_documents_page. Le dernier id de chaque
+    page pleine est gardé comme curseur : la page suivante est lue par
+    id > curseur, un saut de la barre de défilement part du curseur connu le
+    plus proche avec un décalage. charger_lignes(ids) relit les documents
+    modifiés signalés par le journal.
+    """
+
+    def __init__(self, tree, scrollbar, compter, lire_page, charger_lignes, valeurs,
+                 executer=None, taille_page=100, pages_en_memoire=20,
+                 journal=None, table='documents', garder=None):
+        super().__init__(tree, scrollbar, valeurs, executer=executer, taille_page=taille_page,
+                         journal=journal, table=table, garder=garder)
+        self.compter = compter
+        self.lire_page = lire_page
+        self.charger_lignes = charger_lignes
+        self.pages_en_memoire = pages_en_memoire
+        self.total = 0
+        self._pages = OrderedDict()     # numéro de page -> documents
+        self._curseurs = {-1: 0}        # numéro de page pleine -> dernier id lu
+        self._pages_curseurs = [-1]     # numéros des curseurs connus, triés
+        self._en_attente = False        # rechargement en cours : curseurs inutilisables
+
+    def __len__(self):
+        return self.total
+
+    def _ligne(self, index):
+        numero = index // self.taille_page
+        page = self._pages.get(numero)
+        if page is None:
+            return None, None, False
+        self._pages.move_to_end(numero)
+        position = index % self.taille_page
+        if position < len(page):
+            return page[position].id, page[position], True
+        return None, None, True
+
+    # --- Données ---------------------------------------------------------
+
+    def _lire_debut(self, debut):
+        # Version lue avant le compte : une écriture concurrente sera revue au rafraîchissement
+        version = self.journal.get_version_modifications() if self.journal else None
+        total = self.compter()
+        numero = max(0, min(debut, total - 1)) // self.taille_page
+        return version, total, numero, self.lire_page(0, self.taille_page, numero * self.taille_page)
+
+    def recharger(self, conserver_position=True):
+        """Relit le nombre de documents et la page affichée (curseurs oubliés)"""
+        self._generation += 1
+        self._en_attente = True
+        if not conserver_position:
+            self.debut = 0
+            self.selection_ids.clear()
+        generation, debut = self._generation, self.debut
+        self._executer(lambda: self._lire_debut(debut),
+                       lambda resultat: self._debut_recu(generation, resultat), cle=self.cle)
+
+    def _debut_recu(self, generation, resultat):
+        if generation != self._generation:
+            return
+        version, total, numero, page = resultat
+        self._en_attente = False
+        self.version = version
+        self.total = total
+        self._pages.clear()
+        self._demandes.clear()
+        self._curseurs = {-1: 0}
+        self._pages_curseurs = [-1]
+        self._memoriser_page(numero, page)
+        self._afficher()
+
+    def _memoriser_page(self, numero, resultat):
+        documents, dernier_id, suite = resultat
+        self._pages[numero] = documents
+        self._pages.move_to_end(numero)
+        while len(self._pages) > self.pages_en_memoire:
+            self._pages.popitem(last=False)
+        # Seule une page pleine a une suite : son dernier id sert de curseur
+        if suite:
+            if numero not in self._curseurs:
+                bisect.insort(self._pages_curseurs, numero)
+            self._curseurs[numero] = dernier_id
+
+    def _demander_pages(self):
+        if self._en_attente:
+            return
+        # Pages visibles, plus une page de part et d'autre pour anticiper le défilement
+        premiere = max(0, self.debut - self.nb_visibles) // self.taille_page
+        derniere = min(self.total, self.debut + 2 * self.nb_visibles)
+        for numero in range(premiere, -(-derniere // self.taille_page)):
+            if numero in self._pages or numero in self._demandes:
+                continue
+            # Curseur connu le plus proche avant la page : 0 ligne à sauter pour la page suivante
+            precedente = self._pages_curseurs[bisect.bisect_left(self._pages_curseurs, numero) - 1]
+            apres_id = self._curseurs[precedente]
+            decalage = (numero - precedente - 1) * self.taille_page
+            self._demandes.add(numero)
+            generation = self._generation
+            if self.executer is None:
+                self._page_recue(generation, numero, self.lire_page(apres_id, self.taille_page, decalage))
+            else:
+                self.executer(
+                    self.lire_page, apres_id, self.taille_page, decalage,
+                    sur_resultat=lambda page, g=generation, n=numero: self._page_recue(g, n, page),
+                    sur_erreur=lambda e, g=generation, n=numero: self._page_en_erreur(g, (n,), e),
+                    widget=self.tree
+                )
+
+    def _page_recue(self, generation, numero, page):
+        if generation != self._generation:
+            return
+        self._demandes.discard(numero)
+        self._memoriser_page(numero, page)
+        if self.debut // self.taille_page <= numero <= (self.debut + self.nb_visibles - 1) // self.taille_page:
+            self._afficher(demander=False)
+
+    def _lire_modifications(self):
+        # Exécuté dans le pool de tâches
+        version, modifications = self.journal.get_modifications(self.version, (self.table,))
+        if modifications is None:
+            return version, None, None, None
+        ids = sorted(modifications[self.table])
+        if not ids:
+            return version, ids, [], None
+        return version, ids, self.charger_lignes(ids), self.compter()
+
+    def _modifications_recues(self, resultat):
+        version, ids, documents, total = resultat
+        if ids is None:
+            # Journal purgé depuis le dernier chargement : tout relire
+            self.recharger()
+            return
+        self.version = version
+        self.appliquer_modifications(ids, documents, total)
+
+    def appliquer_modifications(self, ids, documents, total=None):
+        """Met à jour les pages en mémoire; les pages décalées par un ajout ou un retrait sont relues"""
+        if not ids:
+            return
+        # Les pages en cours de lecture ont pu lire un état antérieur : elles seront redemandées
+        self._generation += 1
+        self._demandes.clear()
+        par_id = {doc.id: doc for doc in documents if self.garder is None or self.garder(doc)}
+        self.selection_ids -= set(ids) - par_id.keys()
+
+        places = {doc.id: (numero, position)
+                  for numero, page in self._pages.items() for position, doc in enumerate(page)}
+        for doc_id, doc in par_id.items():
+            if doc_id in places:
+                numero, position = places[doc_id]
+                self._pages[numero][position] = doc
+
+        # Aucun document sorti et même nombre de lignes : aucune position n'a changé
+        if len(par_id) < len(ids) or (total is not None and total != self.total):
+            self._oublier_depuis(ids[0])
+        if total is not None:
+            self.total = total
+        self._afficher()
+
+    def _oublier_depuis(self, doc_id):
+        # Les curseurs antérieurs à doc_id restent valables, les pages suivantes sont relues
+        self._pages_curseurs = [numero for numero in self._pages_curseurs
+                                if self._curseurs[numero] < doc_id]
+        self._curseurs = {numero: self._curseurs[numero] for numero in self._pages_curseurs}
+        for numero in [numero for numero in self._pages if numero not in self._curseurs]:
+            del self._pages[numero]
+
+
+def valeurs_document(doc, index):
+    """Ligne (ID, Type, Titre, Status, Détails) d'un document"""
+    return (doc.id, doc.__class__.__name__, doc.titre, doc.status, str(doc.get_details())), ()
@@ -1,7 +1,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import hashlib
-from PIL import Image, ImageTk
 
 class LoginView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -24,20 +23,18 @@ class LoginView(ttk.Frame):
                  font=('Helvetica', 24, 'bold'),
                  background='white').pack()
         
-        # Image
-        try:
-            # Charger et redimensionner l'image avec le bon chemin
-            image = Image.open("image/library3.jpg")  # Correction du chemin
-            # Redimensionner l'image à une taille raisonnable (par exemple 300x200)
-            image = image.resize((300, 200), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(image)
-            
-            # Créer et placer le label pour l'image
-            image_label = ttk.Label(title_frame, image=photo)
-            image_label.image = photo  # Garder une référence!
-            image_label.pack(pady=(0, 20))
-        except Exception as e:
-            print(f"Erreur lors du chargement de l'image: {e}")
+        # Image : place réservée, remplie dès que la variante 300x200 est prête
+        image_frame = ttk.Frame(title_frame, width=300, height=200, style='Login.TFrame')
+        image_frame.pack_propagate(False)
+        image_frame.pack(pady=(0, 20))
+        image_label = ttk.Label(image_frame, background='white')
+        image_label.pack(fill='both', expand=True)
+        # La PhotoImage est gardée par le gestionnaire d'images, d'une connexion à l'autre
+        self.controller.charger_image(
+            'library3.jpg', (300, 200),
+            lambda photo: image_label.configure(image=photo),
+            widget=image_label
+        )
         
         # Frame de connexion
         login_frame = ttk.LabelFrame(self, text="Connexion", padding="20")
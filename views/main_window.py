@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk
 from .login_view import LoginView
-from .dashboard_view import DashboardView
+from .registre_vues import RegistreVues
 
 class MainWindow(tk.Tk):
     def __init__(self, controller):
@@ -15,9 +15,23 @@ class MainWindow(tk.Tk):
         self.main_frame = ttk.Frame(self)
         self.main_frame.pack(fill='both', expand=True)
         
+        # Connexion et tableau de bord gardés en mémoire : une reconnexion du même
+        # utilisateur retrouve son tableau de bord, un autre utilisateur l'évince
+        self.vues = RegistreVues(self.main_frame, version=self.controller.version_connue,
+                                verifier=self.controller.verifier_version, max_vues=2)
+        
+        # Arrêter les tâches de fond et fermer la base à la fermeture
+        self.protocol('WM_DELETE_WINDOW', self.quitter)
+        
         # Commencer par la vue de connexion
         self.show_login()
     
+    def quitter(self):
+        # Détruire les vues d'abord : le poste de retour envoie ses scans en attente
+        self.vues.vider()
+        self.controller.fermer()
+        self.destroy()
+    
     def setup_window(self):
         self.title("Gestion de Bibliothèque")
         self.geometry("1024x768")
@@ -41,19 +55,16 @@ class MainWindow(tk.Tk):
         style.configure('Menu.TButton', padding=5)
     
     def show_login(self):
-        # Nettoyer le frame principal
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
-        # Afficher la vue de connexion
-        login_view = LoginView(self.main_frame, self.controller)
-        login_view.pack(fill='both', expand=True) 
+        # Afficher la vue de connexion (image chargée une seule fois)
+        login_view = self.vues.afficher('login', lambda parent: LoginView(parent, self.controller))
+        login_view.password_var.set("")
     
     def show_dashboard(self):
-        # Nettoyer le frame principal
-        for widget in self.main_frame.winfo_children():
-            widget.destroy()
-        
-        # Afficher le tableau de bord
-        dashboard_view = DashboardView(self.main_frame, self.controller)
-        dashboard_view.pack(fill='both', expand=True) 
\ No newline at end of file
+        # Un tableau de bord par utilisateur et par rôle (menus d'administration)
+        # Importé après la connexion : l'écran de connexion s'affiche plus tôt
+        from .dashboard_view import DashboardView
+        user = self.controller.current_user
+        self.vues.afficher(
+            f"dashboard:{user.id}:{user.role}",
+            lambda parent: DashboardView(parent, self.controller)
+        ) 
\ No newline at end of file
@@ -0,0 +1,5 @@
+def afficher_chargement(tree, message="Chargement…"):
+    """Vide le tableau et y affiche une ligne d'attente pendant une lecture en arrière-plan"""
+    for item in tree.get_children():
+        tree.delete(item)
+    tree.insert('', 'end', values=(message,))
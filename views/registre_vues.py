@@ -0,0 +1,112 @@
+from collections import OrderedDict
+
+
+class RegistreVues:
+    """Vues construites une seule fois, masquées puis réaffichées.
+
+    afficher(nom, fabrique) masque la vue courante et affiche la vue nom,
+    construite par fabrique(conteneur) au premier affichage. Une vue
+    réaffichée n'est rafraîchie (méthode rafraichir) que si la version des
+    données (journal des modifications) a changé depuis son dernier
+    affichage. Au-delà de max_vues, les vues les moins récemment affichées
+    sont détruites.
+
+    version() retourne la version déjà connue, sans accès à la base : elle
+    est appelée sur le thread de Tk. verifier(sur_version, widget) relit la
+    version en arrière-plan ; la vue réaffichée est rafraîchie à la réponse
+    si la base a changé entre-temps (écriture d'un autre poste).
+    """
+
+    def __init__(self, conteneur, version=None, verifier=None, max_vues=4, **options_pack):
+        self.conteneur = conteneur
+        self.version = version
+        self.verifier = verifier
+        self.max_vues = max(1, max_vues)
+        self.options_pack = options_pack or {'fill': 'both', 'expand': True}
+        self._vues = OrderedDict()  # nom -> vue, de la moins à la plus récemment affichée
+        self._versions = {}
+        self.courante = None
+
+    def __contains__(self, nom):
+        return nom in self._vues
+
+    def _version(self):
+        if self.version is None:
+            return None
+        try:
+            return self.version()
+        except Exception as e:
+            print(f"Erreur lors de la lecture de la version des données: {e}")
+            return None
+
+    def afficher(self, nom, fabrique):
+        """Affiche la vue nom (construite si besoin) et la retourne"""
+        vue = self._vues.get(nom)
+        if vue is not None and not vue.winfo_exists():
+            self.oublier(nom)
+            vue = None
+
+        if self.courante is not None and self.courante != nom:
+            ancienne = self._vues.get(self.courante)
+            if ancienne is not None and ancienne.winfo_exists():
+                ancienne.pack_forget()
+
+        if vue is None:
+            # Version lue avant la construction : une écriture concurrente sera revue au prochain affichage
+            version = self._version()
+            vue = fabrique(self.conteneur)
+            self._vues[nom] = vue
+            self._versions[nom] = version
+        elif nom != self.courante:
+            self._rafraichir_si_modifiee(nom, vue, self._version())
+            self._verifier(nom, vue)
+
+        self._vues.move_to_end(nom)
+        if nom != self.courante:
+            vue.pack(**self.options_pack)
+            self.courante = nom
+        self._evincer()
+        return vue
+
+    def rafraichir_courante(self):
+        """Rafraîchit la vue affichée si les données ont changé"""
+        vue = self._vues.get(self.courante)
+        if vue is not None and vue.winfo_exists():
+            self._rafraichir_si_modifiee(self.courante, vue, self._version())
+            self._verifier(self.courante, vue)
+
+    def _verifier(self, nom, vue):
+        if self.verifier is not None:
+            self.verifier(lambda version: self._version_lue(nom, vue, version), vue)
+
+    def _version_lue(self, nom, vue, version):
+        # Vue masquée ou remplacée entre-temps : vérifiée à son prochain affichage
+        if nom == self.courante and self._vues.get(nom) is vue:
+            self._rafraichir_si_modifiee(nom, vue, version)
+
+    def _rafraichir_si_modifiee(self, nom, vue, version):
+        if version is not None and version == self._versions.get(nom):
+            return
+        rafraichir = getattr(vue, 'rafraichir', None)
+        if rafraichir is not None:
+            rafraichir()
+        self._versions[nom] = version
+
+    def oublier(self, nom):
+        """Détruit la vue nom (elle sera reconstruite au prochain affichage)"""
+        vue = self._vues.pop(nom, None)
+        self._versions.pop(nom, None)
+        if nom == self.courante:
+            self.courante = None
+        if vue is not None and vue.winfo_exists():
+            vue.destroy()
+
+    def vider(self):
+        for nom in list(self._vues):
+            self.oublier(nom)
+
+    def _evincer(self):
+        # La vue affichée est la plus récente : elle n'est jamais évincée
+        while len(self._vues) > self.max_vues:
+            nom = next(iter(self._vues))
+            self.oublier(nom)
@@ -0,0 +1,144 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+class RetourView(ttk.Frame):
+    """Poste de retour : les codes scannés sont enregistrés par groupes"""
+
+    def __init__(self, parent, controller, taille_groupe=25, delai_groupe=2000):
+        super().__init__(parent)
+        self.controller = controller
+        # Un groupe est validé dès qu'il atteint taille_groupe scans, ou après
+        # delai_groupe ms sans nouveau scan
+        self.taille_groupe = taille_groupe
+        self.delai_groupe = delai_groupe
+        self.en_attente = []  # (code, item du tableau)
+        self.minuteur = None
+        self.nb_retournes = 0
+        self.nb_erreurs = 0
+        self.nb_envoyes = 0   # scans en cours d'enregistrement
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Style
+        style = ttk.Style()
+        style.configure('Retour.TFrame', background='white')
+        self.configure(style='Retour.TFrame', padding="20")
+
+        # Titre
+        ttk.Label(self, text="Retour des documents",
+                 font=('Helvetica', 16, 'bold')).pack(pady=10)
+
+        # Zone de saisie : le lecteur de codes-barres termine chaque scan par Entrée
+        scan_frame = ttk.LabelFrame(self, text="Scanner un document", padding="10")
+        scan_frame.pack(fill='x', padx=5, pady=5)
+
+        ttk.Label(scan_frame, text="Code ou ID:").pack(side='left', padx=5)
+        self.code_var = tk.StringVar()
+        self.code_entry = ttk.Entry(scan_frame, textvariable=self.code_var, width=30)
+        self.code_entry.pack(side='left', padx=5)
+        self.code_entry.bind('<Return>', self.scanner)
+
+        ttk.Button(scan_frame, text="Valider maintenant",
+                  command=self.valider_groupe).pack(side='left', padx=5)
+
+        self.compteur_label = ttk.Label(scan_frame, text="")
+        self.compteur_label.pack(side='right', padx=5)
+
+        # Journal des scans
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill='both', expand=True, padx=5, pady=5)
+
+        columns = ('Code', 'Résultat')
+        self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
+        self.tree.heading('Code', text='Code')
+        self.tree.heading('Résultat', text='Résultat')
+        self.tree.column('Code', width=150)
+        self.tree.column('Résultat', width=400)
+        self.tree.tag_configure('erreur', foreground='red')
+        self.tree.tag_configure('attente', foreground='gray')
+
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+
+        self.mettre_a_jour_compteur()
+        self.code_entry.focus_set()
+
+        # Écran masqué par le registre de vues : valider tout de suite les scans en attente
+        self.bind('<Unmap>', lambda e: self.valider_groupe())
+
+    def scanner(self, event=None):
+        code = self.code_var.get().strip()
+        self.code_var.set("")
+        if not code:
+            return
+
+        # Le dernier scan apparaît en haut
+        item = self.tree.insert('', 0, values=(code, "En attente..."), tags=('attente',))
+        self.en_attente.append((code, item))
+
+        if len(self.en_attente) >= self.taille_groupe:
+            self.valider_groupe()
+        else:
+            # Relancer le minuteur à chaque scan
+            if self.minuteur:
+                self.after_cancel(self.minuteur)
+            self.minuteur = self.after(self.delai_groupe, self.valider_groupe)
+        self.mettre_a_jour_compteur()
+
+    def valider_groupe(self):
+        if self.minuteur:
+            self.after_cancel(self.minuteur)
+            self.minuteur = None
+        if not self.en_attente:
+            return
+
+        groupe, self.en_attente = self.en_attente, []
+        self.nb_envoyes += len(groupe)
+        self.mettre_a_jour_compteur()
+        # Écriture en arrière-plan : le poste continue de scanner pendant la transaction.
+        # Pas de clé : un groupe envoyé n'est jamais annulé par le suivant
+        self.controller.executer(
+            self.controller.retourner_documents, [code for code, _ in groupe],
+            sur_resultat=lambda resultats: self.afficher_resultats(groupe, resultats),
+            sur_erreur=lambda e: self.afficher_erreur(groupe, e),
+            widget=self
+        )
+
+    def afficher_resultats(self, groupe, resultats):
+        self.nb_envoyes -= len(groupe)
+        for (_, item), (code, succes, message) in zip(groupe, resultats):
+            self.tree.item(item, values=(code, message), tags=() if succes else ('erreur',))
+            if succes:
+                self.nb_retournes += 1
+            else:
+                self.nb_erreurs += 1
+        self.mettre_a_jour_compteur()
+
+        if any(not succes for _, succes, _ in resultats):
+            self.bell()
+
+    def afficher_erreur(self, groupe, erreur):
+        self.nb_envoyes -= len(groupe)
+        for code, item in groupe:
+            self.tree.item(item, values=(code, f"Erreur : {erreur}"), tags=('erreur',))
+        self.nb_erreurs += len(groupe)
+        self.mettre_a_jour_compteur()
+        self.bell()
+
+    def mettre_a_jour_compteur(self):
+        self.compteur_label.config(
+            text=f"{self.nb_retournes} retournés, {self.nb_erreurs} erreurs, "
+                 f"{len(self.en_attente)} en attente, {self.nb_envoyes} en cours"
+        )
+
+    def destroy(self):
+        # Ne pas perdre les scans en attente en quittant l'écran (ils sont enregistrés
+        # même si l'écran est détruit avant la fin)
+        try:
+            self.valider_groupe()
+        except tk.TclError:
+            pass
+        super().destroy()
@@ -1,11 +1,34 @@
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
+import statistics
+import threading
+import time
+from collections import deque
+from database.recherche import est_affinage
+from .liste_virtuelle import ListeVirtuelle, valeurs_document
 
 class SearchView(ttk.Frame):
-    def __init__(self, parent, controller):
+    """Recherche pendant la saisie : les frappes sont regroupées (delai_saisie ms),
+    seule la première page de résultats est lue, et la recherche précédente est
+    interrompue dès qu'une nouvelle commence. Entrée ou le bouton lancent la
+    recherche complète."""
+
+    def __init__(self, parent, controller, delai_saisie=250, taille_page=200,
+                 max_reutilisation=2000, nb_mesures=50):
         super().__init__(parent)
         self.controller = controller
+        self.delai_saisie = delai_saisie
+        self.taille_page = taille_page
+        # Au-delà, affiner en relisant les ids précédents coûte plus que refaire la recherche
+        self.max_reutilisation = max_reutilisation
+        self.nb_mesures = nb_mesures  # percentiles de latence journalisés toutes les nb_mesures recherches
+        self.minuteur_saisie = None
+        self.annulation = threading.Event()
+        self.precedente = None  # (critères, version, ids, complète)
+        self.latences = deque(maxlen=200)
+        self.nb_recherches = 0
+        self.nb_affinees = 0
         self.setup_ui()
     
     def setup_ui(self):
@@ -13,29 +36,45 @@ class SearchView(ttk.Frame):
         search_frame = ttk.LabelFrame(self, text="Critères de recherche", padding="10")
         search_frame.pack(fill='x', padx=5, pady=5)
         
+        # Mots-clés (titre, auteur, éditeur, genre; accents ignorés)
+        ttk.Label(search_frame, text="Mots-clés:").grid(row=0, column=0, padx=5, pady=5)
+        self.texte_var = tk.StringVar()
+        ttk.Entry(search_frame, textvariable=self.texte_var).grid(row=0, column=1, padx=5, pady=5)
+        
         # Titre
-        ttk.Label(search_frame, text="Titre:").grid(row=0, column=0, padx=5, pady=5)
+        ttk.Label(search_frame, text="Titre:").grid(row=1, column=0, padx=5, pady=5)
         self.titre_var = tk.StringVar()
-        ttk.Entry(search_frame, textvariable=self.titre_var).grid(row=0, column=1, padx=5, pady=5)
+        ttk.Entry(search_frame, textvariable=self.titre_var).grid(row=1, column=1, padx=5, pady=5)
         
         # Type de document
-        ttk.Label(search_frame, text="Type:").grid(row=1, column=0, padx=5, pady=5)
+        ttk.Label(search_frame, text="Type:").grid(row=2, column=0, padx=5, pady=5)
         self.type_var = tk.StringVar()
         types = ['', 'livre', 'magazine', 'journal', 'multimedia']
-        ttk.Combobox(search_frame, textvariable=self.type_var, values=types).grid(row=1, column=1, padx=5, pady=5)
+        ttk.Combobox(search_frame, textvariable=self.type_var, values=types).grid(row=2, column=1, padx=5, pady=5)
         
         # Auteur
-        ttk.Label(search_frame, text="Auteur:").grid(row=2, column=0, padx=5, pady=5)
+        ttk.Label(search_frame, text="Auteur:").grid(row=3, column=0, padx=5, pady=5)
         self.auteur_var = tk.StringVar()
-        ttk.Entry(search_frame, textvariable=self.auteur_var).grid(row=2, column=1, padx=5, pady=5)
+        ttk.Entry(search_frame, textvariable=self.auteur_var).grid(row=3, column=1, padx=5, pady=5)
         
         # Éditeur
-        ttk.Label(search_frame, text="Éditeur:").grid(row=3, column=0, padx=5, pady=5)
+        ttk.Label(search_frame, text="Éditeur:").grid(row=4, column=0, padx=5, pady=5)
         self.editeur_var = tk.StringVar()
-        ttk.Entry(search_frame, textvariable=self.editeur_var).grid(row=3, column=1, padx=5, pady=5)
+        ttk.Entry(search_frame, textvariable=self.editeur_var).grid(row=4, column=1, padx=5, pady=5)
         
         # Bouton de recherche
-        ttk.Button(search_frame, text="Rechercher", command=self.rechercher).grid(row=4, column=0, columnspan=2, pady=10)
+        ttk.Button(search_frame, text="Rechercher", command=self.rechercher).grid(row=5, column=0, columnspan=2, pady=10)
+        
+        # Recherche pendant la saisie; Entrée lance la recherche complète
+        for var in (self.texte_var, self.titre_var, self.type_var, self.auteur_var, self.editeur_var):
+            var.trace_add('write', lambda *args: self.planifier_recherche())
+        for champ in search_frame.winfo_children():
+            if isinstance(champ, ttk.Entry):
+                champ.bind('<Return>', lambda e: self.rechercher())
+        
+        # État de la recherche (en cours, nombre de résultats)
+        self.etat_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.etat_var).grid(row=6, column=0, columnspan=2)
         
         # Tableau des résultats
         self.setup_results_table()
@@ -63,35 +102,120 @@ class SearchView(ttk.Frame):
             self.tree.column(col, width=column_widths[col], anchor='w')
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(results_frame, orient='vertical', command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(results_frame, orient='vertical')
         
         # Placement
         self.tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
-    
-    def rechercher(self):
-        # Nettoyer les résultats précédents
-        for item in self.tree.get_children():
-            self.tree.delete(item)
         
-        # Préparer les critères
-        criteria = {
+        # Liste virtuelle : la recherche ne lit que les ids, les lignes visibles sont lues à la demande.
+        # Résultats classés par pertinence : un rafraîchissement ne met à jour que les documents présents
+        self.resultats = ListeVirtuelle(self.tree, scrollbar, self.relire_ids,
+                                        self.controller.get_documents_par_ids, valeurs_document,
+                                        executer=self.controller.executer,
+                                        journal=self.controller, trie_par_id=False)
+    
+    def criteres(self):
+        # Préparer les critères (résultats classés par pertinence)
+        return {
+            'texte': self.texte_var.get(),
             'titre': self.titre_var.get(),
             'type': self.type_var.get(),
             'auteur': self.auteur_var.get(),
             'editeur': self.editeur_var.get()
         }
+    
+    def planifier_recherche(self):
+        # Une seule requête par pause dans la saisie
+        if self.minuteur_saisie:
+            self.after_cancel(self.minuteur_saisie)
+        self.minuteur_saisie = self.after(self.delai_saisie, lambda: self.rechercher(premiere_page=True))
+    
+    def rechercher(self, premiere_page=False):
+        if self.minuteur_saisie:
+            self.after_cancel(self.minuteur_saisie)
+            self.minuteur_saisie = None
+        criteria = self.criteres()
+        if premiere_page and not any(criteria.values()):
+            # Saisie effacée : pas de parcours de tout le catalogue
+            self.annulation.set()
+            self.controller.annuler_tache('recherche')
+            self.precedente = None
+            self.etat_var.set("")
+            self.resultats.definir_ids([], conserver_position=False)
+            return
         
-        # Effectuer la recherche
-        results = self.controller.search_documents(criteria)
-        
-        # Afficher les résultats
-        for doc in results:
-            self.tree.insert('', 'end', values=(
-                doc.id,
-                doc.__class__.__name__,
-                doc.titre,
-                doc.status,
-                str(doc.get_details())
-            )) 
\ No newline at end of file
+        # Interrompre la requête en cours : la nouvelle la remplace
+        self.annulation.set()
+        self.annulation = threading.Event()
+        limite = self.taille_page + 1 if premiere_page else None
+        
+        # Affinage d'une recherche complète : seuls ses résultats sont vérifiés
+        parmi = None
+        precedente = self.precedente
+        if (precedente is not None and precedente[3] and len(precedente[2]) <= self.max_reutilisation
+                and est_affinage(precedente[0], criteria)):
+            parmi = precedente
+        
+        # Effectuer la recherche en arrière-plan (remplace la recherche en cours)
+        self.etat_var.set("Recherche en cours…")
+        self.controller.executer(
+            self.lire_resultats, criteria, limite, parmi, self.annulation.is_set, time.perf_counter(),
+            sur_resultat=self.afficher_resultats,
+            sur_erreur=lambda e: self.etat_var.set(f"Erreur lors de la recherche : {e}"),
+            cle='recherche', widget=self
+        )
+    
+    def relire_ids(self):
+        # Journal purgé : la dernière recherche est refaite
+        if not self.precedente:
+            return []
+        criteria, _, ids, complete = self.precedente
+        return self.controller.search_document_ids(criteria, None if complete else self.taille_page)
+    
+    def lire_resultats(self, criteria, limite, parmi, annulation, debut):
+        # Exécuté dans le pool de tâches : version lue avant la recherche
+        version = self.controller.get_version_modifications()
+        # Les résultats précédents ne valent que si le catalogue n'a pas changé depuis
+        ids_precedents = parmi[2] if parmi is not None and parmi[1] == version else None
+        ids = self.controller.search_document_ids(criteria, limite, ids_precedents, annulation)
+        return criteria, version, ids, limite, ids_precedents is not None, debut
+    
+    def afficher_resultats(self, resultat):
+        criteria, version, ids, limite, affinee, debut = resultat
+        if ids is None:
+            return  # interrompue par une recherche plus récente
+        complete = limite is None or len(ids) < limite
+        if not complete:
+            ids = ids[:self.taille_page]
+        self.precedente = (criteria, version, ids, complete)
+        
+        if complete:
+            self.etat_var.set(f"{len(ids)} résultat(s)")
+        else:
+            self.etat_var.set(f"{len(ids)} premiers résultats (Entrée pour tout afficher)")
+        self.resultats.definir_ids(ids, conserver_position=False, version=version)
+        self.mesurer((time.perf_counter() - debut) * 1000, affinee)
+    
+    def mesurer(self, latence, affinee):
+        # Latence de la requête à l'affichage, percentiles journalisés régulièrement
+        self.latences.append(latence)
+        self.nb_recherches += 1
+        self.nb_affinees += affinee
+        if self.nb_recherches % self.nb_mesures or len(self.latences) < 2:
+            return
+        centiles = statistics.quantiles(self.latences, n=100, method='inclusive')
+        user = self.controller.current_user
+        self.controller.logger.log_action('latence_recherche', user.id if user else None, {
+            'recherches': len(self.latences),
+            'p50_ms': round(centiles[49], 1),
+            'p90_ms': round(centiles[89], 1),
+            'p99_ms': round(centiles[98], 1),
+            'affinees': self.nb_affinees
+        })
+        self.nb_affinees = 0
+    
+    def rafraichir(self):
+        # Appelé par le registre de vues : statut et détails des résultats affichés
+        if self.resultats.version is not None:
+            self.resultats.rafraichir()
@@ -0,0 +1,134 @@
+from tkinter import ttk
+from datetime import datetime
+
+class StatistiquesView(ttk.Frame):
+    """Panneau de statistiques : lit la table stats, rafraîchi périodiquement"""
+
+    def __init__(self, parent, controller, intervalle=10000):
+        super().__init__(parent)
+        self.controller = controller
+        self.intervalle = intervalle  # ms entre deux rafraîchissements
+        self.minuteur = None
+        self.setup_ui()
+        # Lue dès qu'elle est affichée; masquée (registre de vues), elle ne lit plus la base
+        self.bind('<Map>', lambda e: self.rafraichir())
+
+    def setup_ui(self):
+        # Style
+        style = ttk.Style()
+        style.configure('Stats.TFrame', background='white')
+        style.configure('Chiffre.TLabel', font=('Helvetica', 20, 'bold'))
+        self.configure(style='Stats.TFrame', padding="20")
+
+        # Titre
+        ttk.Label(self, text="Statistiques de la bibliothèque",
+                 font=('Helvetica', 16, 'bold')).pack(pady=10)
+
+        # Indicateurs principaux
+        cartes_frame = ttk.Frame(self)
+        cartes_frame.pack(fill='x', padx=5, pady=5)
+        self.chiffres = {}
+        indicateurs = [
+            ('documents', "Documents"),
+            ('exemplaires_disponibles', "Exemplaires disponibles"),
+            ('exemplaires_empruntes', "Exemplaires empruntés"),
+            ('emprunts_en_cours', "Emprunts en cours"),
+            ('emprunts_en_retard', "Emprunts en retard"),
+            ('demandes_en_attente', "Demandes en attente"),
+        ]
+        for i, (cle, libelle) in enumerate(indicateurs):
+            carte = ttk.LabelFrame(cartes_frame, text=libelle, padding="10")
+            carte.grid(row=i // 3, column=i % 3, padx=5, pady=5, sticky='nsew')
+            self.chiffres[cle] = ttk.Label(carte, text="-", style='Chiffre.TLabel')
+            self.chiffres[cle].pack()
+        for colonne in range(3):
+            cartes_frame.columnconfigure(colonne, weight=1)
+
+        # Répartition par type
+        types_frame = ttk.LabelFrame(self, text="Documents par type", padding="10")
+        types_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        self.types_tree = ttk.Treeview(types_frame, columns=('Type', 'Nombre'),
+                                       show='headings', height=5)
+        self.types_tree.heading('Type', text='Type')
+        self.types_tree.heading('Nombre', text='Nombre')
+        self.types_tree.pack(fill='both', expand=True)
+
+        # Rapport des pénalités des emprunts en cours
+        penalites_frame = ttk.LabelFrame(self, text="Pénalités en cours par utilisateur", padding="10")
+        penalites_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        colonnes = ('Utilisateur', 'Emprunts en retard', 'Retard max (jours)', 'Montant')
+        self.penalites_tree = ttk.Treeview(penalites_frame, columns=colonnes,
+                                           show='headings', height=6)
+        for col in colonnes:
+            self.penalites_tree.heading(col, text=col)
+        self.penalites_tree.pack(fill='both', expand=True)
+        self.total_penalites_label = ttk.Label(penalites_frame, text="")
+        self.total_penalites_label.pack(anchor='e')
+
+        # Actions
+        action_frame = ttk.Frame(self)
+        action_frame.pack(fill='x', pady=5)
+        ttk.Button(action_frame, text="Rafraîchir",
+                  command=self.rafraichir).pack(side='left', padx=5)
+        self.maj_label = ttk.Label(action_frame, text="")
+        self.maj_label.pack(side='right', padx=5)
+
+    def rafraichir(self):
+        if self.minuteur:
+            self.after_cancel(self.minuteur)
+            self.minuteur = None
+
+        if not self.winfo_viewable():
+            self.minuteur = self.after(self.intervalle, self.rafraichir)
+            return
+
+        # Lecture en arrière-plan; le prochain rafraîchissement est planifié à réception
+        self.maj_label.config(text="Mise à jour…")
+        self.controller.executer(self.lire_statistiques, sur_resultat=self.afficher_statistiques,
+                                 sur_erreur=self.erreur_statistiques, cle='statistiques', widget=self)
+
+    def lire_statistiques(self):
+        # Exécuté dans le pool de tâches : aucun appel à Tk ici
+        stats = self.controller.get_statistiques()
+        return stats, self.controller.get_rapport_penalites() if stats else []
+
+    def afficher_statistiques(self, donnees):
+        stats, rapport = donnees
+        if stats:
+            stats['demandes_en_attente'] = stats['demandes_par_status'].get('en_attente', 0)
+            for cle, label in self.chiffres.items():
+                label.config(text=str(stats[cle]))
+            self.chiffres['emprunts_en_retard'].config(
+                foreground='red' if stats['emprunts_en_retard'] else '')
+
+            for item in self.types_tree.get_children():
+                self.types_tree.delete(item)
+            for type_doc, nombre in sorted(stats['documents_par_type'].items()):
+                self.types_tree.insert('', 'end', values=(type_doc, nombre))
+
+            # Pénalités évaluées en une requête à la date du jour
+            for item in self.penalites_tree.get_children():
+                self.penalites_tree.delete(item)
+            for ligne in rapport:
+                self.penalites_tree.insert('', 'end', values=(
+                    ligne['username'],
+                    ligne['emprunts_en_retard'],
+                    ligne['jours_retard_max'],
+                    f"{ligne['montant']:.2f}€"
+                ))
+            total = sum(ligne['montant'] for ligne in rapport)
+            self.total_penalites_label.config(text=f"Total : {total:.2f}€")
+
+            self.maj_label.config(text=f"Mis à jour à {datetime.now().strftime('%H:%M:%S')}")
+
+        self.minuteur = self.after(self.intervalle, self.rafraichir)
+
+    def erreur_statistiques(self, erreur):
+        self.maj_label.config(text=f"Échec de la mise à jour : {erreur}")
+        self.minuteur = self.after(self.intervalle, self.rafraichir)
+
+    def destroy(self):
+        if self.minuteur:
+            self.after_cancel(self.minuteur)
+            self.minuteur = None
+        super().destroy()
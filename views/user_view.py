@@ -1,6 +1,8 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog
 import hashlib
+from .pagination import afficher_chargement
+from .index_lignes import IndexLignes
 
 class UserView(ttk.Frame):
     def __init__(self, parent, controller):
@@ -58,20 +60,24 @@ class UserView(ttk.Frame):
                   command=self.modifier_utilisateur).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Supprimer",
                   command=self.supprimer_utilisateur).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Paiement",
+                  command=self.enregistrer_paiement).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Remise",
+                  command=self.accorder_remise).pack(side='left', padx=5)
     
     def setup_user_list(self):
         list_frame = ttk.Frame(self)
         list_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
         # Création du tableau
-        columns = ('ID', 'Username', 'Rôle')
+        columns = ('ID', 'Username', 'Rôle', 'Solde')
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings')
         
         # Configuration des colonnes
         for col in columns:
             self.tree.heading(col, text=col)
-            if col == 'ID':
-                self.tree.column(col, width=50)
+            if col in ('ID', 'Solde'):
+                self.tree.column(col, width=80)
             else:
                 self.tree.column(col, width=200)
         
@@ -86,22 +92,73 @@ class UserView(ttk.Frame):
         # Sélection d'un utilisateur
         self.tree.bind('<<TreeviewSelect>>', self.on_user_select)
         
+        # Lignes indexées par utilisateur : les rafraîchissements ne touchent que les lignes modifiées
+        self.index = IndexLignes(self.tree)
+        self.version = None
+        
         # Charger les utilisateurs
         self.charger_utilisateurs()
     
     def charger_utilisateurs(self):
-        # Nettoyer la liste
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Charger les utilisateurs
-        utilisateurs = self.controller.get_all_users()
-        for user in utilisateurs:
-            self.tree.insert('', 'end', values=(
-                user.id,
-                user.username,
-                user.role
-            ))
+        # Lecture complète (premier affichage, ou journal purgé)
+        if not self.index:
+            afficher_chargement(self.tree)
+        self.controller.executer(self.lire_utilisateurs, sur_resultat=self.afficher_utilisateurs,
+                                 cle='utilisateurs', widget=self.tree)
+    
+    def lire_utilisateurs(self):
+        # Exécuté dans le pool de tâches : aucun appel à Tk ici
+        return (
+            self.controller.get_version_modifications(),
+            self.controller.get_all_users(),
+            self.controller.get_soldes()
+        )
+    
+    def afficher_utilisateurs(self, donnees):
+        self.version, utilisateurs, soldes = donnees
+        self.index.remplacer([self.ligne_utilisateur(user, soldes) for user in utilisateurs])
+    
+    def rafraichir_utilisateurs(self):
+        """Ne relit que les utilisateurs (et soldes) modifiés depuis le dernier affichage"""
+        if self.version is None:
+            self.charger_utilisateurs()
+            return
+        self.controller.executer(self.lire_modifications, sur_resultat=self.appliquer_modifications,
+                                 cle='utilisateurs', widget=self.tree)
+    
+    def rafraichir(self):
+        # Appelé par le registre de vues quand la vue est réaffichée
+        self.rafraichir_utilisateurs()
+    
+    def lire_modifications(self):
+        # Exécuté dans le pool de tâches
+        version, modifications = self.controller.get_modifications(self.version, ('utilisateurs', 'soldes'))
+        if modifications is None:
+            return None, self.lire_utilisateurs()
+        ids = modifications['utilisateurs'] | modifications['soldes']
+        if not ids:
+            return version, (ids, [], {})
+        return version, (ids, self.controller.get_utilisateurs(ids), self.controller.get_soldes(ids))
+    
+    def appliquer_modifications(self, resultat):
+        version, donnees = resultat
+        if version is None:
+            self.afficher_utilisateurs(donnees)
+            return
+        self.version = version
+        ids, utilisateurs, soldes = donnees
+        self.index.maj(
+            [self.ligne_utilisateur(user, soldes) for user in utilisateurs],
+            supprimees=ids - {user.id for user in utilisateurs}
+        )
+    
+    def ligne_utilisateur(self, user, soldes):
+        return user.id, (
+            user.id,
+            user.username,
+            user.role,
+            f"{soldes.get(user.id, 0):.2f}€"
+        ), ()
     
     def on_user_select(self, event):
         selection = self.tree.selection()
@@ -128,7 +185,7 @@ class UserView(ttk.Frame):
         
         if self.controller.ajouter_utilisateur(username, hashed_password, role):
             messagebox.showinfo("Succès", "Utilisateur ajouté avec succès")
-            self.charger_utilisateurs()
+            self.rafraichir_utilisateurs()
             self.clear_fields()
         else:
             messagebox.showerror("Erreur", "Impossible d'ajouter l'utilisateur")
@@ -161,7 +218,7 @@ class UserView(ttk.Frame):
         
         if self.controller.modifier_utilisateur(user_id, username, hashed_password, role):
             messagebox.showinfo("Succès", "Utilisateur modifié avec succès")
-            self.charger_utilisateurs()
+            self.rafraichir_utilisateurs()
             self.clear_fields()
         else:
             messagebox.showerror("Erreur", "Impossible de modifier l'utilisateur")
@@ -179,7 +236,36 @@ class UserView(ttk.Frame):
         if messagebox.askyesno("Confirmation", f"Voulez-vous vraiment supprimer l'utilisateur {username} ?"):
             if self.controller.supprimer_utilisateur(user_id):
                 messagebox.showinfo("Succès", "Utilisateur supprimé avec succès")
-                self.charger_utilisateurs()
+                self.rafraichir_utilisateurs()
                 self.clear_fields()
             else:
-                messagebox.showerror("Erreur", "Impossible de supprimer l'utilisateur") 
\ No newline at end of file
+                messagebox.showerror("Erreur", "Impossible de supprimer l'utilisateur") 
+    
+    def enregistrer_paiement(self):
+        self.crediter_solde("Paiement", self.controller.enregistrer_paiement)
+    
+    def accorder_remise(self):
+        self.crediter_solde("Remise", self.controller.accorder_remise)
+    
+    def crediter_solde(self, titre, operation):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Attention", "Veuillez sélectionner un utilisateur")
+            return
+        
+        item = self.tree.item(selection[0])
+        user_id = item['values'][0]
+        username = item['values'][1]
+        montant = simpledialog.askfloat(
+            titre, f"Montant pour {username} (solde : {item['values'][3]}) :", minvalue=0.01
+        )
+        if montant is None:
+            return
+        commentaire = simpledialog.askstring(titre, "Commentaire (facultatif) :")
+        
+        succes, message = operation(user_id, montant, commentaire=commentaire or None)
+        if succes:
+            messagebox.showinfo("Succès", message)
+            self.rafraichir_utilisateurs()
+        else:
+            messagebox.showerror("Erreur", message)